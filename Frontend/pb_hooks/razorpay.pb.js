@@ -11,6 +11,7 @@ const crypto = require('crypto');
 // Load environment variables or use defaults from our CSV
 const RAZORPAY_KEY_ID = $os.getenv('RAZORPAY_KEY_ID') || 'rzp_test_trImBTMCiZgDuF';
 const RAZORPAY_KEY_SECRET = $os.getenv('RAZORPAY_KEY_SECRET') || 'rmnubcj2HK7z9SvnsEDklkoS';
+const RAZORPAY_API_URL = ($os.getenv('RAZORPAY_API_URL') || 'https://api.razorpay.com').replace(/\/$/, '');
 
 // Create a Razorpay order
 routerAdd('POST', '/api/razorpay/create-order', (c) => {
@@ -37,7 +38,7 @@ routerAdd('POST', '/api/razorpay/create-order', (c) => {
     try {
         const auth = Buffer.from(`${RAZORPAY_KEY_ID}:${RAZORPAY_KEY_SECRET}`).toString('base64');
         const response = $http.send({
-            url: 'https://api.razorpay.com/v1/orders',
+            url: `${RAZORPAY_API_URL}/v1/orders`,
             method: 'POST',
             body: JSON.stringify({
                 amount: bodyObj.amount,
@@ -11,6 +11,9 @@ const router = express.Router();
 const RAZORPAY_KEY_ID = process.env.VITE_RAZORPAY_KEY_ID || '';
 const RAZORPAY_KEY_SECRET = process.env.VITE_RAZORPAY_KEY_SECRET || process.env.RAZORPAY_KEY_SECRET || '';
 
+// Razorpay API base URL (override to point at a local stand-in during tests)
+const RAZORPAY_API_URL = (process.env.RAZORPAY_API_URL || 'https://api.razorpay.com').replace(/\/$/, '');
+
 // Create Basic Auth header for Razorpay API
 const RAZORPAY_AUTH = Buffer.from(`${RAZORPAY_KEY_ID}:${RAZORPAY_KEY_SECRET}`).toString('base64');
 
@@ -43,7 +46,7 @@ router.post('/create-order', async (req: Request, res: Response): Promise<void>
     });
     
     // Direct API call to Razorpay
-    const response = await fetch('https://api.razorpay.com/v1/orders', {
+    const response = await fetch(`${RAZORPAY_API_URL}/v1/orders`, {
       method: 'POST',
       headers: {
         'Authorization': `Basic ${RAZORPAY_AUTH}`,
@@ -123,7 +126,7 @@ router.post('/verify-payment', async (req: Request, res: Response): Promise<void
     }
     
     // Get payment details from Razorpay
-    const paymentResponse = await fetch(`https://api.razorpay.com/v1/payments/${razorpay_payment_id}`, {
+    const paymentResponse = await fetch(`${RAZORPAY_API_URL}/v1/payments/${razorpay_payment_id}`, {
       method: 'GET',
       headers: {
         'Authorization': `Basic ${RAZORPAY_AUTH}`,
@@ -178,12 +181,12 @@ router.post('/capture-payment', async (req: Request, res: Response): Promise<voi
     }
     
     console.log('Sending capture request to Razorpay:', { 
-      url: `https://api.razorpay.com/v1/payments/${payment_id}/capture`,
+      url: `${RAZORPAY_API_URL}/v1/payments/${payment_id}/capture`,
       body: captureBody
     });
     
     // Capture the payment using Razorpay API
-    const response = await fetch(`https://api.razorpay.com/v1/payments/${payment_id}/capture`, {
+    const response = await fetch(`${RAZORPAY_API_URL}/v1/payments/${payment_id}/capture`, {
       method: 'POST',
       headers: {
         'Authorization': `Basic ${RAZORPAY_AUTH}`,
@@ -245,7 +248,7 @@ router.post('/refund-payment', async (req: Request, res: Response): Promise<void
     }
     
     // Refund the payment using Razorpay API
-    const response = await fetch(`https://api.razorpay.com/v1/payments/${payment_id}/refund`, {
+    const response = await fetch(`${RAZORPAY_API_URL}/v1/payments/${payment_id}/refund`, {
       method: 'POST',
       headers: {
         'Authorization': `Basic ${RAZORPAY_AUTH}`,
@@ -1,56 +1,23 @@
 import asyncio
-from playwright import async_api
 from playwright.async_api import expect
 
-async def run_test():
-    pw = None
-    browser = None
-    context = None
-    
-    try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
-        context.set_default_timeout(5000)
-        
+from harness import actions, locators, session
+
+
+async def run_test(context=None):
+    async with session.test_context(context) as context:
         # Open a new page in the browser context
-        page = await context.new_page()
+        page = await session.new_page(context)
         
-        # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:8080", wait_until="commit", timeout=10000)
-        
-        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
-        try:
-            await page.wait_for_load_state("domcontentloaded", timeout=3000)
-        except async_api.Error:
-            pass
-        
-        # Iterate through all iframes and wait for them to load as well
-        for frame in page.frames:
-            try:
-                await frame.wait_for_load_state("domcontentloaded", timeout=3000)
-            except async_api.Error:
-                pass
+        # Navigate to your target URL and wait for the page and its iframes to load
+        await session.open_home(page)
         
         # Interact with the page elements to simulate user flow
         # -> Verify product list updates dynamically as products change.
         frame = context.pages[-1]
         # Click 'Load More Products' button to check if product list updates dynamically.
-        elem = frame.locator('xpath=html/body/div/div/main/div/section/div/div[2]/div/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        elem = await locators.resolve(frame, 'xpath=html/body/div/div/main/div/section/div/div[2]/div/div[2]/button')
+        await actions.click(elem)
         
 
         # --> Assertions to verify final state
@@ -69,15 +36,7 @@ async def run_test():
         await expect(frame.locator('text=Rice water Kojic soap').first).to_be_visible(timeout=30000)
         await expect(frame.locator('text=Niancimade soap').first).to_be_visible(timeout=30000)
         await expect(frame.locator('text=Avarampoo Soap').first).to_be_visible(timeout=30000)
-        await asyncio.sleep(5)
-    
-    finally:
-        if context:
-            await context.close()
-        if browser:
-            await browser.close()
-        if pw:
-            await pw.stop()
-            
-asyncio.run(run_test())
-    
\ No newline at end of file
+
+
+if __name__ == "__main__":
+    asyncio.run(run_test())
@@ -1,165 +1,131 @@
 import asyncio
-from playwright import async_api
 from playwright.async_api import expect
 
-async def run_test():
-    pw = None
-    browser = None
-    context = None
-    
-    try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
-        context.set_default_timeout(5000)
-        
+from harness import actions, config, locators, session
+
+
+async def run_test(context=None):
+    async with session.test_context(context) as context:
         # Open a new page in the browser context
-        page = await context.new_page()
-        
-        # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:8080", wait_until="commit", timeout=10000)
+        page = await session.new_page(context)
         
-        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
-        try:
-            await page.wait_for_load_state("domcontentloaded", timeout=3000)
-        except async_api.Error:
-            pass
-        
-        # Iterate through all iframes and wait for them to load as well
-        for frame in page.frames:
-            try:
-                await frame.wait_for_load_state("domcontentloaded", timeout=3000)
-            except async_api.Error:
-                pass
+        # Navigate to your target URL and wait for the page and its iframes to load
+        await session.open_home(page)
         
         # Interact with the page elements to simulate user flow
         # -> Add an item to the cart to proceed to checkout.
         frame = context.pages[-1]
         # Click 'Quick Add' button to add first bestseller item to cart.
-        elem = frame.locator('xpath=html/body/div/div/main/div/section/div/div[2]/div/div/a/div/div[3]/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        elem = await locators.resolve(frame, 'xpath=html/body/div/div/main/div/section/div/div[2]/div/div/a/div/div[3]/div/button')
+        await actions.click(elem)
         
 
         # -> Open the cart to proceed to checkout.
         frame = context.pages[-1]
         # Click 'Open cart' button to view cart and proceed to checkout.
-        elem = frame.locator('xpath=html/body/div/div/header/div/div[2]/nav/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        elem = await locators.resolve(frame, 'xpath=html/body/div/div/header/div/div[2]/nav/button')
+        await actions.click(elem)
         
 
         # -> Click 'Proceed to Checkout' button to initiate checkout process.
         frame = context.pages[-1]
         # Click 'Proceed to Checkout' button to start checkout process.
-        elem = frame.locator('xpath=html/body/div[3]/div[3]/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        elem = await locators.resolve(frame, 'xpath=html/body/div[3]/div[3]/a')
+        await actions.click(elem)
         
 
         # -> Fill in the contact and shipping information form with valid data to proceed to payment.
         frame = context.pages[-1]
         # Enter full name in contact information.
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div[2]/div/form/div/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('Test User')
+        elem = await locators.resolve(frame, 'xpath=html/body/div/div/main/div/div/div[2]/div/form/div/div/div/input')
+        await actions.fill(elem, 'Test User')
         
 
         frame = context.pages[-1]
         # Enter email in contact information.
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div[2]/div/form/div/div/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('testuser@example.com')
+        elem = await locators.resolve(frame, 'xpath=html/body/div/div/main/div/div/div[2]/div/form/div/div/div[2]/input')
+        await actions.fill(elem, 'testuser@example.com')
         
 
         frame = context.pages[-1]
         # Enter street address in shipping information.
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div[2]/div/form/div[3]/div/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('123 Test Street')
+        elem = await locators.resolve(frame, 'xpath=html/body/div/div/main/div/div/div[2]/div/form/div[3]/div/div/div/input')
+        await actions.fill(elem, '123 Test Street')
         
 
         frame = context.pages[-1]
         # Enter city in shipping information.
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div[2]/div/form/div[3]/div/div[2]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('Test City')
+        elem = await locators.resolve(frame, 'xpath=html/body/div/div/main/div/div/div[2]/div/form/div[3]/div/div[2]/div/input')
+        await actions.fill(elem, 'Test City')
         
 
         frame = context.pages[-1]
         # Enter state in shipping information.
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div[2]/div/form/div[3]/div/div[2]/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('Test State')
+        elem = await locators.resolve(frame, 'xpath=html/body/div/div/main/div/div/div[2]/div/form/div[3]/div/div[2]/div[2]/input')
+        await actions.fill(elem, 'Test State')
         
 
         frame = context.pages[-1]
         # Enter ZIP code in shipping information.
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div[2]/div/form/div[3]/div/div[2]/div[3]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('123456')
+        elem = await locators.resolve(frame, 'xpath=html/body/div/div/main/div/div/div[2]/div/form/div[3]/div/div[2]/div[3]/input')
+        await actions.fill(elem, '123456')
         
 
         frame = context.pages[-1]
         # Enter 10-digit phone number in shipping information.
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div[2]/div/form/div[3]/div/div[3]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('9876543210')
+        elem = await locators.resolve(frame, 'xpath=html/body/div/div/main/div/div/div[2]/div/form/div[3]/div/div[3]/input')
+        await actions.fill(elem, '9876543210')
         
 
         # -> Click 'Complete Purchase' button to proceed to payment step and initiate Razorpay payment.
         frame = context.pages[-1]
         # Click 'Complete Purchase' button to proceed to payment step and initiate Razorpay payment.
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div[2]/div/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        elem = await locators.resolve(frame, 'xpath=html/body/div/div/main/div/div/div[2]/div/form/button')
+        await actions.click(elem)
         
 
         # -> Simulate Razorpay payment failure or cancellation to verify error handling.
         frame = context.pages[-1].frame_locator('html > body > div:nth-of-type(2) > iframe.razorpay-checkout-frame[src="https://api.razorpay.com/v1/checkout/public?traffic_env=production&build=643457f985a11766015ac9ab50b8eccbafee17b4&build_v1=715e3c0a534a4e4fa59a19e1d2a3cc3daf1837e2&checkout_v2=1&new_session=1&unified_session_id=RZFgP20Pjqjd4d"]')
         # Click 'Close Checkout' button to close payment modal and simulate cancellation.
-        elem = frame.locator('xpath=html/body/div/div/div/div[2]/div/div/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        elem = await locators.resolve(frame, 'xpath=html/body/div/div/div/div[2]/div/div/button[2]')
+        await actions.click(elem)
         
 
         # -> Click 'Close Checkout' button to simulate Razorpay payment cancellation and verify error handling.
         frame = context.pages[-1].frame_locator('html > body > div:nth-of-type(2) > iframe.razorpay-checkout-frame[src="https://api.razorpay.com/v1/checkout/public?traffic_env=production&build=643457f985a11766015ac9ab50b8eccbafee17b4&build_v1=715e3c0a534a4e4fa59a19e1d2a3cc3daf1837e2&checkout_v2=1&new_session=1&unified_session_id=RZFgP20Pjqjd4d"]')
         # Click 'Close Checkout' button to simulate payment cancellation.
-        elem = frame.locator('xpath=html/body/div/div/div[2]/div/div[2]/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        elem = await locators.resolve(frame, 'xpath=html/body/div/div/div[2]/div/div[2]/button[2]')
+        await actions.click(elem)
         
 
         # -> Click 'Yes, exit' button to confirm Razorpay payment cancellation and verify error handling.
         frame = context.pages[-1].frame_locator('html > body > div:nth-of-type(2) > iframe.razorpay-checkout-frame[src="https://api.razorpay.com/v1/checkout/public?traffic_env=production&build=643457f985a11766015ac9ab50b8eccbafee17b4&build_v1=715e3c0a534a4e4fa59a19e1d2a3cc3daf1837e2&checkout_v2=1&new_session=1&unified_session_id=RZFgP20Pjqjd4d"]')
         # Click 'Yes, exit' button to confirm payment cancellation.
-        elem = frame.locator('xpath=html/body/div/div[3]/div[2]/div/div/div/div/div/div/div/div/div[2]/div[2]/button[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        elem = await locators.resolve(frame, 'xpath=html/body/div/div[3]/div[2]/div/div/div/div/div/div/div/div/div[2]/div[2]/button[2]')
+        await actions.click(elem)
         
 
         # -> Verify that no order was created or saved in the system after Razorpay payment cancellation.
-        await page.goto('http://localhost:8080/orders', timeout=10000)
-        await asyncio.sleep(3)
+        await actions.goto(page, config.url('/orders'))
         
 
         # -> Log in to the system to access the orders page and verify order creation status after Razorpay payment cancellation.
         frame = context.pages[-1]
         # Enter email to login.
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/form/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('testuser@example.com')
+        elem = await locators.resolve(frame, 'xpath=html/body/div/div/main/div/div/form/div/div/input')
+        await actions.fill(elem, 'testuser@example.com')
         
 
         frame = context.pages[-1]
         # Enter password to login.
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/form/div/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('TestPassword123')
+        elem = await locators.resolve(frame, 'xpath=html/body/div/div/main/div/div/form/div/div[2]/input')
+        await actions.fill(elem, 'TestPassword123')
         
 
         frame = context.pages[-1]
         # Click 'Sign In with Email' button to login.
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/form/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        elem = await locators.resolve(frame, 'xpath=html/body/div/div/main/div/div/form/div/button')
+        await actions.click(elem)
         
 
         # --> Assertions to verify final state
@@ -168,15 +134,7 @@ async def run_test():
             await expect(frame.locator('text=Payment Successful! Thank you for your order.').first).to_be_visible(timeout=1000)
         except AssertionError:
             raise AssertionError("Test failed: Razorpay payment failure or cancellation was not handled correctly. Expected error message was not displayed, and order might have been created or saved incorrectly.")
-        await asyncio.sleep(5)
-    
-    finally:
-        if context:
-            await context.close()
-        if browser:
-            await browser.close()
-        if pw:
-            await pw.stop()
-            
-asyncio.run(run_test())
-    
\ No newline at end of file
+
+
+if __name__ == "__main__":
+    asyncio.run(run_test())
@@ -1,145 +1,45 @@
 import asyncio
-from playwright import async_api
 from playwright.async_api import expect
 
-async def run_test():
-    pw = None
-    browser = None
-    context = None
-    
-    try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
-        context.set_default_timeout(5000)
-        
-        # Open a new page in the browser context
-        page = await context.new_page()
-        
-        # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:8080", wait_until="commit", timeout=10000)
-        
-        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
-        try:
-            await page.wait_for_load_state("domcontentloaded", timeout=3000)
-        except async_api.Error:
-            pass
-        
-        # Iterate through all iframes and wait for them to load as well
-        for frame in page.frames:
-            try:
-                await frame.wait_for_load_state("domcontentloaded", timeout=3000)
-            except async_api.Error:
-                pass
-        
-        # Interact with the page elements to simulate user flow
-        # -> Click on 'Sign in' to access user account for profile update.
-        frame = context.pages[-1]
-        # Click on 'Sign in' link to go to login page or user account.
-        elem = frame.locator('xpath=html/body/div/div/header/div/div[2]/nav/div/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Input email and password, then click 'Sign In with Email' button.
-        frame = context.pages[-1]
-        # Input email for login
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/form/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('testuser@example.com')
-        
-
-        frame = context.pages[-1]
-        # Input password for login
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/form/div/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('TestPassword123')
-        
-
-        frame = context.pages[-1]
-        # Click 'Sign In with Email' button to login
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/form/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
+from harness import actions, config, locators, session
 
-        # -> Check if there is an option to sign up or reset password, or try a different login approach.
-        frame = context.pages[-1]
-        # Click on 'Sign up' link to create a new account or find alternative login options
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div[2]/span/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Fill in the signup form with Name, Email, and Password, then click 'Sign Up with Email' button.
-        frame = context.pages[-1]
-        # Input Name for signup
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/form/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('John Doe')
-        
 
-        frame = context.pages[-1]
-        # Input Email for signup
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/form/div/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('john.doe@example.com')
-        
+ROLE = "customer"
 
-        frame = context.pages[-1]
-        # Input Password for signup
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/form/div/div[3]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('SecurePass123!')
-        
 
-        frame = context.pages[-1]
-        # Click 'Sign Up with Email' button to create account
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/form/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+async def run_test(context=None):
+    async with session.test_context(context, role=ROLE) as context:
+        # Open a new page in the browser context
+        page = await session.new_page(context)
         
-
-        # -> Locate and click on user profile or account menu to access personal info section.
-        frame = context.pages[-1]
-        # Click on user profile or account menu button
-        elem = frame.locator('xpath=html/body/div/div/header/div/div[2]/nav/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        # Navigate to your target URL and wait for the page and its iframes to load
+        await session.open_home(page, config.url('/profile'))
         
-
-        # -> Click on 'Profile' menu item to open user profile personal info section.
-        frame = context.pages[-1]
-        # Click on 'Profile' to open user profile personal info section
-        elem = frame.locator('xpath=html/body/div[2]/div/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        # Interact with the page elements to simulate user flow
+        # -> Already signed in as the customer through the stored session (harness.auth), so the test starts on the profile page.
         
 
         # -> Modify Name and Phone fields with new values and click 'Save Changes' button.
         frame = context.pages[-1]
         # Update Name field with new value
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div[2]/div/div[2]/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('Johnathan Doe')
+        elem = await locators.resolve(frame, 'xpath=html/body/div/div/main/div/div/div[2]/div/div[2]/form/div/input')
+        await actions.fill(elem, 'Johnathan Doe')
         
 
         frame = context.pages[-1]
         # Update Phone field with new value
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div[2]/div/div[2]/form/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('123-456-7890')
+        elem = await locators.resolve(frame, 'xpath=html/body/div/div/main/div/div/div[2]/div/div[2]/form/div[2]/input')
+        await actions.fill(elem, '123-456-7890')
         
 
         frame = context.pages[-1]
         # Click 'Save Changes' button to save updated profile information
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div[2]/div/div[2]/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        elem = await locators.resolve(frame, 'xpath=html/body/div/div/main/div/div/div[2]/div/div[2]/form/button')
+        await actions.click(elem)
         
 
         # -> Reload the profile page to confirm data persistence of updated personal information.
-        await page.goto('http://localhost:8080/profile', timeout=10000)
-        await asyncio.sleep(3)
+        await actions.goto(page, config.url('/profile'))
         
 
         # --> Assertions to verify final state
@@ -151,15 +51,7 @@ async def run_test():
         await expect(frame.locator('text=Email').first).to_be_visible(timeout=30000)
         await expect(frame.locator('text=Email cannot be changed').first).to_be_visible(timeout=30000)
         await expect(frame.locator('text=Save Changes').first).to_be_visible(timeout=30000)
-        await asyncio.sleep(5)
-    
-    finally:
-        if context:
-            await context.close()
-        if browser:
-            await browser.close()
-        if pw:
-            await pw.stop()
-            
-asyncio.run(run_test())
-    
\ No newline at end of file
+
+
+if __name__ == "__main__":
+    asyncio.run(run_test())
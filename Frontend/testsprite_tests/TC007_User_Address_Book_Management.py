@@ -1,218 +1,29 @@
 import asyncio
-from playwright import async_api
 from playwright.async_api import expect
 
-async def run_test():
-    pw = None
-    browser = None
-    context = None
-    
-    try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
-        context.set_default_timeout(5000)
-        
-        # Open a new page in the browser context
-        page = await context.new_page()
-        
-        # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:8080", wait_until="commit", timeout=10000)
-        
-        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
-        try:
-            await page.wait_for_load_state("domcontentloaded", timeout=3000)
-        except async_api.Error:
-            pass
-        
-        # Iterate through all iframes and wait for them to load as well
-        for frame in page.frames:
-            try:
-                await frame.wait_for_load_state("domcontentloaded", timeout=3000)
-            except async_api.Error:
-                pass
-        
-        # Interact with the page elements to simulate user flow
-        # -> Click on 'Sign in' to access user account for address book.
-        frame = context.pages[-1]
-        # Click on 'Sign in' to access user account for address book.
-        elem = frame.locator('xpath=html/body/div/div/header/div/div[2]/nav/div/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
+from harness import actions, config, session
 
-        # -> Input email and password, then click 'Sign In with Email' button.
-        frame = context.pages[-1]
-        # Input email for sign in
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/form/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('testuser@example.com')
-        
-
-        frame = context.pages[-1]
-        # Input password for sign in
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/form/div/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('TestPassword123')
-        
 
-        frame = context.pages[-1]
-        # Click 'Sign In with Email' button to log in
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/form/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
+ROLE = "customer"
 
-        # -> Click on 'Sign up' link to create a new account or find alternative way to access address book.
-        frame = context.pages[-1]
-        # Click on 'Sign up' link to create a new account or access registration page
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div[2]/span/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
 
-        # -> Input password and click 'Sign Up with Email' button to create account.
-        frame = context.pages[-1]
-        # Input password for new account creation
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/form/div/div[3]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('TestPassword123')
-        
-
-        frame = context.pages[-1]
-        # Click 'Sign Up with Email' button to create new account
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/form/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Fill in the 'Name' and 'Email' fields with valid data and then click 'Sign Up with Email' button.
-        frame = context.pages[-1]
-        # Input valid name in the 'Name' field
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/form/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('John Doe')
-        
-
-        frame = context.pages[-1]
-        # Input valid email in the 'Email' field
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/form/div/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('john.doe@example.com')
-        
-
-        frame = context.pages[-1]
-        # Click 'Sign Up with Email' button to create new account
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/form/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Click on 'Sign in' link to go back to login page and try to sign in with existing credentials.
-        frame = context.pages[-1]
-        # Click on 'Sign in' link to go back to login page
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div[2]/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Input existing user email and password, then click 'Sign In with Email' button to log in.
-        frame = context.pages[-1]
-        # Input existing user email
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/form/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('john.doe@example.com')
-        
-
-        frame = context.pages[-1]
-        # Input existing user password
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/form/div/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('TestPassword123')
-        
-
-        frame = context.pages[-1]
-        # Click 'Sign In with Email' button to log in
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/form/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Click on 'Forgot your password?' link to initiate password reset process.
-        frame = context.pages[-1]
-        # Click on 'Forgot your password?' link to initiate password reset
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div[2]/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Input registered email and click 'Send reset link' to initiate password reset.
-        frame = context.pages[-1]
-        # Input registered email for password reset
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div[2]/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('john.doe@example.com')
-        
-
-        frame = context.pages[-1]
-        # Click 'Send reset link' button to send password reset email
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div[2]/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Click 'Back to login' button to return to login page.
-        frame = context.pages[-1]
-        # Click 'Back to login' button to return to login page
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Input email and new password, then click 'Sign In with Email' button to log in.
-        frame = context.pages[-1]
-        # Input email for login
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/form/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('john.doe@example.com')
-        
-
-        frame = context.pages[-1]
-        # Input new password for login
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/form/div/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('NewTestPassword123')
-        
-
-        frame = context.pages[-1]
-        # Click 'Sign In with Email' button to log in
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/form/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Clear email and password fields and re-enter credentials carefully to ensure no hidden characters or formatting issues.
-        frame = context.pages[-1]
-        # Clear email field
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/form/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('')
-        
-
-        frame = context.pages[-1]
-        # Clear password field
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/form/div/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('')
+async def run_test(context=None):
+    async with session.test_context(context, role=ROLE) as context:
+        # Open a new page in the browser context
+        page = await session.new_page(context)
         
-
-        frame = context.pages[-1]
-        # Re-enter email
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/form/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('john.doe@example.com')
+        # Navigate to your target URL and wait for the page and its iframes to load
+        await session.open_home(page, config.url('/profile'))
         
-
-        frame = context.pages[-1]
-        # Re-enter password
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/form/div/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('NewTestPassword123')
+        # Interact with the page elements to simulate user flow
+        # -> Already signed in as the customer through the stored session (harness.auth), so the test starts on the account page.
         
 
-        # -> Click 'Sign In with Email' button to log in and access user account.
+        # -> Open the 'Addresses' tab of the account page.
         frame = context.pages[-1]
-        # Click 'Sign In with Email' button to log in
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/form/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        # Click the 'Addresses' tab
+        elem = frame.get_by_role('tab', name='Addresses')
+        await actions.click(elem)
         
 
         # --> Assertions to verify final state
@@ -221,15 +32,7 @@ async def run_test():
             await expect(frame.locator('text=Address book updated successfully').first).to_be_visible(timeout=1000)
         except AssertionError:
             raise AssertionError("Test case failed: The test plan execution for adding, editing, and deleting addresses in the address book has failed. The expected confirmation message 'Address book updated successfully' was not found on the page.")
-        await asyncio.sleep(5)
-    
-    finally:
-        if context:
-            await context.close()
-        if browser:
-            await browser.close()
-        if pw:
-            await pw.stop()
-            
-asyncio.run(run_test())
-    
\ No newline at end of file
+
+
+if __name__ == "__main__":
+    asyncio.run(run_test())
@@ -1,164 +1,22 @@
 import asyncio
-from playwright import async_api
 from playwright.async_api import expect
 
-async def run_test():
-    pw = None
-    browser = None
-    context = None
-    
-    try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
-        context.set_default_timeout(5000)
-        
-        # Open a new page in the browser context
-        page = await context.new_page()
-        
-        # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:8080", wait_until="commit", timeout=10000)
-        
-        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
-        try:
-            await page.wait_for_load_state("domcontentloaded", timeout=3000)
-        except async_api.Error:
-            pass
-        
-        # Iterate through all iframes and wait for them to load as well
-        for frame in page.frames:
-            try:
-                await frame.wait_for_load_state("domcontentloaded", timeout=3000)
-            except async_api.Error:
-                pass
-        
-        # Interact with the page elements to simulate user flow
-        # -> Navigate to user order history page by finding and clicking the appropriate link or button.
-        frame = context.pages[-1]
-        # Click on 'Sign in' to access user account for order history.
-        elem = frame.locator('xpath=html/body/div/div/header/div/div[2]/nav/div/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Input email and password, then click 'Sign In with Email' button to log in.
-        frame = context.pages[-1]
-        # Input email for sign in
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/form/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('testuser@example.com')
-        
+from harness import config, session
 
-        frame = context.pages[-1]
-        # Input password for sign in
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/form/div/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('TestPassword123')
-        
-
-        frame = context.pages[-1]
-        # Click 'Sign In with Email' button to submit login form
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/form/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
 
-        # -> Check for 'Forgot your password?' or 'Sign up' options or try to find a guest order history access or reset password.
-        frame = context.pages[-1]
-        # Click 'Forgot your password?' to attempt password reset or recovery.
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div[2]/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
+ROLE = "customer"
 
-        # -> Input registered email into the email field and click 'Send reset link' button.
-        frame = context.pages[-1]
-        # Input registered email for password reset
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div[2]/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('testuser@example.com')
-        
-
-        frame = context.pages[-1]
-        # Click 'Send reset link' button to request password reset
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div[2]/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Click 'Back to login' button to return to login page.
-        frame = context.pages[-1]
-        # Click 'Back to login' button to return to login page
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
 
-        # -> Input email and password to sign in and access order history page.
-        frame = context.pages[-1]
-        # Input email for login
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/form/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('testuser@example.com')
-        
-
-        frame = context.pages[-1]
-        # Input new password for login after reset
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/form/div/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('NewPassword123')
-        
-
-        frame = context.pages[-1]
-        # Click 'Sign In with Email' button to submit login form
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/form/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Check if there is a guest order history access or explore navigation to order history without login.
-        await page.mouse.wheel(0, await page.evaluate('() => window.innerHeight'))
-        
-
-        # -> Click on 'Sign up' link to explore account creation and potential order history access with a new user.
-        frame = context.pages[-1]
-        # Click 'Sign up' link to navigate to account registration page
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div[2]/span/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Input name, email, and password, then click 'Sign Up with Email' button to create a new account.
-        frame = context.pages[-1]
-        # Input name for new account
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/form/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('Test User')
-        
-
-        frame = context.pages[-1]
-        # Input email for new account
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/form/div/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('newuser@example.com')
-        
-
-        frame = context.pages[-1]
-        # Input password for new account
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/form/div/div[3]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('TestPassword123')
+async def run_test(context=None):
+    async with session.test_context(context, role=ROLE) as context:
+        # Open a new page in the browser context
+        page = await session.new_page(context)
         
-
-        frame = context.pages[-1]
-        # Click 'Sign Up with Email' button to submit account creation form
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/form/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        # Navigate to your target URL and wait for the page and its iframes to load
+        await session.open_home(page, config.url('/orders'))
         
-
-        # -> Find and click on user account or order history link to access order history page.
-        frame = context.pages[-1]
-        # Click on 'Shop' link to explore navigation options for order history or user account
-        elem = frame.locator('xpath=html/body/div/div/header/div/a/div/img').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        # Interact with the page elements to simulate user flow
+        # -> Already signed in as the customer through the stored session (harness.auth), so the test starts on the order history page.
         
 
         # --> Assertions to verify final state
@@ -167,15 +25,7 @@ async def run_test():
             await expect(frame.locator('text=Order Confirmation Success').first).to_be_visible(timeout=1000)
         except AssertionError:
             raise AssertionError("Test case failed: The test plan execution has failed because the user could not view the order list and detailed order information including invoices and tracking links as expected.")
-        await asyncio.sleep(5)
-    
-    finally:
-        if context:
-            await context.close()
-        if browser:
-            await browser.close()
-        if pw:
-            await pw.stop()
-            
-asyncio.run(run_test())
-    
\ No newline at end of file
+
+
+if __name__ == "__main__":
+    asyncio.run(run_test())
@@ -1,207 +1,94 @@
 import asyncio
-from playwright import async_api
 from playwright.async_api import expect
 
-async def run_test():
-    pw = None
-    browser = None
-    context = None
-    
-    try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
-        context.set_default_timeout(5000)
-        
-        # Open a new page in the browser context
-        page = await context.new_page()
-        
-        # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:8080", wait_until="commit", timeout=10000)
-        
-        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
-        try:
-            await page.wait_for_load_state("domcontentloaded", timeout=3000)
-        except async_api.Error:
-            pass
-        
-        # Iterate through all iframes and wait for them to load as well
-        for frame in page.frames:
-            try:
-                await frame.wait_for_load_state("domcontentloaded", timeout=3000)
-            except async_api.Error:
-                pass
-        
-        # Interact with the page elements to simulate user flow
-        # -> Find and click the link or button to navigate to the order tracking page.
-        frame = context.pages[-1]
-        # Click on 'Sign in' to access user account for order tracking.
-        elem = frame.locator('xpath=html/body/div/div/header/div/div[2]/nav/div/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
+from harness import actions, config, locators, session
 
-        # -> Input email and password, then click 'Sign In with Email' button to log in.
-        frame = context.pages[-1]
-        # Input email for login
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/form/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('testuser@example.com')
-        
 
-        frame = context.pages[-1]
-        # Input password for login
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/form/div/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('TestPassword123')
-        
+ROLE = "customer"
 
-        frame = context.pages[-1]
-        # Click 'Sign In with Email' button to submit login form
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/form/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
 
-        # -> Check for alternative navigation options to order tracking page or try password recovery or sign up to create an account.
-        frame = context.pages[-1]
-        # Click 'Forgot your password?' to explore password recovery options or alternative login methods.
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div[2]/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Click 'Back to login' button to return to login page and check for other access options.
-        frame = context.pages[-1]
-        # Click 'Back to login' button to return to login page
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div[3]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Click 'Sign up' link to explore account creation for valid credentials to access order tracking.
-        frame = context.pages[-1]
-        # Click 'Sign up' link to explore account creation for valid credentials
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div[2]/span/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Fill in the sign-up form with name, email, and password, then click 'Sign Up with Email' to create the account.
-        frame = context.pages[-1]
-        # Input name for account creation
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/form/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('John Doe')
-        
-
-        frame = context.pages[-1]
-        # Input email for account creation
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/form/div/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('johndoe@example.com')
-        
-
-        frame = context.pages[-1]
-        # Input password for account creation
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/form/div/div[3]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('SecurePass123')
-        
-
-        frame = context.pages[-1]
-        # Click 'Sign Up with Email' button to submit the account creation form
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/form/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+async def run_test(context=None):
+    async with session.test_context(context, role=ROLE) as context:
+        # Open a new page in the browser context
+        page = await session.new_page(context)
         
-
-        # -> Find and click the link or button to navigate to the order tracking page.
-        frame = context.pages[-1]
-        # Click on user menu or profile button to find order tracking link
-        elem = frame.locator('xpath=html/body/div/div/header/div/div[2]/nav/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        # Navigate to your target URL and wait for the page and its iframes to load
+        await session.open_home(page, config.url('/orders'))
         
-
-        # -> Click the 'Orders' link in the user menu to navigate to the order tracking page.
-        frame = context.pages[-1]
-        # Click 'Orders' link in user menu to navigate to order tracking page
-        elem = frame.locator('xpath=html/body/div[2]/div/a[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        # Interact with the page elements to simulate user flow
+        # -> Already signed in as the customer through the stored session (harness.auth), so the test starts on the orders page.
         
 
         # -> Click 'Browse Products' to create an order for testing shipment status and tracking updates.
         frame = context.pages[-1]
         # Click 'Browse Products' button to start shopping and create an order
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div/a/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        elem = await locators.resolve(frame, 'xpath=html/body/div/div/main/div/div/div/a/button')
+        await actions.click(elem)
         
 
         # -> Add a product to the cart to initiate an order creation process.
         frame = context.pages[-1]
         # Click 'Add to Cart' button for Redwine soap to add product to cart
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div/div[2]/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        elem = await locators.resolve(frame, 'xpath=html/body/div/div/main/div/div/div/div[2]/a')
+        await actions.click(elem)
         
 
         # -> Click 'Add to Cart' button to add 'Redwine soap' to the cart and proceed with order creation.
         frame = context.pages[-1]
         # Click 'Add to Cart' button to add 'Redwine soap' to cart
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div[4]/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        elem = await locators.resolve(frame, 'xpath=html/body/div/div/main/div/div/div[4]/div/div/button')
+        await actions.click(elem)
         
 
         # -> Click 'Checkout' button to proceed with order placement.
         frame = context.pages[-1]
         # Click 'Checkout' button to proceed with order placement
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div[4]/div/div/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        elem = await locators.resolve(frame, 'xpath=html/body/div/div/main/div/div/div[4]/div/div/a')
+        await actions.click(elem)
         
 
         # -> Fill in the required shipping address fields and phone number, then click 'Complete Purchase' to place the order.
         frame = context.pages[-1]
         # Input street address
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div[2]/div/form/div[3]/div/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('123 Main Street')
+        elem = await locators.resolve(frame, 'xpath=html/body/div/div/main/div/div/div[2]/div/form/div[3]/div/div/div/input')
+        await actions.fill(elem, '123 Main Street')
         
 
         frame = context.pages[-1]
         # Input city
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div[2]/div/form/div[3]/div/div[2]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('Mumbai')
+        elem = await locators.resolve(frame, 'xpath=html/body/div/div/main/div/div/div[2]/div/form/div[3]/div/div[2]/div/input')
+        await actions.fill(elem, 'Mumbai')
         
 
         frame = context.pages[-1]
         # Input state
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div[2]/div/form/div[3]/div/div[2]/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('Maharashtra')
+        elem = await locators.resolve(frame, 'xpath=html/body/div/div/main/div/div/div[2]/div/form/div[3]/div/div[2]/div[2]/input')
+        await actions.fill(elem, 'Maharashtra')
         
 
         frame = context.pages[-1]
         # Input ZIP code
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div[2]/div/form/div[3]/div/div[2]/div[3]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('400001')
+        elem = await locators.resolve(frame, 'xpath=html/body/div/div/main/div/div/div[2]/div/form/div[3]/div/div[2]/div[3]/input')
+        await actions.fill(elem, '400001')
         
 
         frame = context.pages[-1]
         # Input 10-digit Indian mobile number
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div[2]/div/form/div[3]/div/div[3]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('9876543210')
+        elem = await locators.resolve(frame, 'xpath=html/body/div/div/main/div/div/div[2]/div/form/div[3]/div/div[3]/input')
+        await actions.fill(elem, '9876543210')
         
 
         frame = context.pages[-1]
         # Click 'Complete Purchase' button to place the order
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div[2]/div/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        elem = await locators.resolve(frame, 'xpath=html/body/div/div/main/div/div/div[2]/div/form/button')
+        await actions.click(elem)
         
 
         # -> Complete payment using available payment method to finalize order creation.
         frame = context.pages[-1]
         # Click 'Processing...' button to simulate payment completion and finalize order
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div[2]/div/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        elem = await locators.resolve(frame, 'xpath=html/body/div/div/main/div/div/div[2]/div/form/button')
+        await actions.click(elem)
         
 
         # --> Assertions to verify final state
@@ -210,15 +97,7 @@ async def run_test():
             await expect(frame.locator('text=Order Delivered Successfully! Congratulations').first).to_be_visible(timeout=1000)
         except AssertionError:
             raise AssertionError("Test case failed: The order tracking page did not display the expected shipment status and tracking updates dynamically as required by the test plan.")
-        await asyncio.sleep(5)
-    
-    finally:
-        if context:
-            await context.close()
-        if browser:
-            await browser.close()
-        if pw:
-            await pw.stop()
-            
-asyncio.run(run_test())
-    
\ No newline at end of file
+
+
+if __name__ == "__main__":
+    asyncio.run(run_test())
@@ -1,225 +1,29 @@
 import asyncio
-from playwright import async_api
 from playwright.async_api import expect
 
-async def run_test():
-    pw = None
-    browser = None
-    context = None
-    
-    try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
-        context.set_default_timeout(5000)
-        
-        # Open a new page in the browser context
-        page = await context.new_page()
-        
-        # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:8080", wait_until="commit", timeout=10000)
-        
-        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
-        try:
-            await page.wait_for_load_state("domcontentloaded", timeout=3000)
-        except async_api.Error:
-            pass
-        
-        # Iterate through all iframes and wait for them to load as well
-        for frame in page.frames:
-            try:
-                await frame.wait_for_load_state("domcontentloaded", timeout=3000)
-            except async_api.Error:
-                pass
-        
-        # Interact with the page elements to simulate user flow
-        # -> Click on 'Sign in' to access user profile for security settings.
-        frame = context.pages[-1]
-        # Click on 'Sign in' to access user login page
-        elem = frame.locator('xpath=html/body/div/div/header/div/div[2]/nav/div/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Input email and password to sign in.
-        frame = context.pages[-1]
-        # Input email for login
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/form/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('testuser@example.com')
-        
-
-        frame = context.pages[-1]
-        # Input current password for login
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/form/div/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('OldPassword123!')
-        
-
-        frame = context.pages[-1]
-        # Click 'Sign In with Email' button to log in
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/form/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Retry login with correct credentials or initiate password reset if credentials are unknown.
-        frame = context.pages[-1]
-        # Re-input email for login
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/form/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('testuser@example.com')
-        
-
-        frame = context.pages[-1]
-        # Input correct password for login
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/form/div/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('CorrectPassword123!')
-        
-
-        frame = context.pages[-1]
-        # Click 'Sign In with Email' button to attempt login again
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/form/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Try clearing and re-entering email and password to enable the sign-in button or use 'Forgot your password?' link to reset password.
-        frame = context.pages[-1]
-        # Clear email input to reset form validation
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/form/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('')
-        
-
-        frame = context.pages[-1]
-        # Clear password input to reset form validation
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/form/div/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('')
-        
-
-        frame = context.pages[-1]
-        # Re-enter email to enable sign-in button
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/form/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('testuser@example.com')
-        
-
-        frame = context.pages[-1]
-        # Re-enter password to enable sign-in button
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/form/div/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('CorrectPassword123!')
-        
+from harness import actions, config, session
 
-        # -> Click 'Forgot your password?' link to initiate password reset process to regain access.
-        frame = context.pages[-1]
-        # Click 'Forgot your password?' link to start password reset
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div[2]/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Input email address to send password reset link.
-        frame = context.pages[-1]
-        # Input email address for password reset
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div[2]/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('testuser@example.com')
-        
-
-        frame = context.pages[-1]
-        # Click 'Send reset link' button to initiate password reset
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div[2]/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Click 'Back to login' to return to login page and proceed with password update after reset.
-        frame = context.pages[-1]
-        # Click 'Back to login' button to return to login page
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Input new password and click 'Sign In with Email' to log in with updated credentials.
-        frame = context.pages[-1]
-        # Input new password after reset
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/form/div/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('NewPassword123!')
-        
-
-        frame = context.pages[-1]
-        # Click 'Sign In with Email' button to log in with new password
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/form/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Verify if the password reset process was completed correctly or try another password reset attempt.
-        frame = context.pages[-1]
-        # Click 'Forgot your password?' link to retry password reset process
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div[2]/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Input email and click 'Send reset link' to retry password reset process.
-        frame = context.pages[-1]
-        # Input email for password reset retry
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div[2]/form/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('testuser@example.com')
-        
 
-        frame = context.pages[-1]
-        # Click 'Send reset link' button to resend password reset email
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div[2]/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
+ROLE = "customer"
 
-        # -> Click 'Back to login' to return to login page and proceed with password update after reset.
-        frame = context.pages[-1]
-        # Click 'Back to login' button to return to login page
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div[2]/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
 
-        # -> Request user to confirm password reset completion and new password, then input new password and attempt login again.
-        frame = context.pages[-1]
-        # Input new password after reset
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/form/div/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('NewPassword123!')
-        
-
-        frame = context.pages[-1]
-        # Click 'Sign In with Email' button to attempt login with new password
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/form/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
-        
-
-        # -> Check if the password input meets validation requirements or try clearing and re-entering password to enable sign-in button.
-        frame = context.pages[-1]
-        # Clear password input to reset validation
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/form/div/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('')
+async def run_test(context=None):
+    async with session.test_context(context, role=ROLE) as context:
+        # Open a new page in the browser context
+        page = await session.new_page(context)
         
-
-        frame = context.pages[-1]
-        # Re-enter new password to enable sign-in button
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/form/div/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('NewPassword123!')
+        # Navigate to your target URL and wait for the page and its iframes to load
+        await session.open_home(page, config.url('/profile'))
         
-
-        # -> Clear password input and re-enter to try enabling the 'Sign In with Email' button.
-        frame = context.pages[-1]
-        # Clear password input to reset validation
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/form/div/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('')
+        # Interact with the page elements to simulate user flow
+        # -> Already signed in as the customer through the stored session (harness.auth), so the test starts on the account page.
         
 
+        # -> Open the 'Security' tab of the account page.
         frame = context.pages[-1]
-        # Re-enter new password to enable sign-in button
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/form/div/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('NewPassword123!')
+        # Click the 'Security' tab
+        elem = frame.get_by_role('tab', name='Security')
+        await actions.click(elem)
         
 
         # --> Assertions to verify final state
@@ -228,15 +32,7 @@ async def run_test():
             await expect(frame.locator('text=Two-Factor Authentication Enabled Successfully').first).to_be_visible(timeout=1000)
         except AssertionError:
             raise AssertionError("Test case failed: Password update and two-factor authentication enabling did not complete successfully as per the test plan.")
-        await asyncio.sleep(5)
-    
-    finally:
-        if context:
-            await context.close()
-        if browser:
-            await browser.close()
-        if pw:
-            await pw.stop()
-            
-asyncio.run(run_test())
-    
\ No newline at end of file
+
+
+if __name__ == "__main__":
+    asyncio.run(run_test())
@@ -1,63 +1,30 @@
 import asyncio
-from playwright import async_api
 from playwright.async_api import expect
 
-async def run_test():
-    pw = None
-    browser = None
-    context = None
-    
-    try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
-        context.set_default_timeout(5000)
-        
+from harness import actions, config, locators, session
+
+
+async def run_test(context=None):
+    async with session.test_context(context) as context:
         # Open a new page in the browser context
-        page = await context.new_page()
+        page = await session.new_page(context)
         
-        # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:8080", wait_until="commit", timeout=10000)
-        
-        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
-        try:
-            await page.wait_for_load_state("domcontentloaded", timeout=3000)
-        except async_api.Error:
-            pass
-        
-        # Iterate through all iframes and wait for them to load as well
-        for frame in page.frames:
-            try:
-                await frame.wait_for_load_state("domcontentloaded", timeout=3000)
-            except async_api.Error:
-                pass
+        # Navigate to your target URL and wait for the page and its iframes to load
+        await session.open_home(page)
         
         # Interact with the page elements to simulate user flow
         # -> Click on 'Shop' navigation menu to verify SPA route loading without full page reload.
         frame = context.pages[-1]
         # Click on 'Shop' navigation menu link to navigate to Shop page
-        elem = frame.locator('xpath=html/body/div/div/header/div/nav/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        elem = await locators.resolve(frame, 'xpath=html/body/div/div/header/div/nav/a')
+        await actions.click(elem)
         
 
         # -> Click on 'About' navigation menu to verify SPA route loading without full page reload.
         frame = context.pages[-1]
         # Click on 'About' navigation menu link to navigate to About page
-        elem = frame.locator('xpath=html/body/div/div/header/div/nav/a[2]').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        elem = await locators.resolve(frame, 'xpath=html/body/div/div/header/div/nav/a[2]')
+        await actions.click(elem)
         
 
         # -> Test navigation responsiveness on desktop, tablet, and mobile screen sizes.
@@ -65,18 +32,15 @@ async def run_test():
         
 
         # -> Test navigation responsiveness on desktop screen size by resizing viewport and verifying menu behavior.
-        await page.goto('http://localhost:8080/about', timeout=10000)
-        await asyncio.sleep(3)
+        await actions.goto(page, config.url('/about'))
         
 
         # -> Resize viewport to tablet size and test navigation menu responsiveness and SPA route loading.
-        await page.goto('http://localhost:8080/about', timeout=10000)
-        await asyncio.sleep(3)
+        await actions.goto(page, config.url('/about'))
         
 
         # -> Resize viewport to tablet size and test navigation menu responsiveness and SPA route loading.
-        await page.goto('http://localhost:8080/about', timeout=10000)
-        await asyncio.sleep(3)
+        await actions.goto(page, config.url('/about'))
         
 
         # -> Resize viewport to tablet size and test navigation menu responsiveness and SPA route loading.
@@ -86,8 +50,8 @@ async def run_test():
         # -> Resize viewport to tablet size and test navigation menu responsiveness and SPA route loading.
         frame = context.pages[-1]
         # Click Toggle menu to test responsive navigation on tablet size
-        elem = frame.locator('xpath=html/body/div').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        elem = await locators.resolve(frame, 'xpath=html/body/div')
+        await actions.click(elem)
         
 
         # --> Assertions to verify final state
@@ -96,15 +60,7 @@ async def run_test():
             await expect(frame.locator('text=Full Page Reload Detected').first).to_be_visible(timeout=1000)
         except AssertionError:
             raise AssertionError("Test plan execution failed: SPA routes and navigation menus did not load views instantly without full page reloads, or navigation was not responsive on multiple devices.")
-        await asyncio.sleep(5)
-    
-    finally:
-        if context:
-            await context.close()
-        if browser:
-            await browser.close()
-        if pw:
-            await pw.stop()
-            
-asyncio.run(run_test())
-    
\ No newline at end of file
+
+
+if __name__ == "__main__":
+    asyncio.run(run_test())
@@ -1,127 +1,97 @@
 import asyncio
-from playwright import async_api
 from playwright.async_api import expect
 
-async def run_test():
-    pw = None
-    browser = None
-    context = None
-    
-    try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
-        context.set_default_timeout(5000)
-        
+from harness import actions, blocking, locators, session
+
+# Checks the analytics traffic itself: keep every third-party request.
+THIRD_PARTY = blocking.ALL
+
+
+async def run_test(context=None):
+    async with session.test_context(context) as context:
         # Open a new page in the browser context
-        page = await context.new_page()
-        
-        # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:8080", wait_until="commit", timeout=10000)
-        
-        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
-        try:
-            await page.wait_for_load_state("domcontentloaded", timeout=3000)
-        except async_api.Error:
-            pass
+        page = await session.new_page(context)
         
-        # Iterate through all iframes and wait for them to load as well
-        for frame in page.frames:
-            try:
-                await frame.wait_for_load_state("domcontentloaded", timeout=3000)
-            except async_api.Error:
-                pass
+        # Navigate to your target URL and wait for the page and its iframes to load
+        await session.open_home(page)
         
         # Interact with the page elements to simulate user flow
         # -> Click on the 'Shop' link to navigate to the shop page and trigger page view analytics.
         frame = context.pages[-1]
         # Click on the 'Shop' link to navigate to the shop page
-        elem = frame.locator('xpath=html/body/div/div/header/div/nav/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        elem = await locators.resolve(frame, 'xpath=html/body/div/div/header/div/nav/a')
+        await actions.click(elem)
         
 
         # -> Click 'Add to Cart' on the first product (Redwine soap) to trigger an analytics event for adding a product.
         frame = context.pages[-1]
         # Click 'Add to Cart' on the first product (Redwine soap) to trigger analytics event
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div/div[2]/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        elem = await locators.resolve(frame, 'xpath=html/body/div/div/main/div/div/div/div[2]/a')
+        await actions.click(elem)
         
 
         # -> Click the 'Add to Cart' button on the 'Redwine soap' product detail page to trigger the analytics event.
         frame = context.pages[-1]
         # Click the 'Add to Cart' button on the 'Redwine soap' product detail page
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div[4]/div/div/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        elem = await locators.resolve(frame, 'xpath=html/body/div/div/main/div/div/div[4]/div/div/button')
+        await actions.click(elem)
         
 
         # -> Extract network or analytics event data to confirm 'Add to Cart' event was sent. Then, click 'Checkout' to trigger checkout page view and related analytics events.
         frame = context.pages[-1]
         # Click 'Checkout' button to navigate to checkout page and trigger checkout page view analytics event
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div[4]/div/div/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        elem = await locators.resolve(frame, 'xpath=html/body/div/div/main/div/div/div[4]/div/div/a')
+        await actions.click(elem)
         
 
         # -> Fill in the checkout form fields with valid data to simulate user checkout and trigger analytics events for form interaction and checkout progression.
         frame = context.pages[-1]
         # Input full name in checkout form
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div[2]/div/form/div/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('Test User')
+        elem = await locators.resolve(frame, 'xpath=html/body/div/div/main/div/div/div[2]/div/form/div/div/div/input')
+        await actions.fill(elem, 'Test User')
         
 
         frame = context.pages[-1]
         # Input email in checkout form
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div[2]/div/form/div/div/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('testuser@example.com')
+        elem = await locators.resolve(frame, 'xpath=html/body/div/div/main/div/div/div[2]/div/form/div/div/div[2]/input')
+        await actions.fill(elem, 'testuser@example.com')
         
 
         frame = context.pages[-1]
         # Input street address in checkout form
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div[2]/div/form/div[3]/div/div/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('123 Test Street')
+        elem = await locators.resolve(frame, 'xpath=html/body/div/div/main/div/div/div[2]/div/form/div[3]/div/div/div/input')
+        await actions.fill(elem, '123 Test Street')
         
 
         frame = context.pages[-1]
         # Input city in checkout form
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div[2]/div/form/div[3]/div/div[2]/div/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('Test City')
+        elem = await locators.resolve(frame, 'xpath=html/body/div/div/main/div/div/div[2]/div/form/div[3]/div/div[2]/div/input')
+        await actions.fill(elem, 'Test City')
         
 
         frame = context.pages[-1]
         # Input state in checkout form
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div[2]/div/form/div[3]/div/div[2]/div[2]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('Test State')
+        elem = await locators.resolve(frame, 'xpath=html/body/div/div/main/div/div/div[2]/div/form/div[3]/div/div[2]/div[2]/input')
+        await actions.fill(elem, 'Test State')
         
 
         frame = context.pages[-1]
         # Input ZIP code in checkout form
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div[2]/div/form/div[3]/div/div[2]/div[3]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('123456')
+        elem = await locators.resolve(frame, 'xpath=html/body/div/div/main/div/div/div[2]/div/form/div[3]/div/div[2]/div[3]/input')
+        await actions.fill(elem, '123456')
         
 
         frame = context.pages[-1]
         # Input phone number in checkout form
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div[2]/div/form/div[3]/div/div[3]/input').nth(0)
-        await page.wait_for_timeout(3000); await elem.fill('9876543210')
+        elem = await locators.resolve(frame, 'xpath=html/body/div/div/main/div/div/div[2]/div/form/div[3]/div/div[3]/input')
+        await actions.fill(elem, '9876543210')
         
 
         # -> Click the 'Complete Purchase' button to submit the checkout form and trigger final analytics events for purchase completion.
         frame = context.pages[-1]
         # Click the 'Complete Purchase' button to submit the checkout form and trigger purchase analytics events
-        elem = frame.locator('xpath=html/body/div/div/main/div/div/div[2]/div/form/button').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        elem = await locators.resolve(frame, 'xpath=html/body/div/div/main/div/div/div[2]/div/form/button')
+        await actions.click(elem)
         
 
         # -> Scroll down to check for any additional analytics event logs or tracking scripts related to payment completion or confirmation.
@@ -159,7 +129,7 @@ async def run_test():
         await expect(frame.locator('text=Live payments enabled').first).to_be_visible(timeout=30000)
         await expect(frame.locator('text=Processing...').first).to_be_visible(timeout=30000)
         await expect(frame.locator('text=Secure checkout powered by Razorpay').first).to_be_visible(timeout=30000)
-        await expect(frame.locator('text=Karigai was founded with a simple mission to create beautiful, nourishing handmade soaps that don't compromise on quality or sustainability.').first).to_be_visible(timeout=30000)
+        await expect(frame.locator("text=Karigai was founded with a simple mission to create beautiful, nourishing handmade soaps that don't compromise on quality or sustainability.").first).to_be_visible(timeout=30000)
         await expect(frame.locator('text=All Products').first).to_be_visible(timeout=30000)
         await expect(frame.locator('text=Bestsellers').first).to_be_visible(timeout=30000)
         await expect(frame.locator('text=New Arrivals').first).to_be_visible(timeout=30000)
@@ -172,15 +142,7 @@ async def run_test():
         await expect(frame.locator('text=Privacy').first).to_be_visible(timeout=30000)
         await expect(frame.locator('text=Terms').first).to_be_visible(timeout=30000)
         await expect(frame.locator('text=Refunds').first).to_be_visible(timeout=30000)
-        await asyncio.sleep(5)
-    
-    finally:
-        if context:
-            await context.close()
-        if browser:
-            await browser.close()
-        if pw:
-            await pw.stop()
-            
-asyncio.run(run_test())
-    
\ No newline at end of file
+
+
+if __name__ == "__main__":
+    asyncio.run(run_test())
@@ -1,49 +1,16 @@
 import asyncio
-from playwright import async_api
 from playwright.async_api import expect
 
-async def run_test():
-    pw = None
-    browser = None
-    context = None
-    
-    try:
-        # Start a Playwright session in asynchronous mode
-        pw = await async_api.async_playwright().start()
-        
-        # Launch a Chromium browser in headless mode with custom arguments
-        browser = await pw.chromium.launch(
-            headless=True,
-            args=[
-                "--window-size=1280,720",         # Set the browser window size
-                "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
-                "--ipc=host",                     # Use host-level IPC for better stability
-                "--single-process"                # Run the browser in a single process mode
-            ],
-        )
-        
-        # Create a new browser context (like an incognito window)
-        context = await browser.new_context()
-        context.set_default_timeout(5000)
-        
+from harness import actions, locators, session
+
+
+async def run_test(context=None):
+    async with session.test_context(context) as context:
         # Open a new page in the browser context
-        page = await context.new_page()
+        page = await session.new_page(context)
         
-        # Navigate to your target URL and wait until the network request is committed
-        await page.goto("http://localhost:8080", wait_until="commit", timeout=10000)
-        
-        # Wait for the main page to reach DOMContentLoaded state (optional for stability)
-        try:
-            await page.wait_for_load_state("domcontentloaded", timeout=3000)
-        except async_api.Error:
-            pass
-        
-        # Iterate through all iframes and wait for them to load as well
-        for frame in page.frames:
-            try:
-                await frame.wait_for_load_state("domcontentloaded", timeout=3000)
-            except async_api.Error:
-                pass
+        # Navigate to your target URL and wait for the page and its iframes to load
+        await session.open_home(page)
         
         # Interact with the page elements to simulate user flow
         # -> Locate and navigate to the page containing the carousel component.
@@ -53,8 +20,8 @@ async def run_test():
         # -> Click on 'All Products' link to navigate to the products page.
         frame = context.pages[-1]
         # Click on 'All Products' link
-        elem = frame.locator('xpath=html/body/div/div/footer/div/div/div[2]/ul/li/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        elem = await locators.resolve(frame, 'xpath=html/body/div/div/footer/div/div/div[2]/ul/li/a')
+        await actions.click(elem)
         
 
         # -> Search or navigate to a page containing the carousel component.
@@ -64,8 +31,8 @@ async def run_test():
         # -> Navigate to a page or section containing the carousel component to verify its functionality.
         frame = context.pages[-1]
         # Click on 'All Products' link to explore more products and possibly find carousel or other components
-        elem = frame.locator('xpath=html/body/div/div/footer/div/div/div[2]/ul/li/a').nth(0)
-        await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+        elem = await locators.resolve(frame, 'xpath=html/body/div/div/footer/div/div/div[2]/ul/li/a')
+        await actions.click(elem)
         
 
         # --> Assertions to verify final state
@@ -74,15 +41,7 @@ async def run_test():
             await expect(frame.locator('text=Carousel Component Loaded Successfully').first).to_be_visible(timeout=3000)
         except AssertionError:
             raise AssertionError('Test case failed: The reusable UI components including carousel, calendar, toast notifications, and image optimizer did not render or function correctly as per the test plan.')
-        await asyncio.sleep(5)
-    
-    finally:
-        if context:
-            await context.close()
-        if browser:
-            await browser.close()
-        if pw:
-            await pw.stop()
-            
-asyncio.run(run_test())
-    
\ No newline at end of file
+
+
+if __name__ == "__main__":
+    asyncio.run(run_test())
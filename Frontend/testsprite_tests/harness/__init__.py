@@ -0,0 +1,6 @@
+"""Shared harness for the TestSprite TC scripts.
+
+The generated TCxxx scripts stay runnable on their own (``python TC001_...py``);
+the modules in this package let them share a browser, run concurrently and
+record their results.
+"""
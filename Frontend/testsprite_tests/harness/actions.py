@@ -0,0 +1,123 @@
+"""Event-driven replacements for the fixed sleeps in the generated scripts.
+
+The scripts used to ``wait_for_timeout(3000)`` before every click or fill and
+``asyncio.sleep(3)`` after every navigation. Playwright already waits for an
+element to be actionable, so what was really being waited for is the network
+traffic an action kicks off (React Query fetches, PocketBase calls, route
+chunks). Each helper here performs the action and then waits until the page
+has no requests in flight, which usually takes milliseconds.
+"""
+import asyncio
+import contextlib
+import weakref
+
+from . import config
+
+# Long-lived connections never "finish" and must not hold up settling.
+_IGNORED_RESOURCE_TYPES = {"eventsource", "websocket"}
+_IGNORED_URL_PARTS = ("/api/realtime",)
+
+_trackers = weakref.WeakKeyDictionary()
+
+# Per-context step observers (harness.interactions): ``observer(page, kind,
+# locator)`` returns an async context manager wrapped around a click or fill.
+_observers = weakref.WeakKeyDictionary()
+
+
+class NetworkTracker:
+    """Counts a page's in-flight requests."""
+
+    def __init__(self, page):
+        self.inflight = set()
+        self.idle = asyncio.Event()
+        self.idle.set()
+        page.on("request", self._started)
+        page.on("requestfinished", self._done)
+        page.on("requestfailed", self._done)
+
+    def _started(self, request):
+        if request.resource_type in _IGNORED_RESOURCE_TYPES:
+            return
+        if any(part in request.url for part in _IGNORED_URL_PARTS):
+            return
+        self.inflight.add(request)
+        self.idle.clear()
+
+    def _done(self, request):
+        self.inflight.discard(request)
+        if not self.inflight:
+            self.idle.set()
+
+    async def wait_idle(self, quiet_ms, timeout_ms):
+        """Wait for ``quiet_ms`` without requests; False if ``timeout_ms`` ran out."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout_ms / 1000
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return False
+            try:
+                await asyncio.wait_for(self.idle.wait(), remaining)
+            except asyncio.TimeoutError:
+                return False
+            await asyncio.sleep(quiet_ms / 1000)
+            if self.idle.is_set():
+                return True
+
+
+def track(page):
+    """Start tracking ``page``'s requests (idempotent)."""
+    tracker = _trackers.get(page)
+    if tracker is None:
+        tracker = _trackers[page] = NetworkTracker(page)
+    return tracker
+
+
+async def settle(page, quiet_ms=None, timeout_ms=None):
+    """Wait until ``page`` has been network-idle for a short quiet window.
+
+    Never raises: if the page keeps polling, the next action's own
+    actionability checks still apply.
+    """
+    return await track(page).wait_idle(
+        config.SETTLE_QUIET_MS if quiet_ms is None else quiet_ms,
+        config.SETTLE_TIMEOUT_MS if timeout_ms is None else timeout_ms,
+    )
+
+
+def observe(context, observer):
+    """Wrap every :func:`click` and :func:`fill` in ``context`` with ``observer`` (None removes it)."""
+    if observer is None:
+        _observers.pop(context, None)
+    else:
+        _observers[context] = observer
+
+
+def _observed(page, kind, locator):
+    observer = _observers.get(page.context)
+    return observer(page, kind, locator) if observer else contextlib.nullcontext()
+
+
+async def click(locator, timeout=None):
+    """Click once the element is actionable, then let the page settle."""
+    page = locator.page
+    track(page)
+    async with _observed(page, "click", locator):
+        await locator.click(timeout=timeout or config.DEFAULT_TIMEOUT_MS)
+        await settle(page)
+
+
+async def fill(locator, value, timeout=None):
+    """Fill once the element is editable, then let the page settle."""
+    page = locator.page
+    track(page)
+    async with _observed(page, "fill", locator):
+        await locator.fill(value, timeout=timeout or config.DEFAULT_TIMEOUT_MS)
+        await settle(page)
+
+
+async def goto(page, url, timeout=None):
+    """Navigate, wait for the load event, then for the SPA's data fetches."""
+    track(page)
+    await page.goto(url, timeout=timeout or config.NAVIGATION_TIMEOUT_MS)
+    await settle(page)
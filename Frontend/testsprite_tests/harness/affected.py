@@ -0,0 +1,199 @@
+"""Pick the TC scripts a change can affect.
+
+tmp/code_summary.json maps features (Checkout and Payments, Cart, Orders,
+...) to their source files, and feature_tests.json maps those features to TC
+scripts. A changed file selects a feature's tests when it is one of the
+feature's files, or when a feature file imports it directly or transitively.
+The import graph is read from the ``import``/``export``/``import()``
+statements under Frontend/src, resolving the ``@/`` alias. Changes to the
+build setup, the app shell or the harness select everything, and so do
+source files the shell imports without going through a feature file
+(providers, toasters, MetaPixel) and source files no feature reaches.
+Changes to one TC script select that script. Changes outside Frontend
+select nothing.
+
+    python -m harness.affected                        # diff against main
+    python -m harness.affected --base origin/main --explain
+    python -m harness.affected --run -- -j 4 --pocketbase-stub
+"""
+import argparse
+import collections
+import fnmatch
+import json
+import re
+import subprocess
+import sys
+
+from . import config
+
+FRONTEND_DIR = config.TESTS_DIR.parent
+SOURCE_SUFFIXES = (".ts", ".tsx", ".js", ".jsx")
+ALIASES = {"@/": "src/"}
+
+# Files every test depends on: a change here runs the whole suite.
+GLOBAL_PATTERNS = [
+    "package.json", "package-lock.json", "bun.lockb", "index.html",
+    "vite.config.ts", "tailwind.config.ts", "postcss.config.js", "tsconfig*.json",
+    "src/main.tsx", "src/App.tsx", "src/routes.tsx", "src/index.css", "src/lib/pocketbase.ts",
+    "testsprite_tests/harness/*", "testsprite_tests/harness/fixtures/*",
+]
+
+_IMPORT_RE = re.compile(
+    r"""(?:\bimport\s+(?:[\w*{}\s,]+\s+from\s+)?|\bexport\s+[\w*{}\s,]+\s+from\s+|\bimport\s*\(\s*|\brequire\s*\(\s*)"""
+    r"""['"]([^'"]+)['"]""",
+)
+_SCRIPT_RE = re.compile(r"^testsprite_tests/(TC\d{3})_[^/]*\.py$")
+
+
+def changed_files(base="main", include_worktree=True):
+    """Frontend-relative paths changed since the merge base with ``base``."""
+    root = subprocess.run(
+        ["git", "rev-parse", "--show-toplevel"], cwd=FRONTEND_DIR, capture_output=True, text=True, check=True,
+    ).stdout.strip()
+    commands = [["git", "diff", "--name-only", f"{base}...HEAD"]]
+    if include_worktree:
+        commands.append(["git", "diff", "--name-only", "HEAD"])
+    paths = set()
+    for command in commands:
+        output = subprocess.run(command, cwd=root, capture_output=True, text=True, check=True).stdout
+        paths.update(line for line in output.splitlines() if line)
+    prefix = FRONTEND_DIR.relative_to(root).as_posix() + "/"
+    return sorted(path.removeprefix(prefix) for path in paths if path.startswith(prefix))
+
+
+def _resolve(importer, specifier):
+    """Frontend-relative source path an import points at, or None for packages."""
+    for alias, target in ALIASES.items():
+        if specifier.startswith(alias):
+            base = FRONTEND_DIR / target / specifier[len(alias):]
+            break
+    else:
+        if not specifier.startswith("."):
+            return None
+        base = (FRONTEND_DIR / importer).parent / specifier
+    candidates = [base] if base.suffix in SOURCE_SUFFIXES else []
+    candidates += [base.with_name(base.name + suffix) for suffix in SOURCE_SUFFIXES]
+    candidates += [base / f"index{suffix}" for suffix in SOURCE_SUFFIXES]
+    for candidate in candidates:
+        if candidate.is_file():
+            return candidate.resolve().relative_to(FRONTEND_DIR).as_posix()
+    return None
+
+
+def import_graph(source_dir=None):
+    """file -> set of files it imports, for every source file under src/."""
+    source_dir = source_dir or FRONTEND_DIR / "src"
+    graph = {}
+    for path in source_dir.rglob("*"):
+        if path.suffix not in SOURCE_SUFFIXES or not path.is_file():
+            continue
+        name = path.relative_to(FRONTEND_DIR).as_posix()
+        text = path.read_text(encoding="utf-8", errors="replace")
+        graph[name] = {target for target in (_resolve(name, spec) for spec in _IMPORT_RE.findall(text)) if target}
+    return graph
+
+
+def dependents(graph, files, stop=()):
+    """``files`` plus everything that imports them, transitively.
+
+    Files in ``stop`` are included but not followed further.
+    """
+    importers = collections.defaultdict(set)
+    for source, targets in graph.items():
+        for target in targets:
+            importers[target].add(source)
+    seen = set(files)
+    queue = collections.deque(files)
+    while queue:
+        path = queue.popleft()
+        if path in stop:
+            continue
+        for importer in importers[path]:
+            if importer not in seen:
+                seen.add(importer)
+                queue.append(importer)
+    return seen
+
+
+def load_features(summary_path=None, tests_path=None):
+    """[(feature name, files, test ids)] from code_summary.json and feature_tests.json."""
+    summary = json.loads((summary_path or config.CODE_SUMMARY_PATH).read_text(encoding="utf-8"))
+    tests = json.loads((tests_path or config.FEATURE_TESTS_PATH).read_text(encoding="utf-8"))
+    return [(feature["name"], feature["files"], tests.get(feature["name"], [])) for feature in summary["features"]]
+
+
+def select(changed, features, graph, all_tests):
+    """Test ids to run for ``changed`` and the reason each was picked."""
+    reasons = collections.defaultdict(list)
+    sources = []
+    for path in changed:
+        script = _SCRIPT_RE.match(path)
+        if script:
+            reasons[script[1]].append(path)
+        elif any(fnmatch.fnmatch(path, pattern) for pattern in GLOBAL_PATTERNS):
+            for test_id in all_tests:
+                reasons[test_id].append(f"{path} (global)")
+        elif path.startswith("src/"):
+            sources.append(path)
+
+    # For each changed source, which feature files reach it. Importers that
+    # reach the app shell without passing a feature file run on every page.
+    feature_files = {file for _, files, _ in features for file in files}
+    for path in sources:
+        shell = sorted(
+            file for file in dependents(graph, [path], stop=feature_files)
+            if any(fnmatch.fnmatch(file, pattern) for pattern in GLOBAL_PATTERNS)
+        )
+        if shell:
+            for test_id in all_tests:
+                reasons[test_id].append(f"{path} -> {shell[0]} (global)")
+            continue
+        reached = dependents(graph, [path])
+        selected = False
+        for name, files, test_ids in features:
+            hits = reached.intersection(files)
+            if hits and test_ids:
+                selected = True
+                for test_id in test_ids:
+                    reasons[test_id].append(f"{path} -> {name} ({min(hits)})")
+        if not selected:
+            for test_id in all_tests:
+                reasons[test_id].append(f"{path} (no feature reaches it)")
+    return {test_id: reasons[test_id] for test_id in sorted(reasons)}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base", default="main", help="git ref to diff against (default: %(default)s)")
+    parser.add_argument("--files", nargs="+", help="Frontend-relative changed paths instead of git diff")
+    parser.add_argument("--committed-only", action="store_true", help="ignore uncommitted changes")
+    parser.add_argument("--explain", action="store_true", help="show why each test was selected")
+    parser.add_argument("--run", action="store_true", help="run the selection with harness.runner")
+    parser.add_argument("runner_args", nargs=argparse.REMAINDER, help="after --, passed on to the runner")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    from . import runner
+
+    changed = args.files or changed_files(args.base, not args.committed_only)
+    all_tests = [script.id for script in runner.discover()]
+    selection = select(changed, load_features(), import_graph(), all_tests)
+
+    print(f"{len(changed)} changed files -> {len(selection)}/{len(all_tests)} tests: {' '.join(selection) or '(none)'}")
+    if args.explain:
+        for test_id, reasons in selection.items():
+            print(f"  {test_id}")
+            for reason in reasons[:5]:
+                print(f"      {reason}")
+            if len(reasons) > 5:
+                print(f"      ... {len(reasons) - 5} more")
+    if not args.run or not selection:
+        return 0
+    runner_args = args.runner_args[1:] if args.runner_args[:1] == ["--"] else args.runner_args
+    return runner.main([*selection, *runner_args])
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,252 @@
+"""Traces and screenshots kept only for failing tests.
+
+The :class:`FailureArtifacts` instrument turns on Playwright tracing (DOM
+snapshots and screencast frames) for a context and cuts the trace into one
+chunk per page load. Chunks go to a per-context ring buffer on tmpfs
+(``/dev/shm`` when available) holding the last ``ARTIFACT_TRACE_CHUNKS``
+loads, so a long test never holds more than a few pages of trace. When the
+test passes the buffer is dropped and nothing reaches the disk. When it
+fails, the ring, a screenshot of every open page and the error go into one
+zip under tmp/artifacts/. The zips are kept below ``ARTIFACTS_MAX_BYTES``,
+and the least recently used ones are evicted first.
+
+Playwright also keeps the resources of a running trace (snapshots, frames)
+in the browser's ``traces_dir``, by default a temp dir on disk. The runner
+launches the browser with one from :func:`browser_traces`, on tmpfs as
+well; each test's files are deleted from it when the test ends.
+
+Video is not recorded. Playwright writes video for every context from the
+moment it is created, pass or fail. The trace's screencast frames show the
+same thing in ``playwright show-trace``.
+
+    python -m harness.runner --failure-artifacts
+    python -m harness.artifacts list
+    python -m harness.artifacts open TC004      # unpack the latest, print the show-trace command
+"""
+import argparse
+import asyncio
+import collections
+import contextlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import zipfile
+from datetime import datetime
+from pathlib import Path
+
+from playwright import async_api
+
+from . import config
+
+
+def scratch_dir(prefix="testsprite-trace-"):
+    """Where trace chunks wait for the verdict: tmpfs if the host has one."""
+    shm = Path("/dev/shm")
+    base = shm if shm.is_dir() and os.access(shm, os.W_OK) else None
+    return Path(tempfile.mkdtemp(prefix=prefix, dir=base))
+
+
+@contextlib.contextmanager
+def browser_traces(enabled=True):
+    """A scratch dir for ``chromium.launch(traces_dir=...)``, removed afterwards (None when not ``enabled``)."""
+    if not enabled:
+        yield None
+        return
+    path = scratch_dir("testsprite-traces-")
+    try:
+        yield path
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+class FailureArtifacts:
+    """Runner instrument: trace ring buffer per context, persisted on failure."""
+
+    def __init__(self, chunks=None, traces_dir=None):
+        self.chunks = chunks or config.ARTIFACT_TRACE_CHUNKS
+        self.traces_dir = traces_dir     # the browser's, from browser_traces()
+        self.ring = collections.deque()
+        self.scratch = None
+        self.context = None
+        self._sequence = 0
+        self._lock = asyncio.Lock()
+        self._pending = set()
+        self._listeners = []
+
+    async def attach(self, context, script=None):
+        self.context = context
+        self.scratch = scratch_dir()
+        await context.tracing.start(
+            name=self.scratch.name, screenshots=True, snapshots=True, title=getattr(script, "title", None),
+        )
+        await context.tracing.start_chunk()
+        context.on("page", self._watch)
+        for page in context.pages:
+            self._watch(page)
+
+    def _watch(self, page):
+        def listener(_):
+            self._track(self._rotate())
+        page.on("load", listener)
+        self._listeners.append((page, listener))
+
+    def _track(self, coroutine):
+        task = asyncio.ensure_future(coroutine)
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _rotate(self):
+        """Close the current chunk into the ring and start a new one."""
+        async with self._lock:
+            try:
+                await self._stop_chunk()
+                await self.context.tracing.start_chunk()
+            except async_api.Error:
+                pass      # the context is closing
+
+    async def _stop_chunk(self):
+        self._sequence += 1
+        path = self.scratch / f"trace-{self._sequence:03d}.zip"
+        await self.context.tracing.stop_chunk(path=path)
+        self.ring.append(path)
+        while len(self.ring) > self.chunks:
+            self.ring.popleft().unlink(missing_ok=True)
+
+    async def finish(self, script, outcome):
+        # Unhook first: a pooled context goes on to the next test.
+        self.context.remove_listener("page", self._watch)
+        for page, listener in self._listeners:
+            page.remove_listener("load", listener)
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+        try:
+            async with self._lock:
+                if outcome["status"] == "PASSED":
+                    await self.context.tracing.stop_chunk()
+                    await self.context.tracing.stop()
+                    return
+                await self._stop_chunk()
+                await self.context.tracing.stop()
+                screenshots = await self._screenshots()
+            path = save(script.id, self.ring, screenshots, outcome)
+            prune(keep=[path])
+            outcome["artifacts"] = str(path.relative_to(config.TESTS_DIR))
+        finally:
+            shutil.rmtree(self.scratch, ignore_errors=True)
+            if self.traces_dir is not None:
+                # The chunks in the ring are self-contained; what tracing left in
+                # the browser's dir is not needed, pass or fail.
+                for path in Path(self.traces_dir).glob(f"{self.scratch.name}*"):
+                    path.unlink(missing_ok=True)
+
+    async def _screenshots(self):
+        shots = []
+        for index, page in enumerate(self.context.pages):
+            try:
+                shots.append((f"page-{index + 1}.png", await page.screenshot(full_page=True, timeout=config.DEFAULT_TIMEOUT_MS)))
+            except async_api.Error:
+                continue
+        return shots
+
+
+def save(test_id, traces, screenshots, outcome):
+    """Bundle one failure into tmp/artifacts/<id>-<timestamp>.zip."""
+    config.ARTIFACTS_DIR.mkdir(parents=True, exist_ok=True)
+    path = config.ARTIFACTS_DIR / f"{test_id}-{datetime.now():%Y%m%d-%H%M%S-%f}.zip"
+    partial = path.with_suffix(".zip.partial")
+    with zipfile.ZipFile(partial, "w", zipfile.ZIP_DEFLATED) as bundle:
+        # Traces and PNGs are compressed already; store them as they are.
+        for trace in traces:
+            bundle.write(trace, trace.name, compress_type=zipfile.ZIP_STORED)
+        for name, data in screenshots:
+            bundle.writestr(name, data, compress_type=zipfile.ZIP_STORED)
+        bundle.writestr("error.txt", outcome.get("error") or "")
+        bundle.writestr("outcome.json", json.dumps(outcome, indent=2, ensure_ascii=False))
+    partial.replace(path)
+    return path
+
+
+def stored():
+    """Kept bundles, most recently used first."""
+    if not config.ARTIFACTS_DIR.is_dir():
+        return []
+    return sorted(config.ARTIFACTS_DIR.glob("*.zip"), key=lambda path: path.stat().st_mtime, reverse=True)
+
+
+def prune(max_bytes=None, keep=()):
+    """Evict least recently used bundles until the total fits ``max_bytes``.
+
+    Bundles in ``keep`` (the one just written) are never evicted, even when
+    they alone are over the cap; older ones go instead.
+    """
+    max_bytes = config.ARTIFACTS_MAX_BYTES if max_bytes is None else max_bytes
+    keep = {Path(path) for path in keep}
+    paths = stored()
+    total = sum(path.stat().st_size for path in paths if path in keep)
+    removed = []
+    for path in paths:
+        if path in keep:
+            continue
+        size = path.stat().st_size
+        if total + size > max_bytes:
+            path.unlink(missing_ok=True)
+            shutil.rmtree(path.with_suffix(""), ignore_errors=True)    # unpacked by "open"
+            removed.append(path)
+        else:
+            total += size
+    return removed
+
+
+def touch(path):
+    """Mark a bundle as used so eviction keeps it longer."""
+    now = time.time()
+    os.utime(path, (now, now))
+
+
+def open_latest(test_id):
+    """Unpack the newest bundle for ``test_id`` next to it and return the folder."""
+    for path in stored():
+        if path.name.startswith(f"{test_id.upper()}-"):
+            touch(path)
+            target = path.with_suffix("")
+            with zipfile.ZipFile(path) as bundle:
+                bundle.extractall(target)
+            return target
+    return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list", help="kept bundles, most recently used first")
+    open_parser = commands.add_parser("open", help="unpack the latest bundle of a test")
+    open_parser.add_argument("test")
+    prune_parser = commands.add_parser("prune", help="apply the size cap now")
+    prune_parser.add_argument("--max-mb", type=float, help=f"cap in MB (default: {config.ARTIFACTS_MAX_BYTES >> 20})")
+    args = parser.parse_args(argv)
+
+    if args.command == "list":
+        paths = stored()
+        for path in paths:
+            print(f"{path.stat().st_size / 1024:9.0f} KB  {datetime.fromtimestamp(path.stat().st_mtime):%Y-%m-%d %H:%M}  {path.name}")
+        print(f"{len(paths)} bundles, {sum(path.stat().st_size for path in paths) / 2**20:.1f} MB of {config.ARTIFACTS_MAX_BYTES / 2**20:.0f} MB")
+    elif args.command == "open":
+        target = open_latest(args.test)
+        if target is None:
+            print(f"No artifacts for {args.test}", file=sys.stderr)
+            return 1
+        print(target)
+        for trace in sorted(target.glob("trace-*.zip")):
+            print(f"  playwright show-trace {trace}")
+    else:
+        max_bytes = None if args.max_mb is None else int(args.max_mb * 2**20)
+        for path in prune(max_bytes):
+            print(f"removed {path.name}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
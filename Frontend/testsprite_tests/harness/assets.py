@@ -0,0 +1,338 @@
+"""Asset weight per storefront route, checked against asset_budgets.json.
+
+scripts/optimize-images.js writes WebP/AVIF variants and scripts/optimize-build.js
+splits chunks and checks image width/height attributes. This crawler checks
+what real pages end up downloading. It visits:
+
+- the routes listed in asset_budgets.json (with ``role`` when they need a
+  signed-in user);
+- the routes the TC scripts reached in their last run (from tmp/vitals/);
+- the first ``--products`` product detail pages linked from /shop.
+
+Each route is loaded cold in its own context and scrolled to the bottom, so
+lazy images load too. For each route the crawler records JS, CSS, image and
+font bytes (compressed on the wire, and decoded) and flags images that:
+
+- are not WebP/AVIF/SVG above ``minBytesForFormatCheck``;
+- are larger than ``maxImageBytes``;
+- are more than ``maxOversizeRatio`` times wider and taller than their
+  rendered size needs (at the device pixel ratio);
+- lack width/height attributes.
+
+Per-route budgets (``default`` merged with ``pages``, where ``:id``-style
+segments match anything) apply to compressed bytes. Any route over budget
+makes the run fail.
+
+    python -m harness.assets                   # crawl and check, exit 1 when over budget
+    python -m harness.assets /shop /cart -j 2 --products 0
+
+Rows and flagged images also go to tmp/assets/<timestamp>.json.
+"""
+import argparse
+import asyncio
+import json
+import re
+import sys
+import urllib.parse
+from datetime import datetime
+from pathlib import Path
+
+from playwright import async_api
+
+from . import actions, config, locators, session
+
+KINDS = {"script": "js", "stylesheet": "css", "image": "image", "font": "font"}
+KIND_ORDER = ["js", "css", "image", "font", "other"]
+BUDGET_KEYS = {"js": "maxJsBytes", "css": "maxCssBytes", "image": "maxImageBytes", "font": "maxFontBytes"}
+
+SCROLL_SCRIPT = """
+async () => {
+  for (let y = 0; y < document.documentElement.scrollHeight; y += innerHeight) {
+    scrollTo(0, y);
+    await new Promise((done) => setTimeout(done, 150));
+  }
+  scrollTo(0, 0);
+}
+"""
+
+IMAGES_SCRIPT = """
+() => ({
+  dpr: devicePixelRatio,
+  images: Array.from(document.images)
+    .filter((img) => img.currentSrc && img.complete && img.naturalWidth)
+    .map((img) => ({
+      src: img.currentSrc,
+      naturalWidth: img.naturalWidth,
+      naturalHeight: img.naturalHeight,
+      width: img.clientWidth,
+      height: img.clientHeight,
+      sized: img.hasAttribute('width') && img.hasAttribute('height'),
+    })),
+})
+"""
+
+PRODUCT_LINKS_SCRIPT = """
+() => Array.from(new Set(Array.from(document.querySelectorAll('a[href*="/product/"]'))
+  .map((a) => new URL(a.href, location.href).pathname)))
+"""
+
+
+def load_budgets(path=None):
+    with open(path or config.ASSET_BUDGETS_PATH, encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def budget_for(budgets, path):
+    """``default`` merged with the ``pages`` entry matching ``path``."""
+    pages = budgets.get("pages", {})
+    match = pages.get(path)
+    if match is None:
+        for pattern, budget in pages.items():
+            if ":" in pattern and re.fullmatch(re.sub(r":[^/]+", "[^/]+", pattern), path):
+                match = budget
+                break
+    return {**budgets.get("default", {}), **(match or {})}
+
+
+def covered_routes():
+    """Storefront paths the TC scripts reached in their last recorded run."""
+    host = urllib.parse.urlsplit(config.BASE_URL).netloc
+    paths = set()
+    for path in config.VITALS_DIR.glob("*.json"):
+        try:
+            views = json.loads(path.read_text(encoding="utf-8")).get("views", [])
+        except (OSError, json.JSONDecodeError):
+            continue
+        for view in views:
+            parts = urllib.parse.urlsplit(view["url"])
+            # Routes with record ids need state a cold crawl does not have.
+            if parts.netloc == host and ":id" not in locators.route_key(view["url"]):
+                paths.add(parts.path or "/")
+    return paths
+
+
+def plan(budgets, only=None):
+    """[(path, role)] to crawl."""
+    routes = {}
+    for entry in budgets.get("routes", []):
+        entry = {"path": entry} if isinstance(entry, str) else entry
+        routes[entry["path"]] = entry.get("role")
+    if only:
+        return [(path, routes.get(path)) for path in only]
+    for path in sorted(covered_routes()):
+        routes.setdefault(path, None)
+    return sorted(routes.items())
+
+
+class RouteWeight:
+    """Bytes by kind for one route, and the responses behind them."""
+
+    def __init__(self, path, role):
+        self.path = path
+        self.role = role
+        self.compressed = dict.fromkeys(KIND_ORDER, 0)
+        self.decoded = dict.fromkeys(KIND_ORDER, 0)
+        self.requests = 0
+        self.responses = {}            # url -> (content type, compressed bytes)
+        self.images = []
+        self.error = None
+        self._pending = set()
+
+    def watch(self, page):
+        page.on("requestfinished", self._finished)
+
+    def _finished(self, request):
+        task = asyncio.ensure_future(self._measure(request))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _measure(self, request):
+        try:
+            sizes = await request.sizes()
+            response = await request.response()
+            body = await response.body() if response is not None else b""
+        except async_api.Error:
+            return
+        kind = KINDS.get(request.resource_type, "other")
+        wire = sizes["responseBodySize"] + sizes["responseHeadersSize"]
+        self.requests += 1
+        self.compressed[kind] += wire
+        self.decoded[kind] += len(body) + sizes["responseHeadersSize"]
+        if response is not None:
+            self.responses[request.url] = ((response.headers.get("content-type") or "").split(";")[0], sizes["responseBodySize"])
+
+    async def drained(self):
+        while self._pending:
+            await asyncio.gather(*list(self._pending), return_exceptions=True)
+
+    def audit(self, found, rules):
+        """Flag images in ``found`` (IMAGES_SCRIPT output) against ``rules``."""
+        modern = set(rules.get("modernFormats", ["image/webp", "image/avif", "image/svg+xml"]))
+        min_bytes = rules.get("minBytesForFormatCheck", 10240)
+        max_ratio = rules.get("maxOversizeRatio", 2.0)
+        max_bytes = rules.get("maxImageBytes")
+        seen = set()
+        for image in found["images"]:
+            if image["src"] in seen or image["src"].startswith("data:"):
+                continue
+            seen.add(image["src"])
+            content_type, size = self.responses.get(image["src"], ("", None))
+            issues = []
+            if content_type and content_type not in modern and (size or 0) >= min_bytes:
+                issues.append(f"{content_type} (no WebP/AVIF)")
+            if max_bytes and size and size > max_bytes:
+                issues.append(f"{size / 1024:.0f} KB > {max_bytes / 1024:.0f} KB")
+            needed = image["width"] * image["height"] * found["dpr"] ** 2
+            served = image["naturalWidth"] * image["naturalHeight"]
+            if needed and served > needed * max_ratio ** 2:
+                issues.append(
+                    f"{image['naturalWidth']}x{image['naturalHeight']} shown at {image['width']}x{image['height']}"
+                    f" (x{found['dpr']:g})"
+                )
+            if not image["sized"]:
+                issues.append("no width/height attributes")
+            if issues:
+                self.images.append({"src": image["src"], "bytes": size, "issues": issues})
+
+    def check(self, budget):
+        violations = []
+        for kind, key in BUDGET_KEYS.items():
+            if key in budget and self.compressed[kind] > budget[key]:
+                violations.append(f"{kind} {self.compressed[kind]} > {budget[key]}")
+        total = sum(self.compressed.values())
+        if "maxBytes" in budget and total > budget["maxBytes"]:
+            violations.append(f"total {total} > {budget['maxBytes']}")
+        return violations
+
+    def row(self, budget):
+        return {
+            "route": self.path,
+            "routeKey": locators.route_key(self.path),
+            "role": self.role,
+            "requests": self.requests,
+            "compressedBytes": self.compressed,
+            "decodedBytes": self.decoded,
+            "totalBytes": sum(self.compressed.values()),
+            "flaggedImages": self.images,
+            "budget": budget,
+            "violations": self.check(budget) if self.error is None else [],
+            "error": self.error,
+        }
+
+
+async def crawl_route(browser, path, role, rules, scroll=True):
+    weight = RouteWeight(path, role)
+    context = await session.new_context(browser, role)
+    try:
+        page = await context.new_page()
+        weight.watch(page)
+        actions.track(page)
+        await page.goto(config.url(path), wait_until="load", timeout=config.NAVIGATION_TIMEOUT_MS)
+        await actions.settle(page)
+        if scroll:
+            await page.evaluate(SCROLL_SCRIPT)
+            await actions.settle(page)
+        found = await page.evaluate(IMAGES_SCRIPT)
+        await weight.drained()
+        weight.audit(found, rules)
+    except async_api.Error as exc:
+        weight.error = exc.message.splitlines()[0]
+    finally:
+        await context.close()
+    return weight
+
+
+async def product_paths(browser, count):
+    """The first ``count`` product detail paths linked from /shop."""
+    if count <= 0:
+        return []
+    context = await session.new_context(browser)
+    try:
+        page = await context.new_page()
+        await actions.goto(page, config.url("/shop"))
+        return (await page.evaluate(PRODUCT_LINKS_SCRIPT))[:count]
+    except async_api.Error:
+        return []
+    finally:
+        await context.close()
+
+
+async def crawl(routes, products=3, concurrency=4, headless=None, budgets=None, scroll=True):
+    """Crawl ``routes`` plus ``products`` product pages; returns the rows."""
+    budgets = budgets if budgets is not None else load_budgets()
+    rules = budgets.get("images", {})
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    async with async_api.async_playwright() as pw:
+        browser = await pw.chromium.launch(
+            headless=config.HEADLESS if headless is None else headless, args=config.BROWSER_ARGS,
+        )
+        try:
+            routes = list(routes) + [(path, None) for path in await product_paths(browser, products)]
+
+            async def one(path, role):
+                async with semaphore:
+                    return await crawl_route(browser, path, role, rules, scroll)
+
+            weights = await asyncio.gather(*(one(path, role) for path, role in routes))
+        finally:
+            await browser.close()
+    return [weight.row(budget_for(budgets, weight.path)) for weight in weights]
+
+
+def _kb(value):
+    return f"{value / 1024:.0f}"
+
+
+def print_rows(rows):
+    print(f"{'route':<34} {'js gz/raw':>13} {'css':>11} {'img':>7} {'font':>6} {'total KB':>9} {'req':>5} {'flags':>5}")
+    for row in rows:
+        gz, raw = row["compressedBytes"], row["decodedBytes"]
+        if row["error"]:
+            status = f"ERROR {row['error']}"
+        else:
+            status = "OVER " + "; ".join(row["violations"]) if row["violations"] else "ok"
+        print(
+            f"{row['route'][:34]:<34} {_kb(gz['js']):>6}/{_kb(raw['js']):<6} {_kb(gz['css']):>5}/{_kb(raw['css']):<5}"
+            f" {_kb(gz['image']):>7} {_kb(gz['font']):>6} {_kb(row['totalBytes']):>9} {row['requests']:>5}"
+            f" {len(row['flaggedImages']):>5}  {status}"
+        )
+    flagged = [(row["route"], image) for row in rows for image in row["flaggedImages"]]
+    if flagged:
+        print("\nimages:")
+        for route, image in flagged:
+            print(f"  {route:<24} {image['src'][:80]}")
+            print(f"  {'':<24} {'; '.join(image['issues'])}")
+
+
+def save(rows):
+    config.ASSETS_DIR.mkdir(parents=True, exist_ok=True)
+    path = config.ASSETS_DIR / f"{datetime.now():%Y%m%d-%H%M%S}.json"
+    path.write_text(json.dumps({"baseUrl": config.BASE_URL, "rows": rows}, indent=2) + "\n", encoding="utf-8")
+    return path
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("routes", nargs="*", help="paths to crawl (default: budgets file routes + covered routes)")
+    parser.add_argument("--products", type=int, default=3, help="product pages to add from /shop (default: %(default)s)")
+    parser.add_argument("-j", "--concurrency", type=int, default=4, help="routes loaded at once (default: %(default)s)")
+    parser.add_argument("--no-scroll", action="store_true", help="do not scroll to load lazy images")
+    parser.add_argument("--budgets", type=Path, default=config.ASSET_BUDGETS_PATH)
+    parser.add_argument("--headed", action="store_true", help="show the browser window")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    budgets = load_budgets(args.budgets)
+    rows = asyncio.run(crawl(
+        plan(budgets, args.routes), args.products, args.concurrency,
+        headless=False if args.headed else None, budgets=budgets, scroll=not args.no_scroll,
+    ))
+    print_rows(rows)
+    print(f"\nwrote {save(rows)}")
+    return 1 if any(row["violations"] or row["error"] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
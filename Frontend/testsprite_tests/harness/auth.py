@@ -0,0 +1,139 @@
+"""Signed-in browser state for the TC scripts that need a user.
+
+Instead of clicking through the sign-in form in every test, each role logs in
+once with a direct ``users/auth-with-password`` call. The PocketBase SDK keeps
+its session in ``localStorage["pocketbase_auth"]``, so the token is written
+into a Playwright ``storage_state`` file under tmp/auth/ and injected into new
+contexts. The file is reused until ``AUTH_STATE_TTL_S`` passes or the token
+is about to expire.
+
+A script opts in by declaring ``ROLE = "customer"`` (or ``"admin"``).
+
+    python -m harness.auth customer     # refresh one role's state
+"""
+import asyncio
+import base64
+import json
+import os
+import sys
+import time
+import urllib.parse
+import weakref
+
+from . import config, httpio
+
+STORAGE_KEY = "pocketbase_auth"
+
+# Refresh a little before the token itself expires.
+EXPIRY_MARGIN_S = 60
+
+# event loop -> role -> lock; a lock only works on the loop it was first used
+# on, and callers such as harness.baseline run one loop after another.
+_locks = weakref.WeakKeyDictionary()
+
+
+class AuthError(RuntimeError):
+    """Signing in a harness role failed."""
+
+
+def state_path(role):
+    return config.AUTH_STATE_DIR / f"{role}.json"
+
+
+def token_expiry(token):
+    """``exp`` claim of a JWT, or None if it cannot be read."""
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        return float(json.loads(base64.urlsafe_b64decode(payload))["exp"])
+    except (IndexError, KeyError, TypeError, ValueError):
+        return None
+
+
+def _stored_token(state):
+    for origin in state.get("origins", []):
+        for item in origin.get("localStorage", []):
+            if item.get("name") == STORAGE_KEY:
+                return json.loads(item["value"]).get("token")
+    return None
+
+
+def is_fresh(path, ttl=None):
+    """True if the state at ``path`` is younger than the TTL and its token is valid."""
+    ttl = config.AUTH_STATE_TTL_S if ttl is None else ttl
+    try:
+        if time.time() - path.stat().st_mtime > ttl:
+            return False
+        with open(path, encoding="utf-8") as fh:
+            token = _stored_token(json.load(fh))
+    except (OSError, ValueError):
+        return False
+    if not token:
+        return False
+    expiry = token_expiry(token)
+    return expiry is None or expiry - EXPIRY_MARGIN_S > time.time()
+
+
+async def login(role):
+    """Authenticate ``role`` against PocketBase; returns ``(token, record)``."""
+    try:
+        email, password = config.AUTH_ROLES[role]
+    except KeyError:
+        raise AuthError(f"Unknown role {role!r}; expected one of {', '.join(config.AUTH_ROLES)}") from None
+    response = await httpio.request(
+        "POST",
+        f"{config.POCKETBASE_URL}/api/collections/users/auth-with-password",
+        json={"identity": email, "password": password},
+    )
+    if not response.ok:
+        raise AuthError(f"Signing in {role} ({email}) failed with {response.status}: {response.text()[:200]}")
+    data = response.json()
+    return data["token"], data["record"]
+
+
+def build_state(token, record, base_url=None):
+    """Playwright storage state holding a PocketBase session for ``base_url``."""
+    parts = urllib.parse.urlsplit(base_url or config.BASE_URL)
+    # "record" for pocketbase>=0.23, "model" for older SDK builds.
+    value = json.dumps({"token": token, "record": record, "model": record})
+    return {
+        "cookies": [],
+        "origins": [{
+            "origin": f"{parts.scheme}://{parts.netloc}",
+            "localStorage": [{"name": STORAGE_KEY, "value": value}],
+        }],
+    }
+
+
+async def storage_state(role, refresh=False):
+    """Path to a fresh storage state for ``role``, signing in only when needed.
+
+    Concurrent tests asking for the same role wait on one login instead of
+    hammering auth-with-password.
+    """
+    locks = _locks.setdefault(asyncio.get_running_loop(), {})
+    async with locks.setdefault(role, asyncio.Lock()):
+        path = state_path(role)
+        if refresh or not is_fresh(path):
+            token, record = await login(role)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            with open(tmp, "w", encoding="utf-8") as fh:
+                json.dump(build_state(token, record), fh)
+            os.replace(tmp, path)
+        return path
+
+
+async def _refresh(roles):
+    for role in roles:
+        print(f"{role}: {await storage_state(role, refresh=True)}")
+
+
+def main(argv=None):
+    roles = (argv if argv is not None else sys.argv[1:]) or list(config.AUTH_ROLES)
+    asyncio.run(_refresh(roles))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
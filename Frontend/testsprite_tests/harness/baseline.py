@@ -0,0 +1,201 @@
+"""Performance baseline store and regression gate.
+
+``record`` runs the chosen scenarios K times and stores each metric's samples
+in perf_baseline.json next to the TC scripts. ``compare`` runs them K times
+again and, per scenario and metric, reports the median ratio (current /
+baseline) with a bootstrap confidence interval. A metric regresses when its
+median got more than ``--threshold`` worse *and* the whole interval is above
+1, i.e. the slowdown is bigger than run-to-run noise.
+
+    python -m harness.baseline record TC001 TC012 -k 7
+    python -m harness.baseline compare TC001 TC012 -k 7 --threshold 0.15
+
+Metrics: test wall time plus, from harness.vitals, the first view's LCP,
+total blocking time, worst CLS, worst INP and transferred bytes. Lower is
+better for all of them.
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import random
+import statistics
+import sys
+
+from . import config, runner, vitals
+
+BOOTSTRAP_SAMPLES = 2000
+CONFIDENCE = 0.95
+
+
+def percentile(values, q):
+    """Linear-interpolated percentile, ``q`` in [0, 100]."""
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def bootstrap_ratio_ci(baseline, current, samples=BOOTSTRAP_SAMPLES, confidence=CONFIDENCE, seed=0):
+    """Confidence interval for median(current) / median(baseline)."""
+    rng = random.Random(seed)
+    ratios = []
+    for _ in range(samples):
+        base = statistics.median(rng.choices(baseline, k=len(baseline)))
+        cur = statistics.median(rng.choices(current, k=len(current)))
+        if base > 0:
+            ratios.append(cur / base)
+        elif cur == 0:
+            ratios.append(1.0)
+    if not ratios:
+        return None, None
+    tail = (1 - confidence) / 2 * 100
+    return percentile(ratios, tail), percentile(ratios, 100 - tail)
+
+
+def metrics(outcome, vitals_payload):
+    """Flatten one test run into ``{metric: value}``."""
+    values = {"durationMs": outcome["durationMs"]}
+    views = (vitals_payload or {}).get("views", [])
+    if not views:
+        return values
+    documents = [view for view in views if view["kind"] == "navigation"]
+    if documents and documents[0]["lcpMs"] is not None:
+        values["lcpMs"] = documents[0]["lcpMs"]
+    values["totalBlockingTimeMs"] = sum(view["totalBlockingTimeMs"] for view in views)
+    values["cls"] = max(view["cls"] for view in views)
+    values["transferBytes"] = sum(view["transferBytes"] for view in views)
+    inps = [view["inpMs"] for view in views if view["inpMs"] is not None]
+    if inps:
+        values["inpMs"] = max(inps)
+    return values
+
+
+def collect(scripts, repeats, concurrency=1, headless=None):
+    """Run ``scripts`` ``repeats`` times; ``{test id: {metric: [samples]}}``.
+
+    Only passing runs are sampled: a run cut short by a failure would look
+    like a speed-up.
+    """
+    samples = {script.id: {} for script in scripts}
+    for iteration in range(repeats):
+        outcomes = asyncio.run(runner.run_suite(
+            scripts, concurrency, headless=headless, instruments=[vitals.VitalsRecorder],
+        ))
+        for outcome in outcomes:
+            if outcome["status"] == "PASSED":
+                for name, value in metrics(outcome, vitals.load(outcome["id"])).items():
+                    samples[outcome["id"]].setdefault(name, []).append(value)
+            print(f"run {iteration + 1}/{repeats}  {outcome['id']}  {outcome['status']}  {outcome['durationMs']} ms")
+    return samples
+
+
+def summarize(values):
+    return {
+        "samples": [round(value, 4) for value in values],
+        "median": round(statistics.median(values), 4),
+        "p95": round(percentile(values, 95), 4),
+    }
+
+
+def load(path=None):
+    try:
+        with open(path or config.BASELINE_PATH, encoding="utf-8") as fh:
+            return json.load(fh)
+    except FileNotFoundError:
+        return {"scenarios": {}}
+
+
+def save(store, path=None):
+    with open(path or config.BASELINE_PATH, "w", encoding="utf-8") as fh:
+        json.dump(store, fh, indent=1)
+        fh.write("\n")
+
+
+def record(samples, path=None):
+    """Replace the stored baseline of each sampled scenario."""
+    store = load(path)
+    recorded_at = datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds")
+    for test_id, by_metric in samples.items():
+        store["scenarios"][test_id] = {
+            "recordedAt": recorded_at,
+            "metrics": {name: summarize(values) for name, values in by_metric.items()},
+        }
+    save(store, path)
+    return store
+
+
+def compare(store, samples, threshold=0.1):
+    """Rows of ``(test id, metric, baseline median, current median, ratio, ci, regressed)``."""
+    rows = []
+    for test_id, by_metric in sorted(samples.items()):
+        stored = store["scenarios"].get(test_id, {}).get("metrics", {})
+        for name, current in sorted(by_metric.items()):
+            if name not in stored:
+                continue
+            baseline = stored[name]["samples"]
+            base_median, cur_median = statistics.median(baseline), statistics.median(current)
+            ratio = cur_median / base_median if base_median else (1.0 if cur_median == 0 else float("inf"))
+            low, high = bootstrap_ratio_ci(baseline, current)
+            regressed = ratio > 1 + threshold and low is not None and low > 1
+            rows.append((test_id, name, base_median, cur_median, ratio, (low, high), regressed))
+    return rows
+
+
+def _format(value):
+    return f"{value:.3f}" if abs(value) < 10 else f"{value:.0f}"
+
+
+def print_rows(rows):
+    print(f"\n{'test':<6} {'metric':<20} {'baseline':>11} {'current':>11} {'ratio':>7}  {'95% CI':<15}")
+    for test_id, name, base, cur, ratio, (low, high), regressed in rows:
+        interval = f"[{low:.2f}, {high:.2f}]" if low is not None else "n/a"
+        flag = "  REGRESSED" if regressed else ""
+        print(f"{test_id:<6} {name:<20} {_format(base):>11} {_format(cur):>11} {ratio:>6.2f}x  {interval:<15}{flag}")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=["record", "compare"])
+    parser.add_argument("tests", nargs="*", help="test ids (default: all)")
+    parser.add_argument("-k", "--repeats", type=int, default=5, help="runs per scenario (default: %(default)s)")
+    parser.add_argument("-j", "--concurrency", type=int, default=1,
+                        help="contexts at once; keep at 1 for stable numbers (default: %(default)s)")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="allowed median slowdown before failing, as a fraction (default: %(default)s)")
+    parser.add_argument("--baseline", default=None, help=f"baseline file (default: {config.BASELINE_PATH.name})")
+    parser.add_argument("--headed", action="store_true", help="show the browser window")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    scripts = runner.discover(args.tests)
+    samples = collect(scripts, args.repeats, args.concurrency, headless=False if args.headed else None)
+    never_passed = sorted(test_id for test_id, by_metric in samples.items() if not by_metric)
+    samples = {test_id: by_metric for test_id, by_metric in samples.items() if by_metric}
+    if never_passed:
+        print(f"No passing run of {', '.join(never_passed)}; nothing to measure.", file=sys.stderr)
+    if args.command == "record":
+        if samples:
+            record(samples, args.baseline)
+            print(f"\nBaseline updated for {', '.join(sorted(samples))}")
+        return 1 if never_passed else 0
+
+    store = load(args.baseline)
+    missing = sorted(set(samples) - set(store["scenarios"]))
+    if missing:
+        print(f"No baseline for {', '.join(missing)}; run 'record' first.", file=sys.stderr)
+    rows = compare(store, samples, args.threshold)
+    print_rows(rows)
+    regressions = [row for row in rows if row[-1]]
+    if regressions:
+        print(f"\n{len(regressions)} metric(s) regressed by more than {args.threshold:.0%}")
+    return 1 if regressions or missing or never_passed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,301 @@
+"""Third-party traffic blocked or stubbed during functional runs.
+
+The storefront loads analytics (GTM/GA, Meta Pixel and the Conversions API,
+Clarity, PostHog, OpenPanel), the Inter webfont, Builder.io content and
+Google Maps on most pages. None of that is what the functional tests check,
+but ``actions.settle`` waits for it, and the Builder.io 401s add console
+noise. :class:`ThirdPartyBlocker` routes those hosts in each context:
+
+- scripts get an empty 200 script, so ``onload`` handlers still run;
+- Builder.io content queries get an empty result list;
+- stylesheets get an empty stylesheet;
+- beacons and other calls get 204;
+- fonts, images and map tiles are aborted.
+
+A script opts categories back in with a module attribute, e.g.
+``THIRD_PARTY = blocking.ALL`` (TC013 checks the analytics traffic itself)
+or ``THIRD_PARTY = ("fonts",)``. Scenarios set the same thing with a
+``"third_party"`` list. Each distinct allow list compiles to one host regex,
+registered as a single route, so unrelated requests never reach Python.
+A pooled context (``--pool``) is routed once, before the pool loads its
+page, with every third-party host; the route applies the profile of the
+test using the context.
+
+The bytes that blocking saved are estimated from the sizes of the same URLs
+seen unblocked (by opted-in tests or a ``--third-party full`` run) in
+tmp/third_party_sizes.json. Blocked requests with no known size are counted
+separately.
+
+    python -m harness.runner                    # blocking on (default)
+    python -m harness.runner --third-party full # everything through, sizes learnt
+    python -m harness.blocking                  # categories and learnt sizes
+"""
+import asyncio
+import functools
+import json
+import os
+import re
+import sys
+import urllib.parse
+import weakref
+
+from playwright import async_api
+
+from . import config
+
+ALL = "*"
+
+CATEGORIES = {
+    "analytics": (
+        "googletagmanager.com", "google-analytics.com", "analytics.google.com",
+        "connect.facebook.net", "facebook.com", "graph.facebook.com",
+        "clarity.ms", "posthog.com", "openpanel.dev",
+    ),
+    "fonts": ("rsms.me", "fonts.googleapis.com", "fonts.gstatic.com"),
+    "builder": ("builder.io", "builder.codes"),
+    "maps": ("maps.googleapis.com", "maps.gstatic.com", "tile.openstreetmap.org", "basemaps.cartocdn.com"),
+}
+
+_STUB_SCRIPT = {"status": 200, "content_type": "application/javascript", "body": "/* blocked by harness.blocking */"}
+_STUB_STYLE = {"status": 200, "content_type": "text/css", "body": ""}
+_STUB_EMPTY = {"status": 204, "body": ""}
+_STUB_BUILDER = {"status": 200, "content_type": "application/json", "body": '{"results": []}'}
+
+
+def _host_pattern(domains):
+    alternatives = "|".join(re.escape(domain) for domain in sorted(domains, key=len, reverse=True))
+    return rf"^https?://(?:[^/?#]+\.)?(?:{alternatives})(?::\d+)?(?:[/?#]|$)"
+
+
+@functools.lru_cache(maxsize=None)
+def compile_profile(allowed):
+    """(URL regex or None, {domain: category}) blocking all but ``allowed``.
+
+    ``allowed`` is a frozenset of category names, or contains ``ALL``.
+    """
+    if ALL in allowed:
+        return None, {}
+    domains = {
+        domain: name for name, entries in CATEGORIES.items() if name not in allowed for domain in entries
+    }
+    if not domains:
+        return None, {}
+    return re.compile(_host_pattern(domains)), domains
+
+
+@functools.lru_cache(maxsize=None)
+def _all_third_party():
+    return re.compile(_host_pattern({domain for entries in CATEGORIES.values() for domain in entries}))
+
+
+def category(url, domains=None):
+    """Category of ``url``'s host, or None."""
+    domains = domains or {domain: name for name, entries in CATEGORIES.items() for domain in entries}
+    host = urllib.parse.urlsplit(url).hostname or ""
+    while host:
+        if host in domains:
+            return domains[host]
+        host = host.partition(".")[2]
+    return None
+
+
+def size_key(url):
+    """Sizes are tracked per URL without query string (cache busters, ids)."""
+    parts = urllib.parse.urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}{parts.path}"
+
+
+def load_sizes(path=None):
+    try:
+        with open(path or config.THIRD_PARTY_SIZES_PATH, encoding="utf-8") as fh:
+            return json.load(fh)
+    except FileNotFoundError:
+        return {}
+
+
+def save_sizes(learnt, path=None):
+    """Merge ``learnt`` {url: bytes} into the size table (other processes may write too)."""
+    path = path or config.THIRD_PARTY_SIZES_PATH
+    sizes = load_sizes(path)
+    sizes.update(learnt)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_name(f"{path.name}.{os.getpid()}.partial")
+    partial.write_text(json.dumps(dict(sorted(sizes.items())), indent=2) + "\n", encoding="utf-8")
+    partial.replace(path)
+
+
+def _stub(request, name):
+    if request.resource_type in ("font", "image", "media"):
+        return None
+    if name == "builder" and request.resource_type in ("fetch", "xhr"):
+        return _STUB_BUILDER
+    if request.resource_type == "script":
+        return _STUB_SCRIPT
+    if request.resource_type == "stylesheet":
+        return _STUB_STYLE
+    return _STUB_EMPTY
+
+
+class _PoolRoute:
+    """The one third-party route of a pooled context (see :meth:`ThirdPartyBlocker.prepare`).
+
+    It blocks for the blocker attached to the context, or for ``idle``
+    between tests, while the pool loads the page.
+    """
+
+    def __init__(self, idle):
+        self.idle = idle
+        self.blocker = None
+
+    async def __call__(self, route):
+        blocker = self.blocker or self.idle
+        if blocker.pattern is None or not blocker.pattern.match(route.request.url):
+            await route.fallback()
+            return
+        await blocker._handle(route)
+
+
+# Routes of contexts prepared for a pool (harness.pool); the pool's reset drops them.
+_pool_routes = weakref.WeakKeyDictionary()
+
+
+class ThirdPartyBlocker:
+    """Runner instrument applying the script's third-party profile to its context."""
+
+    def __init__(self, allow=None):
+        self.forced = allow          # set for the whole run (--third-party full)
+        self.allowed = None
+        self.sizes = None
+        self.pattern = None
+        self.domains = {}
+        self.context = None
+        self.passive = False
+        self.blocked = {}            # category -> [requests, known bytes, requests of unknown size]
+        self.learnt = {}
+        self._pooled = None
+        self._listening = False
+        self._pending = set()
+
+    def _use(self, allowed):
+        self.allowed = frozenset([allowed] if isinstance(allowed, str) else allowed)
+        self.pattern, self.domains = compile_profile(self.allowed)
+        if self.pattern is not None:
+            self.sizes = load_sizes()
+
+    async def prepare(self, context):
+        """Route ``context`` before a pool loads its page.
+
+        Until a test's blocker attaches, the route blocks this blocker's
+        profile: ``allow`` or the default one. A test with the same profile
+        keeps the pre-loaded page.
+        """
+        if self.allowed is None:
+            self._use(self.forced if self.forced is not None else ())
+        route = _PoolRoute(self)
+        _pool_routes[context] = route
+        await context.route(_all_third_party(), route)
+
+    async def attach(self, context, script=None):
+        self.context = context
+        allowed = self.forced
+        if allowed is None:
+            # Set by the runner from the module it already loaded.
+            allowed = getattr(script, "third_party", ())
+        self._use(allowed)
+        self._pooled = _pool_routes.get(context)
+        if self._pooled is not None:
+            # Registered again so it runs before routes added since (HAR's catch-all).
+            await context.unroute(_all_third_party(), self._pooled)
+            await context.route(_all_third_party(), self._pooled)
+            self._pooled.blocker = self
+            self.passive = self.allowed == self._pooled.idle.allowed
+        elif self.pattern is not None:
+            await context.route(self.pattern, self._handle)
+        if self.pattern is None or self.allowed:
+            # Something third-party goes through: learn its sizes.
+            context.on("requestfinished", self._learn)
+            self._listening = True
+
+    async def _handle(self, route):
+        request = route.request
+        name = category(request.url, self.domains)
+        if name is None:
+            await route.fallback()
+            return
+        counts = self.blocked.setdefault(name, [0, 0, 0])
+        counts[0] += 1
+        size = self.sizes.get(size_key(request.url))
+        if size is None:
+            counts[2] += 1
+        else:
+            counts[1] += size
+        stub = _stub(request, name)
+        try:
+            if stub is None:
+                await route.abort("blockedbyclient")
+            else:
+                await route.fulfill(**stub, headers={"access-control-allow-origin": "*"})
+        except async_api.Error:
+            pass     # page already gone
+
+    def _learn(self, request):
+        if _all_third_party().match(request.url) and (self.pattern is None or not self.pattern.match(request.url)):
+            task = asyncio.ensure_future(self._record_size(request))
+            self._pending.add(task)
+            task.add_done_callback(self._pending.discard)
+
+    async def _record_size(self, request):
+        try:
+            sizes = await request.sizes()
+        except async_api.Error:
+            return
+        self.learnt[size_key(request.url)] = sizes["responseBodySize"] + sizes["responseHeadersSize"]
+
+    async def finish(self, script, outcome):
+        if self._pooled is not None:
+            self._pooled.blocker = None
+        elif self.pattern is not None:
+            await self.context.unroute(self.pattern, self._handle)
+        if self._listening:
+            self.context.remove_listener("requestfinished", self._learn)
+            if self._pending:
+                await asyncio.gather(*self._pending, return_exceptions=True)
+            if self.learnt:
+                save_sizes(self.learnt)
+        if self.blocked:
+            outcome["thirdParty"] = {
+                "blocked": sum(counts[0] for counts in self.blocked.values()),
+                "blockedBytes": sum(counts[1] for counts in self.blocked.values()),
+                "unknownSize": sum(counts[2] for counts in self.blocked.values()),
+                "byCategory": {name: counts[0] for name, counts in sorted(self.blocked.items())},
+            }
+
+
+def summary(outcomes):
+    """One line totalling the ``thirdParty`` counters of ``outcomes``."""
+    stats = [outcome["thirdParty"] for outcome in outcomes if outcome.get("thirdParty")]
+    if not stats:
+        return None
+    by_category = {}
+    for entry in stats:
+        for name, count in entry["byCategory"].items():
+            by_category[name] = by_category.get(name, 0) + count
+    unknown = sum(entry["unknownSize"] for entry in stats)
+    return (
+        f"third-party: {sum(entry['blocked'] for entry in stats)} requests blocked"
+        f" ({', '.join(f'{name} {count}' for name, count in sorted(by_category.items()))}),"
+        f" ~{sum(entry['blockedBytes'] for entry in stats) / 1024:.0f} KB saved"
+        + (f", {unknown} of unknown size" if unknown else "")
+    )
+
+
+def main(argv=None):
+    sizes = load_sizes()
+    for name, domains in CATEGORIES.items():
+        known = {url: size for url, size in sizes.items() if category(url) == name}
+        print(f"{name:<10} {len(known):>4} URLs, {sum(known.values()) / 1024:8.0f} KB learnt  ({', '.join(domains)})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+"""Settings shared by the TC scripts and the harness.
+
+Everything can be overridden from the environment so CI can point the suite at
+another host without editing the generated scripts.
+"""
+import os
+import urllib.parse
+from pathlib import Path
+
+TESTS_DIR = Path(__file__).resolve().parent.parent
+TMP_DIR = TESTS_DIR / "tmp"
+RESULTS_PATH = TMP_DIR / "test_results.json"
+HISTORY_PATH = TMP_DIR / "history.sqlite"
+REPORT_DIR = TMP_DIR / "report"
+BASELINE_PATH = TESTS_DIR / "perf_baseline.json"
+TEST_PLAN_PATH = TESTS_DIR / "testsprite_frontend_test_plan.json"
+SCENARIOS_PATH = TESTS_DIR / "scenarios.json"
+AUTH_STATE_DIR = TMP_DIR / "auth"
+VITALS_DIR = TMP_DIR / "vitals"
+HAR_DIR = TMP_DIR / "har"
+HAR_BUDGETS_PATH = TESTS_DIR / "har_budgets.json"
+ASSET_BUDGETS_PATH = TESTS_DIR / "asset_budgets.json"
+CODE_SUMMARY_PATH = TMP_DIR / "code_summary.json"
+FEATURE_TESTS_PATH = TESTS_DIR / "feature_tests.json"
+LOAD_DIR = TMP_DIR / "load"
+WEBHOOK_BENCH_DIR = TMP_DIR / "webhooks"
+ARTIFACTS_DIR = TMP_DIR / "artifacts"
+ASSETS_DIR = TMP_DIR / "assets"
+MATRIX_DIR = TMP_DIR / "matrix"
+COVERAGE_DIR = TMP_DIR / "coverage"
+SOAK_DIR = TMP_DIR / "soak"
+INTERACTIONS_DIR = TMP_DIR / "interactions"
+COUPON_STRESS_DIR = TMP_DIR / "coupons"
+SELECTOR_INDEX_PATH = TMP_DIR / "selector_index.json"
+THIRD_PARTY_SIZES_PATH = TMP_DIR / "third_party_sizes.json"
+
+BASE_URL = os.environ.get("TESTSPRITE_BASE_URL", "http://localhost:8080").rstrip("/")
+POCKETBASE_URL = os.environ.get("TESTSPRITE_POCKETBASE_URL", "http://127.0.0.1:8090").rstrip("/")
+# The Express payment server (src/server/index.ts, SERVER_PORT).
+API_URL = os.environ.get("TESTSPRITE_API_URL", "http://localhost:3000").rstrip("/")
+# The Backend (CRM) server hosting /api/webhooks (Backend/src/server/local.ts).
+BACKEND_URL = os.environ.get("TESTSPRITE_BACKEND_URL", "http://localhost:3001").rstrip("/")
+HEADLESS = os.environ.get("TESTSPRITE_HEADED", "") == ""
+
+DEFAULT_TIMEOUT_MS = 5000
+NAVIGATION_TIMEOUT_MS = 10000
+LOAD_STATE_TIMEOUT_MS = 3000
+
+# harness.actions: how long the network must stay quiet after an action before
+# the next step runs, and the most we wait for that before moving on anyway.
+SETTLE_QUIET_MS = 50
+SETTLE_TIMEOUT_MS = 5000
+
+# harness.auth: users signed in once per role, and how long a saved session is reused.
+AUTH_ROLES = {
+    "customer": (
+        os.environ.get("TESTSPRITE_CUSTOMER_EMAIL", "testuser@example.com"),
+        os.environ.get("TESTSPRITE_CUSTOMER_PASSWORD", "TestPassword123"),
+    ),
+    "admin": (
+        os.environ.get("TESTSPRITE_ADMIN_EMAIL", "admin@example.com"),
+        os.environ.get("TESTSPRITE_ADMIN_PASSWORD", "adminpassword"),
+    ),
+}
+AUTH_STATE_TTL_S = int(os.environ.get("TESTSPRITE_AUTH_TTL", "1800"))
+
+# harness.load and harness.razorpay_stub: the key razorpay-routes.ts uses, so
+# signatures made here match the ones the servers expect.
+RAZORPAY_KEY_ID = os.environ.get("TESTSPRITE_RAZORPAY_KEY_ID", os.environ.get("RAZORPAY_KEY_ID", ""))
+RAZORPAY_KEY_SECRET = os.environ.get("TESTSPRITE_RAZORPAY_KEY_SECRET", os.environ.get("RAZORPAY_KEY_SECRET", ""))
+RAZORPAY_STUB_URL = os.environ.get("TESTSPRITE_RAZORPAY_STUB_URL", "http://127.0.0.1:8091").rstrip("/")
+
+# harness.coupon_stress: a PocketBase superuser, since the coupons collection
+# has no API rules. Leave empty against harness.pocketbase_stub.
+POCKETBASE_SUPERUSER = (
+    os.environ.get("TESTSPRITE_PB_SUPERUSER_EMAIL", ""),
+    os.environ.get("TESTSPRITE_PB_SUPERUSER_PASSWORD", ""),
+)
+
+# harness.webhook_bench: WEBHOOKS_ADMIN_API_KEY of the Backend, if it sets one,
+# and the address the local sinks listen on (must be reachable from the Backend).
+WEBHOOKS_API_KEY = os.environ.get("TESTSPRITE_WEBHOOKS_API_KEY", os.environ.get("WEBHOOKS_ADMIN_API_KEY", ""))
+WEBHOOK_SINK_HOST = os.environ.get("TESTSPRITE_WEBHOOK_SINK_HOST", "127.0.0.1")
+
+# harness.artifacts: page loads of trace kept in memory per context, and the
+# most failure bundles may take on disk before the least recently used go.
+ARTIFACT_TRACE_CHUNKS = 3
+ARTIFACTS_MAX_BYTES = int(float(os.environ.get("TESTSPRITE_ARTIFACTS_MAX_MB", "500")) * 2**20)
+
+# harness.locators: ignore the selector index and rebuild it while running.
+SELECTOR_REINDEX = os.environ.get("TESTSPRITE_REINDEX", "") != ""
+
+# harness.har: hosts whose responses a replay serves from the recording.
+HAR_REPLAY_HOSTS = [
+    urllib.parse.urlsplit(POCKETBASE_URL).hostname,
+    "backend.karigaistore.in",
+    "builder.io",
+    "razorpay.com",
+]
+
+# Arguments for a browser shared by many contexts. "--single-process" is left
+# out on purpose: Chromium is unstable with several contexts in one process.
+BROWSER_ARGS = [
+    "--window-size=1280,720",         # Set the browser window size
+    "--disable-dev-shm-usage",        # Avoid using /dev/shm which can cause issues in containers
+    "--ipc=host",                     # Use host-level IPC for better stability
+]
+
+# Arguments for a script launched on its own, as the generated code used.
+STANDALONE_BROWSER_ARGS = BROWSER_ARGS + [
+    "--single-process",               # Run the browser in a single process mode
+]
+
+
+def url(path=""):
+    """Absolute storefront URL for ``path``."""
+    if not path:
+        return BASE_URL
+    return f"{BASE_URL}/{path.lstrip('/')}"
@@ -0,0 +1,254 @@
+"""Flash-sale stress test for coupon validation and usage counting.
+
+pb_hooks/coupon-handler.pb.js validates a code (``findFirstRecordByData``,
+then ``current_uses >= max_uses``) and, separately, increments
+``current_uses`` by reading the record and saving it back
+(``incrementCouponUsage``). Under a burst of checkouts with the same code
+both steps can race: many requests validate before any usage is counted,
+and concurrent increments overwrite each other.
+
+This seeds a fresh coupon (``--max-uses``, 10 % off), then fires ``-n``
+apply-and-order sequences, ``-c`` at a time, all released together:
+
+    validate   POST /api/coupons/validate {code, subtotal}
+    redeem     what incrementCouponUsage does, over the REST API: read the
+               coupon, write back current_uses + 1 (``--increment atomic``
+               sends PocketBase's ``"current_uses+": 1`` instead)
+
+It reports latency percentiles and throughput per step, validation answers
+by message, and, read back from the coupon at the end:
+
+- over-limit orders: sequences that got the discount beyond ``max_uses``;
+- over-redemption: ``current_uses - max_uses`` when positive;
+- lost updates: increments that did not show up in ``current_uses``.
+
+Any of these makes the run fail. The seeded coupon is deleted afterwards
+unless ``--keep``.
+
+    python -m harness.coupon_stress -n 500 -c 200 --max-uses 50
+    python -m harness.coupon_stress --pocketbase-stub -n 200      # offline, against harness.pocketbase_stub
+
+The coupons collection has no API rules, so a real PocketBase needs
+superuser credentials (TESTSPRITE_PB_SUPERUSER_EMAIL/_PASSWORD). Results go
+to tmp/coupons/<timestamp>.json.
+"""
+import argparse
+import asyncio
+import collections
+import contextlib
+import datetime
+import json
+import random
+import secrets
+import sys
+import time
+
+from . import config, httpio, load, pocketbase_stub
+
+STEP_ORDER = ["validate", "redeem"]
+SUPERUSER_AUTH_PATHS = (
+    "/api/collections/_superusers/auth-with-password",    # PocketBase 0.23+
+    "/api/admins/auth-with-password",                     # earlier versions ($app.dao() hooks)
+)
+
+
+async def superuser_headers():
+    """Authorization header for the configured superuser, or none without credentials."""
+    email, password = config.POCKETBASE_SUPERUSER
+    if not email:
+        return {}
+    for path in SUPERUSER_AUTH_PATHS:
+        response = await httpio.request(
+            "POST", f"{config.POCKETBASE_URL}{path}", json={"identity": email, "password": password},
+        )
+        if response.status == 404:
+            continue
+        if not response.ok:
+            raise SystemExit(f"Superuser sign-in as {email} failed with {response.status}: {response.text()[:200]}")
+        return {"Authorization": response.json()["token"]}
+    raise SystemExit(f"No superuser sign-in endpoint on {config.POCKETBASE_URL}")
+
+
+def _records(record_id=""):
+    return f"{config.POCKETBASE_URL}/api/collections/coupons/records{'/' + record_id if record_id else ''}"
+
+
+async def seed(headers, max_uses, code=None):
+    """Create an active coupon for the run; returns the record."""
+    expires = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(days=1)
+    response = await httpio.request("POST", _records(), headers=headers, json={
+        "code": code or f"STRESS{secrets.token_hex(4).upper()}",
+        "type": "percentage",
+        "amount": 10,
+        "active": True,
+        "expires_at": expires.strftime("%Y-%m-%d %H:%M:%S.000Z"),
+        "min_order_value": 0,
+        "max_uses": max_uses,
+        "current_uses": 0,
+    })
+    if not response.ok:
+        raise SystemExit(f"Seeding the coupon failed with {response.status}: {response.text()[:200]}")
+    return response.json()
+
+
+async def redeem(coupon_id, headers, atomic):
+    """Count one use of the coupon, the way incrementCouponUsage does (or atomically)."""
+    if atomic:
+        return await httpio.request("PATCH", _records(coupon_id), headers=headers, json={"current_uses+": 1})
+    response = await httpio.request("GET", _records(coupon_id), headers=headers)
+    if not response.ok:
+        return response
+    current = response.json().get("current_uses") or 0
+    return await httpio.request("PATCH", _records(coupon_id), headers=headers, json={"current_uses": current + 1})
+
+
+class Outcome:
+    """Validation answers and redemptions of one run."""
+
+    def __init__(self):
+        self.answers = collections.Counter()
+        self.accepted = 0
+        self.redeemed = 0
+
+
+async def sequence(stats, outcome, code, subtotal, headers, atomic, think_s):
+    """One checkout: validate the code, then (if accepted) place the order and count the use."""
+    response = None
+    started = time.perf_counter()
+    try:
+        response = await httpio.request(
+            "POST", f"{config.POCKETBASE_URL}/api/coupons/validate", json={"code": code, "subtotal": subtotal},
+        )
+    except Exception as exc:
+        stats.add("validate", (time.perf_counter() - started) * 1000, type(exc).__name__)
+        return
+    # A 400 with a message is the hook's "no"; only server errors count as errors.
+    error = f"HTTP {response.status}" if response.status >= 500 else None
+    stats.add("validate", (time.perf_counter() - started) * 1000, error)
+    try:
+        payload = response.json() or {}
+    except ValueError:
+        payload = {}
+    outcome.answers[payload.get("message") or f"HTTP {response.status}"] += 1
+    if not payload.get("success"):
+        return
+    outcome.accepted += 1
+    await asyncio.sleep(think_s)
+    if await stats.time("redeem", lambda: redeem(payload["data"]["couponId"], headers, atomic)) is not None:
+        outcome.redeemed += 1
+
+
+async def run_stress(sequences, concurrency, max_uses, atomic=False, think_ms=0, keep=False, code=None, seed_value=None):
+    """Run the burst; returns ``(stats, outcome, coupon before, coupon after)``."""
+    headers = await superuser_headers()
+    coupon = await seed(headers, max_uses, code)
+    rng = random.Random(seed_value)
+    stats = load.Stats()
+    outcome = Outcome()
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    go = asyncio.Event()
+
+    async def one():
+        await go.wait()
+        async with semaphore:
+            await sequence(stats, outcome, coupon["code"], rng.randint(500, 5000), headers, atomic, think_ms / 1000)
+
+    tasks = [asyncio.ensure_future(one()) for _ in range(sequences)]
+    await asyncio.sleep(0)
+    stats.started = time.perf_counter()
+    go.set()
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        stats.stopped = time.perf_counter()
+        after = (await httpio.request("GET", _records(coupon["id"]), headers=headers)).json()
+        if not keep:
+            await httpio.request("DELETE", _records(coupon["id"]), headers=headers)
+    return stats, outcome, coupon, after
+
+
+def findings(outcome, coupon, after):
+    max_uses = coupon["max_uses"]
+    final = after.get("current_uses") or 0
+    return {
+        "maxUses": max_uses,
+        "accepted": outcome.accepted,
+        "redeemed": outcome.redeemed,
+        "finalCurrentUses": final,
+        "overLimitOrders": max(0, outcome.redeemed - max_uses),
+        "overRedemption": max(0, final - max_uses),
+        "lostUpdates": max(0, outcome.redeemed - (final - (coupon.get("current_uses") or 0))),
+    }
+
+
+def print_report(rows, outcome, result):
+    load.print_rows(rows)
+    print("\nvalidation answers:")
+    for message, count in outcome.answers.most_common():
+        print(f"  {count:>6} x {message}")
+    print(
+        f"\nmax_uses {result['maxUses']}: {result['accepted']} accepted, {result['redeemed']} redeemed,"
+        f" current_uses now {result['finalCurrentUses']}"
+    )
+    print(
+        f"over-limit orders {result['overLimitOrders']}, over-redemption {result['overRedemption']},"
+        f" lost updates {result['lostUpdates']}"
+    )
+
+
+def save(rows, outcome, result, args):
+    config.COUPON_STRESS_DIR.mkdir(parents=True, exist_ok=True)
+    path = config.COUPON_STRESS_DIR / f"{datetime.datetime.now():%Y%m%d-%H%M%S}.json"
+    payload = {
+        "pocketbaseUrl": config.POCKETBASE_URL,
+        "sequences": args.sequences,
+        "concurrency": args.concurrency,
+        "increment": args.increment,
+        "thinkMs": args.think_ms,
+        "steps": rows,
+        "answers": dict(outcome.answers),
+        **result,
+    }
+    path.write_text(json.dumps(payload, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+    return path
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-n", "--sequences", type=int, default=300, help="apply-and-order sequences (default: %(default)s)")
+    parser.add_argument("-c", "--concurrency", type=int, default=100, help="sequences in flight at once (default: %(default)s)")
+    parser.add_argument("--max-uses", type=int, default=50, help="max_uses of the seeded coupon (default: %(default)s)")
+    parser.add_argument(
+        "--increment", choices=["read-modify-write", "atomic"], default="read-modify-write",
+        help="how a use is counted: like incrementCouponUsage, or with a \"current_uses+\" modifier (default: %(default)s)",
+    )
+    parser.add_argument("--think-ms", type=int, default=0, help="pause between validate and redeem (default: %(default)s)")
+    parser.add_argument("--code", help="code for the seeded coupon (default: a random STRESS... code)")
+    parser.add_argument("--keep", action="store_true", help="do not delete the seeded coupon afterwards")
+    parser.add_argument("--seed", type=int, help="seed for the subtotals")
+    parser.add_argument(
+        "--pocketbase-stub", action="store_true",
+        help=f"serve PocketBase from harness.pocketbase_stub on {config.POCKETBASE_URL}",
+    )
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.sequences < 1 or args.max_uses < 1:
+        raise SystemExit("--sequences and --max-uses must be positive")
+    with pocketbase_stub.start() if args.pocketbase_stub else contextlib.nullcontext():
+        stats, outcome, coupon, after = asyncio.run(run_stress(
+            args.sequences, args.concurrency, args.max_uses, args.increment == "atomic", args.think_ms,
+            args.keep, args.code, args.seed,
+        ))
+    rows = sorted(stats.rows(), key=lambda row: STEP_ORDER.index(row["step"]))
+    result = findings(outcome, coupon, after)
+    print_report(rows, outcome, result)
+    print(f"\nwrote {save(rows, outcome, result, args)}")
+    failed = result["overLimitOrders"] or result["overRedemption"] or result["lostUpdates"]
+    return 1 if failed or any(row["errorRate"] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
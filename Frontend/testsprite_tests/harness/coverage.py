@@ -0,0 +1,379 @@
+"""JS and CSS coverage per route, summarised per bundle chunk.
+
+src/utils/performance.ts can lazy-load and preload route components
+(``lazyWithPreload``), and scripts/generate-critical-css.js is a no-op, but
+nothing tells which chunks a route actually runs. With ``--coverage`` the
+runner attaches :class:`CoverageRecorder` to every test. For each page it
+starts V8 precise coverage (``Profiler.startPreciseCoverage``, block
+granularity, no call counts) and CSS rule usage tracking
+(``CSS.startRuleUsageTracking``) over the DevTools protocol and takes a
+delta:
+
+- when the page's load event fires (what the first view needed);
+- whenever the main frame moves to another route (SPA or full navigation);
+- when the test ends.
+
+Each delta is credited to the route the page was on (``/product/:id``-style
+keys). Used byte ranges of same-origin scripts and stylesheets are merged
+into tmp/coverage/tests/<TC id>.json, so repeated runs only add to them.
+
+    python -m harness.runner --coverage          # collect while the suite runs
+    python -m harness.coverage                   # per-chunk used/shipped bytes and flags
+    python -m harness.coverage --reset           # forget collected coverage (e.g. after a rebuild)
+
+The summary groups resources by chunk (the Vite content hash dropped from
+the file name, the newest build's file per chunk) and flags:
+
+- lazy-load candidates: scripts of at least ``--min-kb`` of which less than
+  ``--load-share`` had run by the load event of a page that downloaded
+  them, or that never ran more than ``--unused-share`` of their bytes;
+- critical-CSS candidates: stylesheets of at least ``--min-kb`` of which less
+  than ``--load-share`` was used at load; the used rules are what
+  generate-critical-css.js would inline.
+
+The summary is also written to tmp/coverage/<timestamp>.json.
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import re
+import shutil
+import sys
+import urllib.parse
+
+from playwright import async_api
+
+from . import config, locators
+
+# Vite names emitted files <name>-<8 char hash>.<ext>.
+_HASHED_RE = re.compile(r"^(?P<name>.+)-[A-Za-z0-9_-]{8}(?P<ext>\.(?:js|mjs|css))$")
+
+
+def merge(ranges):
+    """Sorted union of ``[start, end)`` ranges."""
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def covered(ranges):
+    return sum(end - start for start, end in ranges)
+
+
+def executed_ranges(functions):
+    """Byte ranges that ran, from V8 block coverage.
+
+    V8 reports nested ranges (a function, then its blocks); the innermost
+    range covering an offset decides whether it ran.
+    """
+    ranges = sorted(
+        ((entry["startOffset"], entry["endOffset"], entry["count"]) for function in functions for entry in function["ranges"]),
+        key=lambda entry: (entry[0], -entry[1]),
+    )
+    executed = []
+    stack = []
+    position = 0
+
+    def close(until):
+        nonlocal position
+        if stack and stack[-1][2] > 0 and until > position:
+            executed.append([position, until])
+        position = max(position, until)
+
+    for start, end, count in ranges:
+        while stack and stack[-1][1] <= start:
+            close(stack[-1][1])
+            stack.pop()
+        close(start)
+        stack.append((start, end, count))
+    while stack:
+        close(stack[-1][1])
+        stack.pop()
+    return merge(executed)
+
+
+def resource_key(url):
+    parts = urllib.parse.urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}{parts.path}"
+
+
+def chunk_name(url):
+    """``https://shop/assets/index-BdX3k2aQ.js`` -> ``assets/index.js``."""
+    path = urllib.parse.urlsplit(url).path.lstrip("/")
+    directory, _, name = path.rpartition("/")
+    match = _HASHED_RE.match(name)
+    if match:
+        name = match["name"] + match["ext"]
+    return f"{directory}/{name}" if directory else name
+
+
+class _PageCoverage:
+    """CDP session and current route of one page."""
+
+    def __init__(self, page, cdp):
+        self.page = page
+        self.cdp = cdp
+        self.route = locators.route_key(page.url)
+        self.sheets = {}      # styleSheetId -> resource key (or None when not tracked)
+        self.lock = asyncio.Lock()
+
+
+class CoverageRecorder:
+    """Runner instrument collecting per-route JS/CSS coverage for one context."""
+
+    def __init__(self):
+        self.context = None
+        self.origin = "{0.scheme}://{0.netloc}".format(urllib.parse.urlsplit(config.BASE_URL))
+        self.pages = {}
+        self.resources = {}   # resource key -> {"type", "bytes"}
+        self.routes = {}      # route -> resource key -> {"used": ranges, "atLoad": ranges}
+        self._listeners = []
+        self._pending = set()
+
+    async def attach(self, context, script=None):
+        self.context = context
+        context.on("page", self._watch)
+        for page in context.pages:
+            await self._start(page)
+
+    def _watch(self, page):
+        self._track(self._start(page))
+
+    def _track(self, coroutine):
+        task = asyncio.ensure_future(coroutine)
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _start(self, page):
+        try:
+            cdp = await self.context.new_cdp_session(page)
+            state = _PageCoverage(page, cdp)
+            cdp.on("CSS.styleSheetAdded", lambda event: self._sheet_added(state, event["header"]))
+            cdp.on("CSS.styleSheetRemoved", lambda event: state.sheets.pop(event["styleSheetId"], None))
+            await cdp.send("Profiler.enable")
+            await cdp.send("Profiler.startPreciseCoverage", {"callCount": False, "detailed": True})
+            await cdp.send("DOM.enable")
+            await cdp.send("CSS.enable")
+            await cdp.send("CSS.startRuleUsageTracking")
+        except async_api.Error:
+            return     # page closed before coverage started
+        self.pages[page] = state
+
+        def on_navigated(frame):
+            if frame == page.main_frame:
+                self._track(self._snapshot(state, locators.route_key(frame.url)))
+
+        def on_load(_page):
+            self._track(self._snapshot(state, state.route, at_load=True))
+
+        page.on("framenavigated", on_navigated)
+        page.on("load", on_load)
+        self._listeners += [(page, "framenavigated", on_navigated), (page, "load", on_load)]
+
+    def _sheet_added(self, state, header):
+        url = header.get("sourceURL") or ""
+        if header.get("isInline") or not url.startswith(self.origin):
+            state.sheets[header["styleSheetId"]] = None
+            return
+        key = resource_key(url)
+        state.sheets[header["styleSheetId"]] = key
+        self.resources[key] = {"type": "css", "bytes": header["length"]}
+
+    def _credit(self, route, key, ranges, at_load):
+        entry = self.routes.setdefault(route, {}).setdefault(key, {"used": [], "atLoad": []})
+        entry["used"] = merge(entry["used"] + ranges)
+        if at_load:
+            entry["atLoad"] = merge(entry["atLoad"] + ranges)
+
+    async def _snapshot(self, state, next_route, at_load=False):
+        """Credit coverage since the last snapshot to the page's route, then switch routes."""
+        async with state.lock:
+            route = state.route
+            state.route = next_route
+            try:
+                scripts = (await state.cdp.send("Profiler.takePreciseCoverage"))["result"]
+                rules = (await state.cdp.send("CSS.takeCoverageDelta"))["coverage"]
+            except async_api.Error:
+                return     # page or session gone
+        for entry in scripts:
+            url = entry["url"]
+            if not url.startswith(self.origin) or "." not in urllib.parse.urlsplit(url).path.rpartition("/")[2]:
+                continue   # other origins, inline and eval'd scripts
+            key = resource_key(url)
+            length = max((block["endOffset"] for function in entry["functions"] for block in function["ranges"]), default=0)
+            self.resources[key] = {"type": "js", "bytes": max(length, self.resources.get(key, {}).get("bytes", 0))}
+            self._credit(route, key, executed_ranges(entry["functions"]), at_load)
+        by_sheet = {}
+        for rule in rules:
+            key = state.sheets.get(rule["styleSheetId"])
+            if key is not None and rule["used"]:
+                by_sheet.setdefault(key, []).append([rule["startOffset"], rule["endOffset"]])
+        for key in {key for key in state.sheets.values() if key is not None}:
+            self._credit(route, key, merge(by_sheet.get(key, [])), at_load)
+
+    async def finish(self, script, outcome):
+        self.context.remove_listener("page", self._watch)
+        for page, event, listener in self._listeners:
+            page.remove_listener(event, listener)
+        while self._pending:
+            await asyncio.gather(*list(self._pending), return_exceptions=True)
+        for state in self.pages.values():
+            await self._snapshot(state, state.route)
+            try:
+                await state.cdp.detach()
+            except async_api.Error:
+                pass
+        if self.routes:
+            save_test(script.id, self.resources, self.routes)
+
+
+def _now():
+    return datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds")
+
+
+def tests_dir():
+    return config.COVERAGE_DIR / "tests"
+
+
+def load_test(test_id):
+    try:
+        return json.loads((tests_dir() / f"{test_id}.json").read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return {"id": test_id, "runs": 0, "resources": {}, "routes": {}}
+
+
+def save_test(test_id, resources, routes):
+    """Merge one run's coverage into ``tmp/coverage/tests/<test_id>.json``."""
+    stored = load_test(test_id)
+    seen = _now()
+    stored["runs"] += 1
+    stored["updatedAt"] = seen
+    for key, resource in resources.items():
+        stored["resources"][key] = {**resource, "seen": seen}
+    for route, by_resource in routes.items():
+        known = stored["routes"].setdefault(route, {})
+        for key, entry in by_resource.items():
+            previous = known.get(key, {"used": [], "atLoad": []})
+            known[key] = {name: merge(previous[name] + entry[name]) for name in ("used", "atLoad")}
+    path = tests_dir() / f"{test_id}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_name(f"{path.name}.{os.getpid()}.partial")
+    partial.write_text(json.dumps(stored, indent=1) + "\n", encoding="utf-8")
+    partial.replace(path)
+    return path
+
+
+def load_all():
+    """Every test's stored coverage."""
+    return [json.loads(path.read_text(encoding="utf-8")) for path in sorted(tests_dir().glob("*.json"))]
+
+
+def summarize(stored, min_bytes=20 * 1024, load_share=0.5, unused_share=0.1):
+    """One row per chunk: shipped and used bytes, routes, and flags."""
+    resources = {}
+    for test in stored:
+        for key, resource in test["resources"].items():
+            if key not in resources or resource["seen"] > resources[key]["seen"]:
+                resources[key] = resource
+    latest = {}
+    for key, resource in resources.items():
+        name = chunk_name(key)
+        if name not in latest or resource["seen"] > resources[latest[name]]["seen"]:
+            latest[name] = key
+
+    rows = []
+    for name, key in sorted(latest.items()):
+        resource = resources[key]
+        used, routes = [], {}
+        for test in stored:
+            for route, by_resource in test["routes"].items():
+                entry = by_resource.get(key)
+                if entry is None:
+                    continue
+                used = merge(used + entry["used"])
+                at_route = routes.setdefault(route, {"used": [], "atLoad": []})
+                at_route["used"] = merge(at_route["used"] + entry["used"])
+                at_route["atLoad"] = merge(at_route["atLoad"] + entry["atLoad"])
+        shipped = resource["bytes"] or 1
+        share = covered(used) / shipped
+        at_load = {route: covered(entry["atLoad"]) / shipped for route, entry in routes.items() if entry["atLoad"]}
+        worst_load = min(at_load.values()) if at_load else None
+        flags = []
+        if resource["bytes"] >= min_bytes:
+            if resource["type"] == "js":
+                if share < unused_share:
+                    flags.append(f"lazy-load: {share:.0%} ever ran")
+                elif worst_load is not None and worst_load < load_share:
+                    route = min(at_load, key=at_load.get)
+                    flags.append(f"lazy-load: {worst_load:.0%} ran by load on {route}")
+            elif worst_load is not None and worst_load < load_share:
+                critical = max(covered(entry["atLoad"]) for entry in routes.values())
+                flags.append(f"critical-css: inline ~{critical / 1024:.0f} KB used at load, defer the rest")
+        rows.append({
+            "chunk": name,
+            "url": key,
+            "type": resource["type"],
+            "shippedBytes": resource["bytes"],
+            "usedBytes": covered(used),
+            "usedShare": round(share, 3),
+            "usedAtLoadShare": {route: round(value, 3) for route, value in sorted(at_load.items())},
+            "routes": {route: covered(entry["used"]) for route, entry in sorted(routes.items())},
+            "flags": flags,
+        })
+    return rows
+
+
+def print_rows(rows):
+    print(f"{'chunk':<48} {'type':<4} {'shipped KB':>10} {'used KB':>8} {'used':>5} {'routes':>6}  flags")
+    for row in sorted(rows, key=lambda entry: entry["shippedBytes"] - entry["usedBytes"], reverse=True):
+        print(
+            f"{row['chunk'][-48:]:<48} {row['type']:<4} {row['shippedBytes'] / 1024:>10.1f} {row['usedBytes'] / 1024:>8.1f}"
+            f" {row['usedShare']:>5.0%} {len(row['routes']):>6}  {'; '.join(row['flags'])}"
+        )
+
+
+def save(rows, stored):
+    config.COVERAGE_DIR.mkdir(parents=True, exist_ok=True)
+    path = config.COVERAGE_DIR / f"{datetime.datetime.now():%Y%m%d-%H%M%S}.json"
+    payload = {"baseUrl": config.BASE_URL, "tests": {test["id"]: test["runs"] for test in stored}, "chunks": rows}
+    path.write_text(json.dumps(payload, indent=2) + "\n", encoding="utf-8")
+    return path
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--min-kb", type=float, default=20, help="only flag chunks at least this big (default: %(default)s)")
+    parser.add_argument("--load-share", type=float, default=0.5,
+                        help="flag chunks using less than this share by the load event (default: %(default)s)")
+    parser.add_argument("--unused-share", type=float, default=0.1,
+                        help="flag scripts that never ran more than this share (default: %(default)s)")
+    parser.add_argument("--reset", action="store_true", help="delete the collected coverage and exit")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.reset:
+        shutil.rmtree(tests_dir(), ignore_errors=True)
+        print(f"cleared {tests_dir()}")
+        return 0
+    stored = load_all()
+    if not stored:
+        print("No coverage collected yet; run: python -m harness.runner --coverage", file=sys.stderr)
+        return 1
+    rows = summarize(stored, args.min_kb * 1024, args.load_share, args.unused_share)
+    print_rows(rows)
+    flagged = [row for row in rows if row["flags"]]
+    print(f"\n{len(rows)} chunks from {len(stored)} tests, {len(flagged)} flagged")
+    print(f"wrote {save(rows, stored)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,255 @@
+"""Record a test's network traffic to HAR and replay it without the network.
+
+``--har record`` routes every request of a test's context through
+``context.route``, forwards it with ``route.fetch()`` and writes the
+exchanges to ``tmp/har/<TC id>.har``. ``--har replay`` serves requests to the
+replayed hosts (PocketBase, Builder.io, Razorpay by default) straight from
+that HAR with no network latency; everything else, such as the storefront's
+own assets, still goes to the network. Replays are deterministic: the same
+request gets the same recorded response, in recorded order when it repeats.
+
+    python -m harness.runner TC013 TC014 --har record
+    python -m harness.runner TC013 TC014 --har replay
+    python -m harness.har budget                     # check tmp/har/*.har
+
+``budget`` sums transferred bytes and request counts per page (the document
+URL at the time of the request) and compares them with har_budgets.json.
+"""
+import argparse
+import base64
+import collections
+import datetime
+import json
+import sys
+import time
+import urllib.parse
+from pathlib import Path
+
+from playwright import async_api
+
+from . import config
+
+TEXT_MIME_PARTS = ("text/", "json", "javascript", "xml", "svg", "css")
+
+
+def har_path(test_id):
+    return config.HAR_DIR / f"{test_id}.har"
+
+
+def _pairs(mapping):
+    return [{"name": name, "value": value} for name, value in mapping.items()]
+
+
+def _page_url(request):
+    try:
+        return request.frame.page.url
+    except async_api.Error:
+        return ""
+
+
+def _is_text(mime_type):
+    return any(part in mime_type for part in TEXT_MIME_PARTS)
+
+
+class HarRecorder:
+    """Runner instrument writing every request of a context to HAR."""
+
+    def __init__(self):
+        self.context = None
+        self.entries = []
+        self.pages = {}
+
+    async def attach(self, context, script=None):
+        self.context = context
+        await context.route("**/*", self._handle)
+
+    async def _handle(self, route, request):
+        started = datetime.datetime.now(datetime.timezone.utc)
+        clock = time.perf_counter()
+        try:
+            response = await route.fetch(max_redirects=0)
+            body = await response.body()
+        except async_api.Error:
+            await route.abort()
+            return
+        elapsed_ms = (time.perf_counter() - clock) * 1000
+        await route.fulfill(response=response, body=body)
+        self.entries.append(self._entry(request, response, body, started, elapsed_ms))
+
+    def _entry(self, request, response, body, started, elapsed_ms):
+        page = _page_url(request)
+        if page and page not in self.pages:
+            self.pages[page] = started.isoformat()
+        headers = response.headers
+        mime_type = headers.get("content-type", "")
+        content = {"size": len(body), "mimeType": mime_type}
+        if _is_text(mime_type):
+            content["text"] = body.decode("utf-8", "replace")
+        else:
+            content["text"] = base64.b64encode(body).decode()
+            content["encoding"] = "base64"
+        post_data = request.post_data
+        entry = {
+            "pageref": page,
+            "startedDateTime": started.isoformat(),
+            "time": round(elapsed_ms, 3),
+            "request": {
+                "method": request.method,
+                "url": request.url,
+                "httpVersion": "HTTP/1.1",
+                "headers": _pairs(request.headers),
+                "queryString": [
+                    {"name": name, "value": value}
+                    for name, value in urllib.parse.parse_qsl(urllib.parse.urlsplit(request.url).query)
+                ],
+                "cookies": [],
+                "headersSize": -1,
+                "bodySize": len(post_data.encode()) if post_data else 0,
+            },
+            "response": {
+                "status": response.status,
+                "statusText": response.status_text,
+                "httpVersion": "HTTP/1.1",
+                "headers": response.headers_array,
+                "cookies": [],
+                "content": content,
+                "redirectURL": headers.get("location", ""),
+                "headersSize": sum(len(h["name"]) + len(h["value"]) + 4 for h in response.headers_array),
+                "bodySize": len(body),
+            },
+            "cache": {},
+            "timings": {"send": 0, "wait": round(elapsed_ms, 3), "receive": 0},
+            "_resourceType": request.resource_type,
+        }
+        if post_data:
+            entry["request"]["postData"] = {"mimeType": request.headers.get("content-type", ""), "text": post_data}
+        return entry
+
+    def har(self):
+        return {"log": {
+            "version": "1.2",
+            "creator": {"name": "testsprite-harness", "version": "1"},
+            "pages": [
+                {"id": url, "title": url, "startedDateTime": started, "pageTimings": {}}
+                for url, started in self.pages.items()
+            ],
+            "entries": self.entries,
+        }}
+
+    async def finish(self, script, outcome):
+        await self.context.unroute("**/*", self._handle)
+        config.HAR_DIR.mkdir(parents=True, exist_ok=True)
+        with open(har_path(script.id), "w", encoding="utf-8") as fh:
+            json.dump(self.har(), fh)
+
+
+def _replayed(url, hosts):
+    hostname = urllib.parse.urlsplit(url).hostname or ""
+    return any(hostname == host or hostname.endswith("." + host) for host in hosts)
+
+
+class HarReplayer:
+    """Runner instrument fulfilling replayed hosts from the test's HAR."""
+
+    def __init__(self, hosts=None):
+        self.hosts = tuple(hosts or config.HAR_REPLAY_HOSTS)
+        self.context = None
+        self.responses = collections.defaultdict(collections.deque)
+        self.served = 0
+        self.misses = []
+
+    async def attach(self, context, script=None):
+        path = har_path(script.id)
+        try:
+            with open(path, encoding="utf-8") as fh:
+                entries = json.load(fh)["log"]["entries"]
+        except FileNotFoundError:
+            raise FileNotFoundError(f"No recording at {path}; run with --har record first") from None
+        for entry in entries:
+            request = entry["request"]
+            if _replayed(request["url"], self.hosts):
+                self.responses[self._key(request["method"], request["url"], request.get("postData", {}).get("text"))].append(entry["response"])
+        self.context = context
+        await context.route("**/*", self._handle)
+
+    @staticmethod
+    def _key(method, url, post_data):
+        return method, url, post_data or ""
+
+    async def _handle(self, route, request):
+        if not _replayed(request.url, self.hosts):
+            await route.fallback()
+            return
+        queue = self.responses.get(self._key(request.method, request.url, request.post_data))
+        if not queue:
+            self.misses.append(f"{request.method} {request.url}")
+            await route.fulfill(status=404, content_type="text/plain", body="Not in HAR recording")
+            return
+        response = queue[0] if len(queue) == 1 else queue.popleft()
+        content = response["content"]
+        body = content.get("text", "")
+        body = base64.b64decode(body) if content.get("encoding") == "base64" else body.encode()
+        headers = {
+            header["name"]: header["value"] for header in response["headers"]
+            if header["name"].lower() not in ("content-length", "content-encoding", "transfer-encoding")
+        }
+        self.served += 1
+        await route.fulfill(status=response["status"], headers=headers, body=body)
+
+    async def finish(self, script, outcome):
+        await self.context.unroute("**/*", self._handle)
+        if self.misses:
+            print(f"{script.id}: {len(self.misses)} request(s) missing from the HAR, e.g. {self.misses[0]}", file=sys.stderr)
+
+
+# -- budgets -------------------------------------------------------------------
+
+def page_totals(har):
+    """``{page path: {"bytes": n, "requests": n}}`` for one HAR."""
+    totals = {}
+    for entry in har["log"]["entries"]:
+        page = urllib.parse.urlsplit(entry.get("pageref") or "").path or "/"
+        response = entry["response"]
+        total = totals.setdefault(page, {"bytes": 0, "requests": 0})
+        total["bytes"] += max(0, response.get("bodySize", 0)) + max(0, response.get("headersSize", 0))
+        total["requests"] += 1
+    return totals
+
+
+def check_budgets(paths, budgets):
+    """Yield ``(har name, page, totals, violations)`` per page."""
+    default = budgets.get("default", {})
+    for path in paths:
+        with open(path, encoding="utf-8") as fh:
+            har = json.load(fh)
+        for page, totals in sorted(page_totals(har).items()):
+            budget = {**default, **budgets.get("pages", {}).get(page, {})}
+            violations = []
+            if "maxBytes" in budget and totals["bytes"] > budget["maxBytes"]:
+                violations.append(f"{totals['bytes']} bytes > {budget['maxBytes']}")
+            if "maxRequests" in budget and totals["requests"] > budget["maxRequests"]:
+                violations.append(f"{totals['requests']} requests > {budget['maxRequests']}")
+            yield Path(path).stem, page, totals, violations
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    budget = sub.add_parser("budget", help="check recorded HARs against har_budgets.json")
+    budget.add_argument("hars", nargs="*", type=Path, help="HAR files (default: tmp/har/*.har)")
+    budget.add_argument("--budgets", type=Path, default=config.HAR_BUDGETS_PATH)
+    args = parser.parse_args(argv)
+
+    with open(args.budgets, encoding="utf-8") as fh:
+        budgets = json.load(fh)
+    paths = args.hars or sorted(config.HAR_DIR.glob("*.har"))
+    failed = 0
+    for name, page, totals, violations in check_budgets(paths, budgets):
+        status = "OVER " + "; ".join(violations) if violations else "ok"
+        print(f"{name:<6} {page:<40} {totals['bytes']:>10} B {totals['requests']:>5} req  {status}")
+        failed += bool(violations)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,346 @@
+"""Append-only run history in SQLite (tmp/history.sqlite).
+
+tmp/test_results.json only holds the latest status of each test, and it
+carries the script's full source in every entry. The history keeps every
+result of every run instead, and runs no longer rewrite that file; ``export``
+writes it from the history when TestSprite needs it:
+
+- ``runs``: one row per runner/shard invocation.
+- ``results``: one row per test result. Rows are written as each test
+  finishes, from whichever shard process ran it, so a run can be watched
+  while it is still going.
+- ``code_blobs``: script sources stored once per SHA-256. A result only
+  references its blob by hash.
+
+Each result row holds status, duration, the error, a normalised error
+signature for clustering and the view's headline Web Vitals. The indexes on
+(test_id, id) and (signature) keep the queries below at a few milliseconds,
+even after thousands of runs:
+
+    python -m harness.history flaky [--last 50]
+    python -m harness.history trend TC004 [--last 50]
+    python -m harness.history clusters [TC004] [--last 500]
+    python -m harness.history import       # seed from tmp/test_results.json
+    python -m harness.history export       # write tmp/test_results.json from the newest results
+"""
+import argparse
+import contextlib
+import datetime
+import hashlib
+import json
+import re
+import socket
+import sqlite3
+import statistics
+import subprocess
+import sys
+
+from . import baseline, config, results, vitals
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    started TEXT NOT NULL,
+    finished TEXT,
+    host TEXT,
+    git_rev TEXT,
+    argv TEXT
+);
+CREATE TABLE IF NOT EXISTS code_blobs (
+    hash TEXT PRIMARY KEY,
+    code TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER REFERENCES runs(id),
+    test_id TEXT NOT NULL,
+    title TEXT,
+    status TEXT NOT NULL,
+    duration_ms INTEGER,
+    error TEXT,
+    signature TEXT,
+    code_hash TEXT REFERENCES code_blobs(hash),
+    lcp_ms REAL,
+    cls REAL,
+    tbt_ms REAL,
+    inp_ms REAL,
+    transfer_bytes INTEGER,
+    finished TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_test ON results (test_id, id);
+CREATE INDEX IF NOT EXISTS results_signature ON results (signature) WHERE signature IS NOT NULL;
+"""
+
+# Error text -> signature: volatile parts become placeholders so the same
+# failure in different runs (other ids, timings, line numbers) clusters.
+_SIGNATURE_RULES = [
+    (re.compile(r"xpath=[^\s'\"]+"), "xpath=<path>"),
+    (re.compile(r"https?://[^\s'\"]+"), "<url>"),
+    (re.compile(r"'[^']*'|\"[^\"]*\""), "<str>"),
+    (re.compile(r"\b0x[0-9a-f]+\b", re.I), "<hex>"),
+    (re.compile(r"\d+(?:\.\d+)?"), "<n>"),
+    (re.compile(r"\s+"), " "),
+]
+
+
+def now():
+    return datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def connect(path=None):
+    path = path or config.HISTORY_PATH
+    path.parent.mkdir(parents=True, exist_ok=True)
+    connection = sqlite3.connect(path, timeout=30, isolation_level=None)
+    connection.execute("PRAGMA journal_mode=WAL")       # shard processes write concurrently
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.executescript(SCHEMA)
+    return connection
+
+
+def signature(error):
+    """Normalised key for the line of ``error`` that says what went wrong."""
+    if not error:
+        return None
+    lines = [line.strip() for line in error.strip().splitlines() if line.strip()]
+    text = lines[-1] if lines else error
+    for pattern, replacement in _SIGNATURE_RULES:
+        text = pattern.sub(replacement, text)
+    return text.strip()[:300]
+
+
+def git_rev():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=config.TESTS_DIR, capture_output=True, text=True, timeout=5,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def start_run(argv=None, path=None):
+    """Open a run and return its id."""
+    with contextlib.closing(connect(path)) as connection:
+        cursor = connection.execute(
+            "INSERT INTO runs (started, host, git_rev, argv) VALUES (?, ?, ?, ?)",
+            (now(), socket.gethostname(), git_rev(), json.dumps(list(argv or sys.argv[1:]))),
+        )
+        return cursor.lastrowid
+
+
+def finish_run(run_id, path=None):
+    with contextlib.closing(connect(path)) as connection:
+        connection.execute("UPDATE runs SET finished = ? WHERE id = ?", (now(), run_id))
+
+
+def add_result(connection, run_id, outcome, code=None, vitals_payload=None, finished=None):
+    """Append one outcome; ``code`` is stored once per distinct source."""
+    code_hash = None
+    if code is not None:
+        code_hash = hashlib.sha256(code.encode()).hexdigest()
+        connection.execute("INSERT OR IGNORE INTO code_blobs (hash, code) VALUES (?, ?)", (code_hash, code))
+    metrics = dict(baseline.metrics(outcome, vitals_payload)) if vitals_payload else {}
+    connection.execute(
+        "INSERT INTO results (run_id, test_id, title, status, duration_ms, error, signature, code_hash,"
+        " lcp_ms, cls, tbt_ms, inp_ms, transfer_bytes, finished) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (
+            run_id, outcome["id"], outcome.get("title"), outcome["status"], outcome.get("durationMs"),
+            outcome.get("error") or None, signature(outcome.get("error")) if outcome["status"] != "PASSED" else None,
+            code_hash, metrics.get("lcpMs"), metrics.get("cls"), metrics.get("totalBlockingTimeMs"),
+            metrics.get("inpMs"), metrics.get("transferBytes"), finished or now(),
+        ),
+    )
+
+
+class HistoryRecorder:
+    """Runner instrument: appends each outcome as soon as its test finishes.
+
+    Listed after :class:`harness.vitals.VitalsRecorder` so the test's vitals
+    file is already written; ``with_vitals=False`` when vitals are off, so a
+    stale file from an earlier run is not attributed to this one.
+    """
+
+    passive = True
+
+    def __init__(self, run_id, with_vitals=True):
+        self.run_id = run_id
+        self.with_vitals = with_vitals
+
+    async def attach(self, context, script=None):
+        pass
+
+    async def finish(self, script, outcome):
+        try:
+            code = script.path.read_text(encoding="utf-8") if script.path.suffix == ".py" else None
+        except OSError:
+            code = None
+        with contextlib.closing(connect()) as connection:
+            add_result(connection, self.run_id, outcome, code, vitals.load(script.id) if self.with_vitals else None)
+
+
+# -- queries -------------------------------------------------------------------
+
+def _recent(connection, test_id, last):
+    return connection.execute(
+        "SELECT status, duration_ms, finished FROM results WHERE test_id = ? ORDER BY id DESC LIMIT ?",
+        (test_id, last),
+    ).fetchall()[::-1]
+
+
+def test_ids(connection):
+    return [row[0] for row in connection.execute("SELECT DISTINCT test_id FROM results ORDER BY test_id")]
+
+
+def flakiness(connection, test_id, last=50):
+    """Pass/fail mix and how often the status flips over the last ``last`` results."""
+    statuses = [row[0] for row in _recent(connection, test_id, last)]
+    if not statuses:
+        return None
+    failed = sum(status != "PASSED" for status in statuses)
+    flips = sum(a != b for a, b in zip(statuses, statuses[1:]))
+    return {
+        "testId": test_id,
+        "runs": len(statuses),
+        "failRate": round(failed / len(statuses), 3),
+        "flipRate": round(flips / (len(statuses) - 1), 3) if len(statuses) > 1 else 0.0,
+        "flaky": 0 < failed < len(statuses),
+        "recent": "".join("." if status == "PASSED" else "F" for status in statuses[-20:]),
+    }
+
+
+def duration_trend(connection, test_id, last=50, passed_only=True):
+    """Durations of the last ``last`` results and their least-squares slope per run."""
+    rows = [row for row in _recent(connection, test_id, last) if row[1] is not None]
+    if passed_only:
+        rows = [row for row in rows if row[0] == "PASSED"] or rows
+    values = [row[1] for row in rows]
+    if not values:
+        return None
+    slope = 0.0
+    if len(values) > 1:
+        mean_x, mean_y = (len(values) - 1) / 2, statistics.fmean(values)
+        slope = sum((x - mean_x) * (y - mean_y) for x, y in enumerate(values)) / sum(
+            (x - mean_x) ** 2 for x in range(len(values))
+        )
+    return {
+        "testId": test_id,
+        "runs": len(values),
+        "medianMs": statistics.median(values),
+        "p90Ms": round(baseline.percentile(values, 90)),
+        "slopeMsPerRun": round(slope, 1),
+        "durationsMs": values,
+    }
+
+
+def failure_clusters(connection, test_id=None, last=500):
+    """Failures of the last ``last`` results grouped by error signature, biggest first."""
+    where, params = ("WHERE test_id = ?", (test_id,)) if test_id else ("", ())
+    rows = connection.execute(
+        f"SELECT signature, COUNT(*), GROUP_CONCAT(DISTINCT test_id), MIN(finished), MAX(finished), MAX(error)"
+        f" FROM (SELECT * FROM results {where} ORDER BY id DESC LIMIT ?)"
+        f" WHERE signature IS NOT NULL GROUP BY signature ORDER BY COUNT(*) DESC",
+        (*params, last),
+    ).fetchall()
+    return [
+        {"signature": sig, "count": count, "tests": sorted(tests.split(",")), "first": first, "last": latest, "example": example}
+        for sig, count, tests, first, latest, example in rows
+    ]
+
+
+def durations(path=None, last=5):
+    """Median passing duration per test over its last ``last`` passes, for shard planning."""
+    if not (path or config.HISTORY_PATH).exists():
+        return {}
+    with contextlib.closing(connect(path)) as connection:
+        rows = connection.execute(
+            "SELECT test_id, duration_ms FROM (SELECT test_id, duration_ms, ROW_NUMBER() OVER"
+            " (PARTITION BY test_id ORDER BY id DESC) AS age FROM results"
+            " WHERE status = 'PASSED' AND duration_ms IS NOT NULL) WHERE age <= ?",
+            (last,),
+        ).fetchall()
+    by_test = {}
+    for test_id, duration in rows:
+        by_test.setdefault(test_id, []).append(duration)
+    return {test_id: statistics.median(values) for test_id, values in by_test.items()}
+
+
+def latest_outcomes(connection):
+    """The newest result of each test, as runner outcomes."""
+    rows = connection.execute(
+        "SELECT test_id, title, status, error, duration_ms FROM results"
+        " WHERE id IN (SELECT MAX(id) FROM results GROUP BY test_id) ORDER BY test_id"
+    ).fetchall()
+    return [
+        {"id": test_id, "title": title or test_id, "status": status, "error": error or "", "durationMs": duration}
+        for test_id, title, status, error, duration in rows
+    ]
+
+
+def export_results(path=None, history_path=None):
+    """Merge the newest result of each test into tmp/test_results.json; returns how many."""
+    with contextlib.closing(connect(history_path)) as connection:
+        outcomes = latest_outcomes(connection)
+    results.record(outcomes, path)
+    return len(outcomes)
+
+
+def import_results(path=None):
+    """Seed the history with tmp/test_results.json as one run."""
+    entries = [entry for entry in results.load(path) if entry.get("testStatus")]
+    run_id = start_run(["import", str(path or config.RESULTS_PATH)])
+    with contextlib.closing(connect()) as connection:
+        for entry in entries:
+            outcome = {
+                "id": results.test_id(entry["title"]),
+                "title": entry["title"],
+                "status": entry["testStatus"],
+                "error": entry.get("testError") or "",
+                "durationMs": entry.get("durationMs"),
+            }
+            add_result(connection, run_id, outcome, entry.get("code"), finished=entry.get("modified"))
+    finish_run(run_id)
+    return len(entries)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    flaky_parser = commands.add_parser("flaky", help="fail and flip rates per test")
+    flaky_parser.add_argument("--last", type=int, default=50)
+    trend_parser = commands.add_parser("trend", help="duration trend of one test")
+    trend_parser.add_argument("test")
+    trend_parser.add_argument("--last", type=int, default=50)
+    clusters_parser = commands.add_parser("clusters", help="failures grouped by error signature")
+    clusters_parser.add_argument("test", nargs="?")
+    clusters_parser.add_argument("--last", type=int, default=500)
+    commands.add_parser("import", help=f"import {config.RESULTS_PATH.name} as one run")
+    commands.add_parser("export", help=f"write the newest result of each test to {config.RESULTS_PATH.name}")
+    args = parser.parse_args(argv)
+
+    if args.command == "import":
+        print(f"imported {import_results()} results")
+        return 0
+    if args.command == "export":
+        print(f"exported {export_results()} results to {config.RESULTS_PATH}")
+        return 0
+    with contextlib.closing(connect()) as connection:
+        if args.command == "flaky":
+            for test_id in test_ids(connection):
+                row = flakiness(connection, test_id, args.last)
+                mark = "flaky" if row["flaky"] else ""
+                print(f"{test_id}  {row['runs']:>4} runs  fail {row['failRate']:>6.1%}  flip {row['flipRate']:>6.1%}  {row['recent']:<20}  {mark}")
+        elif args.command == "trend":
+            row = duration_trend(connection, args.test.upper(), args.last)
+            if row is None:
+                print(f"No durations for {args.test}", file=sys.stderr)
+                return 1
+            print(f"{row['testId']}  {row['runs']} runs  median {row['medianMs'] / 1000:.1f}s  p90 {row['p90Ms'] / 1000:.1f}s"
+                  f"  slope {row['slopeMsPerRun']:+.0f} ms/run")
+        else:
+            for cluster in failure_clusters(connection, args.test and args.test.upper(), args.last):
+                print(f"{cluster['count']:>5}x  {', '.join(cluster['tests'])}  (last {cluster['last']})")
+                print(f"       {cluster['signature']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
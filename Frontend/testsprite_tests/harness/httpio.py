@@ -0,0 +1,236 @@
+"""Minimal asyncio HTTP/1.1 client and server.
+
+Standard library only, so the fixtures, stand-in services and tools in this
+package need nothing beyond Playwright. The client opens one connection per
+request (``Connection: close``); the server supports keep-alive.
+"""
+import asyncio
+import json as jsonlib
+import ssl
+import threading
+import urllib.parse
+from dataclasses import dataclass, field
+
+
+@dataclass
+class Response:
+    status: int
+    headers: dict = field(default_factory=dict)
+    body: bytes = b""
+
+    @property
+    def ok(self):
+        return 200 <= self.status < 300
+
+    def json(self):
+        return jsonlib.loads(self.body or b"null")
+
+    def text(self):
+        return self.body.decode("utf-8", "replace")
+
+
+async def read_headers(reader):
+    """Read header lines up to the blank line; keys are lower-cased."""
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            return headers
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+
+async def read_body(reader, headers):
+    """Read a message body framed by Content-Length or chunked encoding."""
+    if "chunked" in headers.get("transfer-encoding", "").lower():
+        chunks = []
+        while True:
+            size = int((await reader.readline()).split(b";", 1)[0].strip() or b"0", 16)
+            if size == 0:
+                await read_headers(reader)  # trailers
+                return b"".join(chunks)
+            chunks.append(await reader.readexactly(size))
+            await reader.readline()
+    if "content-length" in headers:
+        return await reader.readexactly(int(headers["content-length"]))
+    return b""
+
+
+async def _exchange(method, parts, head, body):
+    https = parts.scheme == "https"
+    reader, writer = await asyncio.open_connection(
+        parts.hostname,
+        parts.port or (443 if https else 80),
+        ssl=ssl.create_default_context() if https else None,
+    )
+    try:
+        writer.write(head + body)
+        await writer.drain()
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionError("connection closed before the response")
+        status = int(status_line.split(b" ", 2)[1])
+        headers = await read_headers(reader)
+        if method == "HEAD" or status in (204, 304) or status < 200:
+            payload = b""
+        elif "content-length" in headers or "transfer-encoding" in headers:
+            payload = await read_body(reader, headers)
+        else:
+            payload = await reader.read()
+        return Response(status, headers, payload)
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except (ConnectionError, ssl.SSLError):
+            pass
+
+
+async def request(method, url, json=None, data=b"", headers=None, timeout=30):
+    """Send one request and return a :class:`Response` (never raises on status)."""
+    parts = urllib.parse.urlsplit(url)
+    target = parts.path or "/"
+    if parts.query:
+        target += "?" + parts.query
+
+    body = data
+    all_headers = {
+        "Host": parts.netloc,
+        "Connection": "close",
+        "Accept": "application/json",
+        "User-Agent": "testsprite-harness",
+    }
+    if json is not None:
+        body = jsonlib.dumps(json).encode()
+        all_headers["Content-Type"] = "application/json"
+    if body or method in ("POST", "PUT", "PATCH"):
+        all_headers["Content-Length"] = str(len(body))
+    all_headers.update(headers or {})
+
+    head = f"{method} {target} HTTP/1.1\r\n"
+    head += "".join(f"{name}: {value}\r\n" for name, value in all_headers.items())
+    head += "\r\n"
+    return await asyncio.wait_for(_exchange(method, parts, head.encode("latin-1"), body), timeout)
+
+
+@dataclass
+class Request:
+    method: str
+    path: str
+    query: dict
+    headers: dict
+    body: bytes = b""
+    params: dict = field(default_factory=dict)
+
+    def json(self):
+        return jsonlib.loads(self.body or b"null")
+
+
+def json_response(status, payload, headers=None):
+    return Response(status, {"content-type": "application/json", **(headers or {})}, jsonlib.dumps(payload).encode())
+
+
+_REASONS = {200: "OK", 201: "Created", 204: "No Content", 400: "Bad Request", 401: "Unauthorized",
+            403: "Forbidden", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error",
+            502: "Bad Gateway", 503: "Service Unavailable"}
+
+
+async def _handle_connection(handler, reader, writer):
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line.strip():
+                return
+            method, target, _ = request_line.decode("latin-1").split(" ", 2)
+            headers = await read_headers(reader)
+            body = await read_body(reader, headers)
+            parts = urllib.parse.urlsplit(target)
+            query = dict(urllib.parse.parse_qsl(parts.query, keep_blank_values=True))
+            request = Request(method.upper(), urllib.parse.unquote(parts.path), query, headers, body)
+
+            try:
+                response = await handler(request)
+            except Exception as exc:  # keep serving; the client sees a 500
+                response = json_response(500, {"code": 500, "message": str(exc), "data": {}})
+
+            payload = b"" if method.upper() == "HEAD" else response.body
+            head = f"HTTP/1.1 {response.status} {_REASONS.get(response.status, 'Unknown')}\r\n"
+            out_headers = {"content-length": str(len(response.body)), **response.headers}
+            head += "".join(f"{name}: {value}\r\n" for name, value in out_headers.items()) + "\r\n"
+            writer.write(head.encode("latin-1") + payload)
+            await writer.drain()
+            if headers.get("connection", "").lower() == "close":
+                return
+    except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(handler, host="127.0.0.1", port=0):
+    """Start a keep-alive HTTP/1.1 server calling ``await handler(request)``.
+
+    Returns the ``asyncio.Server``; with ``port=0`` read the chosen port from
+    ``server.sockets[0].getsockname()[1]``.
+    """
+    return await asyncio.start_server(
+        lambda reader, writer: _handle_connection(handler, reader, writer), host, port,
+    )
+
+
+class ServerThread:
+    """Run an :func:`serve` server on its own event loop in a daemon thread.
+
+    Lets synchronous code (the shard parent, CLI tools) host a stand-in
+    service while Playwright runs elsewhere.
+    """
+
+    def __init__(self, handler, host="127.0.0.1", port=0):
+        self.handler = handler
+        self.host = host
+        self.port = port
+        self._loop = None
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def start(self):
+        started = threading.Event()
+        errors = []
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            try:
+                self._server = self._loop.run_until_complete(serve(self.handler, self.host, self.port))
+                self.port = self._server.sockets[0].getsockname()[1]
+            except OSError as exc:
+                errors.append(exc)
+                started.set()
+                return
+            started.set()
+            self._loop.run_forever()
+            self._server.close()
+            self._loop.run_until_complete(self._server.wait_closed())
+            self._loop.close()
+
+        self._thread = threading.Thread(target=run, name=f"httpio:{self.port}", daemon=True)
+        self._thread.start()
+        started.wait()
+        if errors:
+            raise errors[0]
+        return self
+
+    def stop(self):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=5)
+
+    def __enter__(self):
+        # Helpers such as pocketbase_stub.start() hand back a running server.
+        return self if self._thread is not None else self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
@@ -0,0 +1,419 @@
+"""Main-thread cost of each checkout form interaction, from Chrome traces.
+
+The checkout form (src/pages/Checkout.tsx: name, email, address, city,
+state, ZIP, phone, coupon) feels sluggish on low-end phones. This runs a
+test (TC004 by default) with the CPU slowed down like a mid-range phone and
+records a Chrome trace (CDP ``Tracing``, with the V8 sampling profiler)
+around every ``actions.fill`` and ``actions.click`` on the checkout route.
+For each step it reports:
+
+- an INP-style latency: from the first input event dispatched (focus,
+  input, pointer, click) to the end of the first paint after the handlers'
+  task, split into input delay, processing and presentation delay;
+- long tasks (over 50 ms) and their blocking time;
+- main-thread time in script, style recalculation and layout;
+- the JS call stacks the sampling profiler saw most often.
+
+Playwright's ``fill`` sets the value and fires ``input`` without key
+events, so the browser's own Event Timing (and INP) ignores it; measuring
+from the trace covers fills and clicks alike. Steps are grouped per field
+(the element's ``name``, label or text); the table shows the worst latency
+over ``--repeats`` runs, like INP.
+
+    python -m harness.interactions                     # TC004 on /checkout, CPU 4x slower
+    python -m harness.interactions TC004 -k 3 --cpu 6 --keep-traces
+
+Only one trace can record at a time per browser, so tests run one after
+the other. Stacks name the functions as served; against a production build
+they are minified. ``--keep-traces`` writes each step's trace to
+tmp/interactions/traces/ for the DevTools Performance panel. The summary
+goes to tmp/interactions/<timestamp>.json.
+"""
+import argparse
+import asyncio
+import collections
+import contextlib
+import functools
+import json
+import statistics
+import sys
+import urllib.parse
+from datetime import datetime
+
+from playwright import async_api
+
+from . import actions, blocking, config, locators, matrix, runner
+
+ROUTES = ("/checkout",)
+
+CATEGORIES = [
+    "-*",
+    "devtools.timeline",
+    "disabled-by-default-devtools.timeline",
+    "disabled-by-default-devtools.timeline.frame",
+    "toplevel",
+    "v8.execute",
+    "blink.user_timing",
+    "latencyInfo",
+    "disabled-by-default-v8.cpu_profiler",
+]
+
+INPUT_EVENTS = {
+    "pointerdown", "pointerup", "mousedown", "mouseup", "click", "keydown", "keypress", "keyup",
+    "beforeinput", "input", "change", "focus", "focusin", "blur", "focusout",
+}
+TASK_EVENTS = {"RunTask", "ThreadControllerImpl::RunTask"}
+SCRIPT_EVENTS = {
+    "EventDispatch", "FunctionCall", "EvaluateScript", "TimerFire", "FireAnimationFrame",
+    "FireIdleCallback", "RunMicrotasks", "V8.Execute", "v8.callFunction", "v8.run", "v8.compile",
+}
+STYLE_EVENTS = {"UpdateLayoutTree", "RecalculateStyles"}
+LAYOUT_EVENTS = {"Layout"}
+PAINT_EVENTS = {"Paint", "Commit"}
+PROFILER_ROOTS = {"(root)", "(program)", "(idle)"}
+LONG_TASK_MS = 50
+STACK_DEPTH = 4
+
+DESCRIBE_SCRIPT = """
+(el) => {
+  const label = el.labels && el.labels.length ? el.labels[0].innerText : '';
+  const text = el.getAttribute('name') || el.getAttribute('aria-label') || label
+    || el.getAttribute('placeholder') || el.id || el.innerText || el.tagName.toLowerCase();
+  return text.trim().replace(/\\s+/g, ' ').slice(0, 40);
+}
+"""
+
+# Chrome records one trace at a time per browser.
+_tracing = asyncio.Lock()
+
+
+def _merged_ms(intervals):
+    """Total length of the union of ``(start, end)`` microsecond intervals, in ms."""
+    total = 0
+    current_start = current_end = None
+    for start, end in sorted(intervals):
+        if current_end is None or start > current_end:
+            if current_end is not None:
+                total += current_end - current_start
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    if current_end is not None:
+        total += current_end - current_start
+    return round(total / 1000, 1)
+
+
+def main_thread(events):
+    """``(pid, tid)`` of the renderer main thread of the traced page."""
+    names = {(event["pid"], event["tid"]): event["args"]["name"]
+             for event in events if event.get("ph") == "M" and event.get("name") == "thread_name"}
+    renderers = {key for key, name in names.items() if name == "CrRendererMain"}
+    for event in events:
+        if event.get("name") == "TracingStartedInBrowser":
+            for frame in event["args"]["data"].get("frames", []):
+                if not frame.get("parent"):
+                    for key in renderers:
+                        if key[0] == frame.get("processId"):
+                            return key
+    # Otherwise the renderer that dispatched the most input events.
+    counts = collections.Counter(
+        (event["pid"], event["tid"]) for event in events
+        if event.get("name") == "EventDispatch" and (event["pid"], event["tid"]) in renderers
+    )
+    return counts.most_common(1)[0][0] if counts else None
+
+
+def _frame(call_frame):
+    name = call_frame.get("functionName") or "(anonymous)"
+    url = call_frame.get("url") or ""
+    if not url:
+        return name
+    tail = urllib.parse.urlsplit(url).path.rpartition("/")[2] or url
+    return f"{name} {tail}:{call_frame.get('lineNumber', -1) + 1}:{call_frame.get('columnNumber', -1) + 1}"
+
+
+def stacks(events, thread):
+    """``{stack: ms}`` from the sampling profiler's chunks on ``thread``; stacks leaf first."""
+    # Chunks may come from the profiler's own thread; the Profile event names the sampled one.
+    ids = {
+        event.get("id") for event in events
+        if event.get("name") == "Profile" and (event["pid"], event["tid"]) == thread
+    }
+    profiles = {}
+    for event in events:
+        if event.get("name") != "ProfileChunk" or event["pid"] != thread[0] or event.get("id") not in ids:
+            continue
+        profile = profiles.setdefault(event["id"], {"nodes": {}, "samples": [], "deltas": []})
+        data = event["args"]["data"]
+        cpu_profile = data.get("cpuProfile", {})
+        for node in cpu_profile.get("nodes", []):
+            profile["nodes"][node["id"]] = node
+        profile["samples"] += cpu_profile.get("samples", [])
+        profile["deltas"] += data.get("timeDeltas", [])
+    totals = collections.Counter()
+    for profile in profiles.values():
+        nodes = profile["nodes"]
+        for node_id, delta in zip(profile["samples"], profile["deltas"]):
+            node = nodes.get(node_id)
+            if node is None or node["callFrame"].get("functionName") in PROFILER_ROOTS:
+                continue
+            frames = []
+            while node is not None and len(frames) < STACK_DEPTH:
+                if node["callFrame"].get("functionName") != "(root)":
+                    frames.append(_frame(node["callFrame"]))
+                node = nodes.get(node.get("parent"))
+            totals[" < ".join(frames)] += max(delta, 0) / 1000
+    return totals
+
+
+def analyse(events):
+    """Latency and main-thread breakdown of one traced step."""
+    thread = main_thread(events)
+    if thread is None:
+        return None
+    spans = [
+        event for event in events
+        if (event["pid"], event["tid"]) == thread and event.get("ph") == "X" and "dur" in event
+    ]
+    tasks = [event for event in spans if event["name"] in TASK_EVENTS]
+    dispatches = sorted(
+        (event for event in spans if event["name"] == "EventDispatch"
+         and event.get("args", {}).get("data", {}).get("type") in INPUT_EVENTS),
+        key=lambda event: event["ts"],
+    )
+    result = {"inputEvents": len(dispatches), "latencyMs": None}
+    if dispatches:
+        first, last = dispatches[0], dispatches[-1]
+
+        def task_around(event):
+            for task in tasks:
+                if task["ts"] <= event["ts"] and event["ts"] + event["dur"] <= task["ts"] + task["dur"]:
+                    return task
+            return event
+
+        queued = task_around(first)
+        processed = task_around(last)
+        processing_end = processed["ts"] + processed["dur"]
+        painted = min(
+            (event["ts"] + event["dur"] for event in spans if event["name"] in PAINT_EVENTS and event["ts"] >= processing_end),
+            default=processing_end,
+        )
+        result.update(
+            latencyMs=round((painted - queued["ts"]) / 1000, 1),
+            inputDelayMs=round((first["ts"] - queued["ts"]) / 1000, 1),
+            processingMs=round((processing_end - first["ts"]) / 1000, 1),
+            presentationMs=round((painted - processing_end) / 1000, 1),
+        )
+    long_tasks = [task["dur"] / 1000 for task in tasks if task["dur"] / 1000 > LONG_TASK_MS]
+    result.update(
+        longTasks=len(long_tasks),
+        longestTaskMs=round(max(long_tasks, default=0.0), 1),
+        blockingMs=round(sum(duration - LONG_TASK_MS for duration in long_tasks), 1),
+        scriptMs=_merged_ms((event["ts"], event["ts"] + event["dur"]) for event in spans if event["name"] in SCRIPT_EVENTS),
+        styleMs=_merged_ms((event["ts"], event["ts"] + event["dur"]) for event in spans if event["name"] in STYLE_EVENTS),
+        layoutMs=_merged_ms((event["ts"], event["ts"] + event["dur"]) for event in spans if event["name"] in LAYOUT_EVENTS),
+        stacks={stack: round(ms, 1) for stack, ms in stacks(events, thread).most_common(5)},
+    )
+    return result
+
+
+def _on_routes(url, routes):
+    key = locators.route_key(url)
+    return any(key == route or key.startswith(route.rstrip("/") + "/") for route in routes)
+
+
+class InteractionProfiler:
+    """Runner instrument tracing each click and fill on ``routes``.
+
+    Analysed steps are added to the outcome as ``interactions``.
+    """
+
+    def __init__(self, routes=ROUTES, keep_traces=False):
+        self.routes = routes
+        self.keep_traces = keep_traces
+        self.context = None
+        self.script_id = None
+        self.sessions = {}
+        self.steps = []
+
+    async def attach(self, context, script=None):
+        self.context = context
+        self.script_id = script.id if script is not None else ""
+        actions.observe(context, self._step)
+
+    def _step(self, page, kind, locator):
+        if not _on_routes(page.url, self.routes):
+            return contextlib.nullcontext()
+        return self._trace(page, kind, locator)
+
+    @contextlib.asynccontextmanager
+    async def _trace(self, page, kind, locator):
+        try:
+            field = await locator.evaluate(DESCRIBE_SCRIPT, timeout=config.DEFAULT_TIMEOUT_MS)
+        except async_api.Error:
+            field = "?"
+        route = locators.route_key(page.url)
+        async with _tracing:
+            cdp = self.sessions.get(page)
+            if cdp is None:
+                cdp = self.sessions[page] = await self.context.new_cdp_session(page)
+            events = []
+            complete = asyncio.Event()
+
+            def collect(event):
+                events.extend(event["value"])
+
+            def completed(_event):
+                complete.set()
+
+            cdp.on("Tracing.dataCollected", collect)
+            cdp.on("Tracing.tracingComplete", completed)
+            await cdp.send("Tracing.start", {
+                "traceConfig": {"includedCategories": CATEGORIES, "recordMode": "recordAsMuchAsPossible"},
+                "transferMode": "ReportEvents",
+            })
+            try:
+                yield
+            finally:
+                try:
+                    await cdp.send("Tracing.end")
+                    await asyncio.wait_for(complete.wait(), config.NAVIGATION_TIMEOUT_MS / 1000)
+                except (async_api.Error, asyncio.TimeoutError):
+                    pass
+                cdp.remove_listener("Tracing.dataCollected", collect)
+                cdp.remove_listener("Tracing.tracingComplete", completed)
+        step = {"test": self.script_id, "index": len(self.steps) + 1, "kind": kind, "field": field, "route": route}
+        if self.keep_traces:
+            step["trace"] = str(save_trace(self.script_id, step["index"], events))
+        self.steps.append({**step, **(analyse(events) or {})})
+
+    async def finish(self, script, outcome):
+        actions.observe(self.context, None)
+        for cdp in self.sessions.values():
+            try:
+                await cdp.detach()
+            except async_api.Error:
+                pass
+        outcome["interactions"] = self.steps
+
+
+def save_trace(test_id, index, events):
+    directory = config.INTERACTIONS_DIR / "traces"
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{datetime.now():%Y%m%d-%H%M%S}-{test_id}-{index:02d}.json"
+    path.write_text(json.dumps({"traceEvents": events}), encoding="utf-8")
+    return path
+
+
+def summarize(steps):
+    """One row per ``kind field``: worst and median latency, median breakdown, top stacks."""
+    by_field = {}
+    for step in steps:
+        by_field.setdefault(f"{step['kind']} {step['field']}", []).append(step)
+    rows = []
+    for field, entries in by_field.items():
+        measured = [entry for entry in entries if entry.get("latencyMs") is not None]
+
+        def median(name):
+            values = [entry[name] for entry in measured if entry.get(name) is not None]
+            return round(statistics.median(values), 1) if values else None
+
+        top = collections.Counter()
+        for entry in entries:
+            top.update(entry.get("stacks", {}))
+        rows.append({
+            "field": field,
+            "steps": len(entries),
+            "worstLatencyMs": max((entry["latencyMs"] for entry in measured), default=None),
+            "medianLatencyMs": median("latencyMs"),
+            "inputDelayMs": median("inputDelayMs"),
+            "processingMs": median("processingMs"),
+            "presentationMs": median("presentationMs"),
+            "longTasks": sum(entry.get("longTasks", 0) for entry in entries),
+            "blockingMs": round(sum(entry.get("blockingMs", 0) for entry in entries), 1),
+            "scriptMs": median("scriptMs"),
+            "styleMs": median("styleMs"),
+            "layoutMs": median("layoutMs"),
+            "topStacks": {stack: round(ms, 1) for stack, ms in top.most_common(3)},
+        })
+    return sorted(rows, key=lambda row: row["worstLatencyMs"] or 0, reverse=True)
+
+
+def _ms(value):
+    return "-" if value is None else f"{value:.0f}"
+
+
+def print_rows(rows, budget_ms):
+    print(f"\n{'field':<28} {'n':>3} {'worst':>6} {'p50':>6} {'delay':>6} {'proc':>6} {'paint':>6}"
+          f" {'long':>5} {'TBT':>6} {'script':>7} {'style':>6} {'layout':>7}")
+    for row in rows:
+        flag = "  SLOW" if row["worstLatencyMs"] is not None and row["worstLatencyMs"] > budget_ms else ""
+        print(
+            f"{row['field'][:28]:<28} {row['steps']:>3} {_ms(row['worstLatencyMs']):>6} {_ms(row['medianLatencyMs']):>6}"
+            f" {_ms(row['inputDelayMs']):>6} {_ms(row['processingMs']):>6} {_ms(row['presentationMs']):>6}"
+            f" {row['longTasks']:>5} {_ms(row['blockingMs']):>6} {_ms(row['scriptMs']):>7} {_ms(row['styleMs']):>6}"
+            f" {_ms(row['layoutMs']):>7}{flag}"
+        )
+    for row in rows:
+        if row["topStacks"]:
+            print(f"\n{row['field']}:")
+            for stack, ms in row["topStacks"].items():
+                print(f"  {ms:7.1f} ms  {stack}")
+
+
+def save(rows, steps, outcomes):
+    config.INTERACTIONS_DIR.mkdir(parents=True, exist_ok=True)
+    path = config.INTERACTIONS_DIR / f"{datetime.now():%Y%m%d-%H%M%S}.json"
+    payload = {
+        "baseUrl": config.BASE_URL,
+        "tests": [{key: outcome[key] for key in ("id", "status", "durationMs")} for outcome in outcomes],
+        "fields": rows,
+        "steps": steps,
+    }
+    path.write_text(json.dumps(payload, indent=2) + "\n", encoding="utf-8")
+    return path
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("tests", nargs="*", default=["TC004"], help="test ids (default: TC004)")
+    parser.add_argument("--route", action="append", dest="routes",
+                        help=f"trace steps on this route, repeatable (default: {', '.join(ROUTES)})")
+    parser.add_argument("-k", "--repeats", type=int, default=1, help="runs per test (default: %(default)s)")
+    parser.add_argument("--cpu", type=float, default=4, help="CPU slowdown factor, 1 for none (default: %(default)s)")
+    parser.add_argument("--budget-ms", type=float, default=200,
+                        help="fail when a field's worst latency is above this (default: %(default)s, INP's 'good' limit)")
+    parser.add_argument(
+        "--third-party", choices=["block", "full"], default="block",
+        help="as in harness.runner (default: %(default)s)",
+    )
+    parser.add_argument("--keep-traces", action="store_true", help="write each step's trace to tmp/interactions/traces/")
+    parser.add_argument("--headed", action="store_true", help="show the browser window")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    scripts = runner.discover(args.tests)
+    cpu = int(args.cpu) if float(args.cpu).is_integer() else args.cpu
+    outcomes = asyncio.run(runner.run_suite(
+        scripts * max(1, args.repeats), concurrency=1, headless=False if args.headed else None, instruments=[
+            functools.partial(matrix.Throttle, None, max(1, cpu)),
+            functools.partial(blocking.ThirdPartyBlocker, blocking.ALL if args.third_party == "full" else None),
+            functools.partial(InteractionProfiler, tuple(args.routes or ROUTES), args.keep_traces),
+        ],
+    ))
+    for outcome in outcomes:
+        print(f"{outcome['id']}  {outcome['status']}  {outcome['durationMs']} ms  {len(outcome.get('interactions', []))} steps traced")
+    steps = [step for outcome in outcomes for step in outcome.get("interactions", [])]
+    if not steps:
+        print(f"No click or fill ran on {', '.join(args.routes or ROUTES)}", file=sys.stderr)
+        return 1
+    rows = summarize(steps)
+    print_rows(rows, args.budget_ms)
+    print(f"\nwrote {save(rows, steps, outcomes)}")
+    return 1 if any(row["worstLatencyMs"] is not None and row["worstLatencyMs"] > args.budget_ms for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,275 @@
+"""Checkout load generator.
+
+Runs the TC004 purchase flow as many concurrent virtual users (VUs). Most VUs
+are HTTP clients that do what the checkout page does against the servers:
+
+    products         GET  PocketBase products (to build a cart)
+    create-order     POST /api/razorpay/create-order
+    pay              POST <stub>/v1/checkout/pay (what the Razorpay popup does)
+    verify-payment   POST /api/razorpay/verify-payment with the popup's payload
+
+A ``--browser-fraction`` of the VUs instead run TC004 itself in a real browser
+context, so front-end cost under load shows up next to the API numbers. Each
+VU loops until ``--duration`` is over; VUs start evenly across ``--ramp``.
+
+    python -m harness.load -u 200 --browser-fraction 0.05 -d 60 --ramp 10
+
+Per step it prints throughput, error rate and latency percentiles, and writes
+the same numbers plus the error breakdown to tmp/load/<timestamp>.json.
+Paying needs the popup, so the pay and verify-payment steps only run with
+``--razorpay-stub`` (and the server's RAZORPAY_API_URL pointed at the stub,
+so the payment it verifies exists); otherwise a checkout ends at
+create-order.
+"""
+import argparse
+import asyncio
+import collections
+import json
+import random
+import secrets
+import sys
+import time
+import traceback
+from datetime import datetime
+
+from playwright import async_api
+
+from . import baseline, config, httpio, runner, session
+
+BROWSER_TEST = "TC004"
+STEP_ORDER = ["products", "create-order", "pay", "verify-payment", "browser"]
+PRODUCTS_PER_PAGE = 20
+
+
+class Stats:
+    """Latencies and errors per step, collected over one load run."""
+
+    def __init__(self):
+        self.latencies = collections.defaultdict(list)
+        self.errors = collections.defaultdict(collections.Counter)
+        self.started = time.perf_counter()
+        self.stopped = None
+
+    def add(self, step, ms, error=None):
+        self.latencies[step].append(ms)
+        if error:
+            self.errors[step][error] += 1
+
+    async def time(self, step, call, parse=None):
+        """Await ``call()``; a non-2xx response or an exception counts as an error.
+
+        With ``parse`` the result is ``parse(response)``, and a body it cannot
+        read (not JSON, missing keys) counts as a "bad body" error.
+        """
+        started = time.perf_counter()
+        try:
+            result = await call()
+        except Exception as exc:
+            self.add(step, (time.perf_counter() - started) * 1000, type(exc).__name__)
+            return None
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        error = None
+        if isinstance(result, httpio.Response) and not result.ok:
+            error = f"HTTP {result.status}"
+        elif parse is not None:
+            try:
+                result = parse(result)
+            except (ValueError, KeyError, TypeError, AttributeError):
+                error = "bad body"
+        self.add(step, elapsed_ms, error)
+        return None if error else result
+
+    def rows(self):
+        elapsed = (self.stopped or time.perf_counter()) - self.started
+        for step, values in self.latencies.items():
+            errors = sum(self.errors[step].values())
+            yield {
+                "step": step,
+                "requests": len(values),
+                "perSecond": round(len(values) / elapsed, 2) if elapsed else None,
+                "errorRate": round(errors / len(values), 4),
+                "errors": dict(self.errors[step]),
+                **{f"p{q}Ms": round(baseline.percentile(values, q), 1) for q in (50, 90, 95, 99)},
+                "maxMs": round(max(values), 1),
+            }
+
+
+def _priced_products(response):
+    items = response.json().get("items", [])
+    return [item for item in items if isinstance(item.get("price"), (int, float)) and item["price"] > 0]
+
+
+def _pay_body(response):
+    order = response.json()
+    return {"order_id": order["id"], "amount": order.get("amount"), "currency": order.get("currency")}
+
+
+def _verify_body(response):
+    payload = response.json()
+    return {key: payload[key] for key in ("razorpay_order_id", "razorpay_payment_id", "razorpay_signature")}
+
+
+async def http_checkout(stats, rng, think_s, pay_url=None):
+    """One checkout through the APIs, as the checkout page issues it.
+
+    Without ``pay_url`` (the stub's ``/v1/checkout/pay``) it stops after
+    create-order: there is no payment to verify.
+    """
+    amount = 0
+    products = await stats.time("products", lambda: httpio.request(
+        "GET", f"{config.POCKETBASE_URL}/api/collections/products/records?perPage={PRODUCTS_PER_PAGE}",
+    ), _priced_products)
+    if products is not None:
+        for product in rng.sample(products, min(len(products), rng.randint(1, 3))):
+            amount += product["price"] * rng.randint(1, 2)
+    amount = amount or 100
+    await asyncio.sleep(think_s)
+
+    receipt = f"load_{secrets.token_hex(6)}"
+    pay_body = await stats.time("create-order", lambda: httpio.request(
+        "POST", f"{config.API_URL}/api/razorpay/create-order",
+        json={"amount": amount, "currency": "INR", "receipt": receipt, "notes": {"source": "harness.load"}},
+    ), _pay_body if pay_url is not None else None)
+    if pay_body is None or pay_url is None:
+        return
+    await asyncio.sleep(think_s)
+
+    verify_body = await stats.time("pay", lambda: httpio.request("POST", pay_url, json=pay_body), _verify_body)
+    if verify_body is None:
+        return
+    await asyncio.sleep(think_s)
+
+    await stats.time("verify-payment", lambda: httpio.request(
+        "POST", f"{config.API_URL}/api/razorpay/verify-payment", json=verify_body,
+    ))
+
+
+async def browser_checkout(stats, browser, run_test):
+    """One TC004 run in a fresh context, timed as the "browser" step."""
+    started = time.perf_counter()
+    error = None
+    context = await session.new_context(browser)
+    try:
+        await run_test(context)
+    except AssertionError:
+        error = "AssertionError"
+    except Exception as exc:
+        error = type(exc).__name__
+        print(f"browser VU: {traceback.format_exc(limit=2)}", file=sys.stderr)
+    finally:
+        await context.close()
+    stats.add("browser", (time.perf_counter() - started) * 1000, error)
+
+
+async def virtual_user(delay_s, deadline, iteration):
+    await asyncio.sleep(delay_s)
+    while time.perf_counter() < deadline:
+        await iteration()
+
+
+async def run_load(users, browser_fraction=0.0, duration_s=60, ramp_s=0, think_ms=0, headless=None, seed=None,
+                   pay_url=None):
+    """Run ``users`` VUs for ``duration_s`` seconds and return the :class:`Stats`."""
+    browsers = round(users * browser_fraction)
+    stats = Stats()
+    rng = random.Random(seed)
+    think_s = think_ms / 1000
+    deadline = time.perf_counter() + ramp_s + duration_s
+    delays = [ramp_s * index / users for index in range(users)]
+
+    tasks = [
+        virtual_user(delays[index], deadline, lambda: http_checkout(stats, rng, think_s, pay_url))
+        for index in range(browsers, users)
+    ]
+    if not browsers:
+        await asyncio.gather(*tasks)
+        stats.stopped = time.perf_counter()
+        return stats
+
+    run_test = runner.discover([BROWSER_TEST])[0].load().run_test
+    async with async_api.async_playwright() as pw:
+        browser = await pw.chromium.launch(
+            headless=config.HEADLESS if headless is None else headless,
+            args=config.BROWSER_ARGS,
+        )
+        try:
+            tasks += [
+                virtual_user(delays[index], deadline, lambda: browser_checkout(stats, browser, run_test))
+                for index in range(browsers)
+            ]
+            await asyncio.gather(*tasks)
+        finally:
+            stats.stopped = time.perf_counter()
+            await browser.close()
+    return stats
+
+
+def print_rows(rows):
+    print(f"{'step':<16} {'count':>7} {'req/s':>8} {'errors':>7} {'p50':>8} {'p90':>8} {'p95':>8} {'p99':>8} {'max':>8}")
+    for row in rows:
+        print(
+            f"{row['step']:<16} {row['requests']:>7} {row['perSecond']:>8.1f} {row['errorRate']:>7.1%}"
+            + "".join(f" {row[key]:>8.0f}" for key in ("p50Ms", "p90Ms", "p95Ms", "p99Ms", "maxMs"))
+        )
+        for error, count in row["errors"].items():
+            print(f"{'':<16}   {count:>5} x {error}")
+
+
+def save(rows, args):
+    config.LOAD_DIR.mkdir(parents=True, exist_ok=True)
+    path = config.LOAD_DIR / f"{datetime.now():%Y%m%d-%H%M%S}.json"
+    payload = {
+        "users": args.users,
+        "browserFraction": args.browser_fraction,
+        "durationS": args.duration,
+        "rampS": args.ramp,
+        "thinkMs": args.think_ms,
+        "apiUrl": config.API_URL,
+        "steps": list(rows),
+    }
+    path.write_text(json.dumps(payload, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+    return path
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-u", "--users", type=int, default=50, help="virtual users (default: %(default)s)")
+    parser.add_argument(
+        "--browser-fraction", type=float, default=0.0,
+        help=f"share of VUs that run {BROWSER_TEST} in a browser (default: %(default)s)",
+    )
+    parser.add_argument("-d", "--duration", type=float, default=60, help="seconds at full load (default: %(default)s)")
+    parser.add_argument("--ramp", type=float, default=0, help="seconds over which VUs start (default: %(default)s)")
+    parser.add_argument("--think-ms", type=int, default=0, help="pause between steps of one VU (default: %(default)s)")
+    parser.add_argument("--seed", type=int, help="seed for the carts the VUs build")
+    parser.add_argument("--headed", action="store_true", help="show the browser window")
+    parser.add_argument(
+        "--pocketbase-stub", action="store_true",
+        help=f"serve PocketBase from harness.pocketbase_stub on {config.POCKETBASE_URL}",
+    )
+    parser.add_argument(
+        "--razorpay-stub", action="store_true",
+        help=f"serve the Razorpay API from harness.razorpay_stub on {config.RAZORPAY_STUB_URL} and pay"
+             " through it; without it HTTP checkouts stop after create-order",
+    )
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.users < 1 or not 0 <= args.browser_fraction <= 1:
+        raise SystemExit("--users must be positive and --browser-fraction within [0, 1]")
+    with runner.services(args):
+        stats = asyncio.run(run_load(
+            args.users, args.browser_fraction, args.duration, args.ramp, args.think_ms,
+            headless=False if args.headed else None, seed=args.seed,
+            pay_url=f"{config.RAZORPAY_STUB_URL}/v1/checkout/pay" if args.razorpay_stub else None,
+        ))
+    rows = sorted(stats.rows(), key=lambda row: STEP_ORDER.index(row["step"]))
+    print_rows(rows)
+    print(f"\nwrote {save(rows, args)}")
+    return 1 if any(row["errorRate"] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,244 @@
+"""Stable locators for the generated scripts' absolute XPaths.
+
+The TC scripts address elements as ``xpath=html/body/div/...``. Those paths
+are slow to evaluate and break whenever a layout shifts. :func:`resolve`
+looks each one up in an on-disk index (tmp/selector_index.json) keyed by
+route and XPath. The index holds the cheapest stable locator for that
+element: ``data-testid``, then role + accessible name, then label, then
+placeholder. The locator is used instead of the XPath.
+
+On a miss (no entry yet, or the stored locator no longer matches exactly one
+element), the page is indexed again. The XPath is evaluated once, candidates
+are read off the element, and the first one that matches that element alone
+is stored. Elements with no stable handle are stored as XPath, so they are
+not re-examined every run. Resolutions are memoised per process.
+
+    python -m harness.locators show              # index entries with the step they serve
+    python -m harness.locators reindex TC004     # rebuild entries for a test by running it
+"""
+import argparse
+import json
+import os
+import re
+import sys
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+from playwright import async_api
+
+from . import config
+
+# Route segments that are record ids (PocketBase ids, numbers) collapse to ":id".
+_ID_SEGMENT_RE = re.compile(r"^(?:[a-z0-9]{15}|\d+)$")
+_XPATH_RE = re.compile(r"'(xpath=[^']+)'")
+
+CANDIDATES_SCRIPT = """
+(xpath) => {
+  const el = document.evaluate(xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+  if (!el || el.nodeType !== Node.ELEMENT_NODE) return null;
+  const clean = (value) => (value || '').replace(/\\s+/g, ' ').trim();
+  const byIds = (ids) => clean((ids || '').split(/\\s+/).map((id) => {
+    const node = document.getElementById(id);
+    return node ? node.textContent : '';
+  }).join(' '));
+
+  const tag = el.tagName.toLowerCase();
+  const type = (el.getAttribute('type') || 'text').toLowerCase();
+  let role = el.getAttribute('role');
+  if (!role) {
+    if (tag === 'button' || (tag === 'input' && ['button', 'submit', 'reset'].includes(type))) role = 'button';
+    else if (tag === 'a' && el.hasAttribute('href')) role = 'link';
+    else if (/^h[1-6]$/.test(tag)) role = 'heading';
+    else if (tag === 'textarea' || (tag === 'input' && ['text', 'email', 'tel', 'url', 'search', 'number'].includes(type))) role = type === 'number' ? 'spinbutton' : 'textbox';
+    else if (tag === 'input' && ['checkbox', 'radio'].includes(type)) role = type;
+    else if (tag === 'select') role = 'combobox';
+    else if (tag === 'img' && el.getAttribute('alt')) role = 'img';
+  }
+  const label = clean(el.getAttribute('aria-label')) || byIds(el.getAttribute('aria-labelledby'))
+    || clean(el.labels && el.labels.length ? el.labels[0].textContent : '');
+  const content = ['button', 'link', 'heading', 'tab', 'menuitem'].includes(role) ? clean(el.innerText) : '';
+  return {
+    testid: el.getAttribute('data-testid'),
+    role,
+    name: label || content || clean(el.getAttribute('alt')) || clean(el.getAttribute('title')),
+    label,
+    placeholder: clean(el.getAttribute('placeholder')),
+  };
+}
+"""
+
+SAME_ELEMENT_SCRIPT = """
+(el, xpath) => el === document.evaluate(xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue
+"""
+
+_index = None
+_memo = {}
+
+
+def build(page, spec):
+    """Playwright locator for a spec: a string (text) or one of ``role`` (+
+    ``name``/``exact``), ``testid``, ``label``, ``placeholder``, ``text``,
+    ``css`` or ``xpath``, with an optional ``nth`` (default: the first match)."""
+    if isinstance(spec, str):
+        spec = {"text": spec}
+    locator = _matching(page, spec)
+    return locator.nth(spec["nth"]) if "nth" in spec else locator.first
+
+
+def _matching(page, spec):
+    if "role" in spec:
+        locator = page.get_by_role(spec["role"], name=spec.get("name"), exact=spec.get("exact"))
+    elif "testid" in spec:
+        locator = page.get_by_test_id(spec["testid"])
+    elif "label" in spec:
+        locator = page.get_by_label(spec["label"], exact=spec.get("exact"))
+    elif "placeholder" in spec:
+        locator = page.get_by_placeholder(spec["placeholder"], exact=spec.get("exact"))
+    elif "text" in spec:
+        locator = page.get_by_text(spec["text"], exact=spec.get("exact"))
+    elif "css" in spec:
+        locator = page.locator(spec["css"])
+    elif "xpath" in spec:
+        locator = page.locator(spec["xpath"])
+    else:
+        raise ValueError(f"Unsupported locator {spec!r}")
+    return locator
+
+
+def route_key(url):
+    """``/product/abc123def456ghi`` -> ``/product/:id``."""
+    segments = [":id" if _ID_SEGMENT_RE.match(part) else part for part in urlsplit(url).path.split("/")]
+    return "/".join(segments) or "/"
+
+
+def load(path=None):
+    path = path or config.SELECTOR_INDEX_PATH
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return {}
+
+
+def _index_entries():
+    global _index
+    if _index is None:
+        _index = {} if config.SELECTOR_REINDEX else load()
+    return _index
+
+
+def _store(key, entry, path=None):
+    """Merge one entry into the index file (other processes may write too)."""
+    path = path or config.SELECTOR_INDEX_PATH
+    _index_entries()[key] = entry
+    current = load(path)
+    current[key] = entry
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_name(f"{path.name}.{os.getpid()}.partial")
+    partial.write_text(json.dumps(dict(sorted(current.items())), indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+    partial.replace(path)
+
+
+async def _unique(page, spec, xpath):
+    """True when ``spec`` matches exactly one element: the one at ``xpath``."""
+    try:
+        locator = _matching(page, spec)
+        if await locator.count() != 1:
+            return False
+        return xpath is None or await locator.evaluate(SAME_ELEMENT_SCRIPT, xpath)
+    except async_api.Error:
+        return False
+
+
+async def reindex(page, selector):
+    """Pick the cheapest stable spec for the element at ``selector`` now, or None."""
+    xpath = selector.removeprefix("xpath=")
+    try:
+        found = await page.evaluate(CANDIDATES_SCRIPT, xpath)
+    except async_api.Error:
+        return None
+    if found is None:
+        return None
+    candidates = []
+    if found["testid"]:
+        candidates.append({"testid": found["testid"]})
+    if found["role"] and found["name"]:
+        candidates.append({"role": found["role"], "name": found["name"], "exact": True})
+    if found["label"]:
+        candidates.append({"label": found["label"], "exact": True})
+    if found["placeholder"]:
+        candidates.append({"placeholder": found["placeholder"], "exact": True})
+    for spec in candidates:
+        if await _unique(page, spec, xpath):
+            return spec
+    return {"xpath": selector}
+
+
+async def resolve(page, selector):
+    """Locator for ``selector`` (an ``xpath=`` path) through the index.
+
+    Anything that is not a page (e.g. a ``frame_locator`` into the Razorpay
+    iframe) gets the plain XPath locator.
+    """
+    fallback = page.locator(selector).nth(0)
+    if not isinstance(page, async_api.Page):
+        return fallback
+    key = f"{route_key(page.url)} {selector}"
+    spec = _memo.get(key)
+    if spec is None:
+        entry = _index_entries().get(key)
+        if entry is not None and ("xpath" in entry["spec"] or await _unique(page, entry["spec"], None)):
+            spec = entry["spec"]
+        else:
+            spec = await reindex(page, selector)
+            if spec is None:
+                return fallback       # not rendered yet; the XPath locator will wait for it
+            _store(key, {"spec": spec, "indexed": datetime.now(timezone.utc).isoformat(timespec="seconds")})
+        _memo[key] = spec
+    return fallback if "xpath" in spec else build(page, spec)
+
+
+def intents():
+    """XPath -> the comment the generated script wrote above it."""
+    found = {}
+    for path in sorted(config.TESTS_DIR.glob("TC[0-9][0-9][0-9]_*.py")):
+        comment = ""
+        for line in path.read_text(encoding="utf-8").splitlines():
+            stripped = line.strip()
+            if stripped.startswith("# ") and not stripped.startswith("# ->"):
+                comment = stripped[2:]
+            match = _XPATH_RE.search(line)
+            if match:
+                found.setdefault(match[1], f"{path.stem[:5]}: {comment}")
+    return found
+
+
+def describe(spec):
+    if "xpath" in spec:
+        return "xpath (no stable handle)"
+    return ", ".join(f"{key}={value!r}" for key, value in spec.items() if key != "exact")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("show", help="print the index")
+    reindex_parser = commands.add_parser("reindex", help="run tests with the index ignored and rebuilt")
+    reindex_parser.add_argument("tests", nargs="*", help="test ids (default: all)")
+    args, rest = parser.parse_known_args(argv)
+
+    if args.command == "show":
+        steps = intents()
+        for key, entry in sorted(load().items()):
+            route, _, selector = key.partition(" ")
+            print(f"{route:<16} {describe(entry['spec'])}")
+            print(f"{'':<16} {steps.get(selector, selector)}")
+        return 0
+
+    from . import runner
+    os.environ["TESTSPRITE_REINDEX"] = "1"      # read by shard workers as well
+    config.SELECTOR_REINDEX = True
+    return runner.main([*args.tests, "--no-record", *rest])
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,331 @@
+"""Run one test across a device x network x CPU throttling matrix.
+
+TC012 claims desktop, tablet and mobile coverage but every run uses the
+default 1280x720 viewport on an unthrottled loopback connection, while most
+customers shop on mid-range Android phones over mobile data. This runs a
+test once per cell of:
+
+- device: ``desktop``, ``tablet``, ``mobile`` (Playwright's "Desktop Chrome",
+  "iPad Mini" and "Moto G4" descriptors: viewport, pixel ratio, touch, mobile
+  user agent) or any other Playwright device name;
+- network: one of :data:`NETWORKS`, applied with the DevTools protocol's
+  ``Network.emulateNetworkConditions`` (latency added per request,
+  bandwidth capped per page);
+- CPU: a slowdown factor for ``Emulation.setCPUThrottlingRate`` (4 is what
+  Lighthouse uses for a mid-range phone).
+
+By default the test is :data:`NAVIGATION`, TC012's route changes written
+so they work on every device: below the ``lg`` breakpoint the navbar links
+sit in the menu behind "Toggle menu" (Navbar.tsx), so the flow opens it
+first when it is shown. The TC012 script itself clicks the desktop links
+and fails on the tablet and mobile presets.
+
+Cells run in parallel contexts of one browser. The table shows the test's
+wall time and the Web Vitals of harness.vitals (first view's LCP, total
+blocking time, worst CLS and INP, transferred bytes), as medians over the
+passing runs of ``--repeats``. A cell where no run passed shows the medians
+of its failed runs and is flagged. Results also go to
+tmp/matrix/<timestamp>.json.
+
+    python -m harness.matrix                                   # navigation flow, 3 devices x 3 networks x 2 CPU rates
+    python -m harness.matrix --devices mobile --networks slow-4g,fast-3g --cpu 4,6 -k 3
+    python -m harness.matrix TC001 --scenarios -j 1            # a scenarios.json flow, one cell at a time
+
+CPU throttling slows the page's main thread relative to the host, and cells
+running side by side share the host's cores; use ``-j 1`` when comparing
+CPU rates closely. Steps that resize the viewport themselves (the scenario
+version of TC012 does) override the device's viewport from that step on.
+"""
+import argparse
+import asyncio
+import functools
+import itertools
+import json
+import statistics
+import sys
+import time
+import traceback
+import types
+from dataclasses import dataclass
+from datetime import datetime
+
+from playwright import async_api
+
+from . import baseline, blocking, config, runner, scenarios, session, vitals
+
+DEVICES = {
+    "desktop": "Desktop Chrome",
+    "tablet": "iPad Mini",
+    "mobile": "Moto G4",
+}
+
+# latency in ms, throughput in bytes/s (DevTools presets; WebPageTest's 3GFast).
+NETWORKS = {
+    "none": None,
+    "fast-4g": {"latency": 165, "downloadThroughput": 9_000_000 * 0.9 / 8, "uploadThroughput": 1_500_000 * 0.9 / 8},
+    "slow-4g": {"latency": 562.5, "downloadThroughput": 1_600_000 * 0.9 / 8, "uploadThroughput": 750_000 * 0.9 / 8},
+    "fast-3g": {"latency": 150, "downloadThroughput": 1_600_000 / 8, "uploadThroughput": 768_000 / 8},
+    "slow-3g": {"latency": 2000, "downloadThroughput": 500_000 * 0.8 / 8, "uploadThroughput": 500_000 * 0.8 / 8},
+}
+
+METRICS = ("durationMs", "lcpMs", "cls", "inpMs", "totalBlockingTimeMs", "transferBytes")
+
+_MENU = {"role": "button", "name": "Toggle menu"}
+
+NAVIGATION = scenarios.Scenario(
+    id="TC012",
+    title="SPA navigation on any device",
+    description="TC012's route changes, through the mobile menu where the navbar collapses.",
+    steps=[
+        {"type": "action", "description": "Remember the current document.", "mark_document": True},
+        {"type": "action", "description": "Open the menu on small screens.", "click_if_visible": _MENU},
+        {"type": "action", "description": "Open Shop.", "click": {"role": "link", "name": "Shop", "exact": True}},
+        {"type": "assertion", "description": "Route URL changes.", "expect_url": "/shop"},
+        {"type": "action", "description": "Open the menu on small screens.", "click_if_visible": _MENU},
+        {"type": "action", "description": "Open About.", "click": {"role": "link", "name": "About", "exact": True}},
+        {"type": "assertion", "description": "Route URL changes.", "expect_url": "/about"},
+        {"type": "assertion", "description": "Pages load without a full reload.", "expect_same_document": True},
+    ],
+)
+
+
+@dataclass
+class FlowScript:
+    """Runner-compatible script for a scenario defined in code."""
+
+    scenario: scenarios.Scenario
+    third_party: tuple = ()
+
+    @property
+    def id(self):
+        return self.scenario.id
+
+    @property
+    def title(self):
+        return f"{self.scenario.id}-{self.scenario.title}"
+
+    def load(self):
+        return types.SimpleNamespace(
+            ROLE=self.scenario.role, THIRD_PARTY=self.scenario.third_party,
+            run_test=functools.partial(scenarios.run, self.scenario),
+        )
+
+
+class Throttle:
+    """Instrument applying one cell's network and CPU throttling to every page.
+
+    ``attach`` opens the page the test will use (``session.new_page`` hands
+    it out like a pooled page), so the first navigation is already throttled.
+    """
+
+    def __init__(self, network=None, cpu=1):
+        self.network = network
+        self.cpu = cpu
+        self.context = None
+        self._pending = set()
+
+    async def attach(self, context, script=None):
+        self.context = context
+        page = await context.new_page()
+        await self._apply(page)
+        session.mark_warm(page, "about:blank")
+        context.on("page", self._watch)
+
+    def _watch(self, page):
+        task = asyncio.ensure_future(self._apply(page))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _apply(self, page):
+        try:
+            cdp = await self.context.new_cdp_session(page)
+            if self.network is not None:
+                await cdp.send("Network.enable")
+                await cdp.send("Network.emulateNetworkConditions", {"offline": False, **self.network})
+            if self.cpu != 1:
+                await cdp.send("Emulation.setCPUThrottlingRate", {"rate": self.cpu})
+        except async_api.Error:
+            pass     # page closed before it could be throttled
+
+    async def finish(self, script, outcome):
+        self.context.remove_listener("page", self._watch)
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+
+
+def device_options(pw, name):
+    """Context options of a preset or Playwright device name."""
+    descriptor = pw.devices.get(DEVICES.get(name, name))
+    if descriptor is None:
+        raise SystemExit(f"Unknown device {name!r}; use {', '.join(DEVICES)} or a Playwright device name")
+    return {key: value for key, value in descriptor.items() if key != "default_browser_type"}
+
+
+async def run_cell(browser, script, device, network, cpu, third_party=None):
+    """Run ``script`` once in a context set up for one cell; returns its metrics."""
+    module = script.load()
+    script.third_party = getattr(module, "THIRD_PARTY", ())
+    context = None
+    attached = []
+    recorder = vitals.VitalsRecorder()
+    outcome = {"id": script.id, "title": script.title, "status": "PASSED", "error": "", "durationMs": None}
+    views = []
+    started = time.perf_counter()
+    try:
+        context = await session.new_context(browser, getattr(module, "ROLE", None), **device)
+        for instrument in (recorder, blocking.ThirdPartyBlocker(third_party), Throttle(NETWORKS[network], cpu)):
+            await instrument.attach(context, script)
+            attached.append(instrument)
+        await module.run_test(context)
+    except AssertionError as exc:
+        outcome.update(status="FAILED", error=str(exc) or "AssertionError")
+    except Exception:
+        outcome.update(status="FAILED", error=traceback.format_exc(limit=3))
+    finally:
+        outcome["durationMs"] = round((time.perf_counter() - started) * 1000)
+        for instrument in reversed(attached):
+            try:
+                if instrument is recorder:
+                    views = await recorder.collect()
+                else:
+                    await instrument.finish(script, outcome)
+            except Exception:
+                print(f"{script.id}: {type(instrument).__name__} failed:\n{traceback.format_exc(limit=3)}", file=sys.stderr)
+        if context is not None:
+            await context.close()
+    return outcome, baseline.metrics(outcome, {"views": views})
+
+
+async def run_matrix(script, devices, networks, cpus, repeats=1, concurrency=4, headless=None, third_party=None):
+    """Every cell ``repeats`` times; returns one row per cell."""
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    cells = list(itertools.product(devices, networks, cpus))
+    async with async_api.async_playwright() as pw:
+        options = {device: device_options(pw, device) for device in devices}
+        browser = await pw.chromium.launch(
+            headless=config.HEADLESS if headless is None else headless, args=config.BROWSER_ARGS,
+        )
+
+        async def one(cell):
+            device, network, cpu = cell
+            async with semaphore:
+                outcome, values = await run_cell(browser, script, options[device], network, cpu, third_party)
+            print(f"{device:<8} {network:<8} {cpu:>3}x  {outcome['status']}  {outcome['durationMs']} ms")
+            return cell, outcome, values
+
+        try:
+            # Repeats interleaved, so a slow patch on the host hits every cell alike.
+            runs = await asyncio.gather(*(one(cell) for _ in range(repeats) for cell in cells))
+        finally:
+            await browser.close()
+    return [row(script, cell, [(outcome, values) for key, outcome, values in runs if key == cell]) for cell in cells]
+
+
+def row(script, cell, runs):
+    """Medians of the passing runs, or of the failed ones when none passed."""
+    device, network, cpu = cell
+    passed = [values for outcome, values in runs if outcome["status"] == "PASSED"]
+    measured = passed or [values for _, values in runs]
+    medians = {}
+    for name in METRICS:
+        samples = [values[name] for values in measured if values.get(name) is not None]
+        medians[name] = statistics.median(samples) if samples else None
+    return {
+        "id": script.id,
+        "device": device,
+        "network": network,
+        "cpu": cpu,
+        "runs": len(runs),
+        "passed": len(passed),
+        "mediansOf": "passed" if passed else "failed",
+        "errors": sorted({outcome["error"].strip().splitlines()[-1] for outcome, _ in runs if outcome["error"].strip()}),
+        **medians,
+    }
+
+
+def _ms(value):
+    return "-" if value is None else f"{value:.0f}"
+
+
+def print_rows(rows):
+    print(f"\n{'device':<8} {'network':<8} {'cpu':>4} {'pass':>5} {'wall ms':>8} {'LCP':>7} {'CLS':>6} {'INP':>6} {'TBT':>6} {'KB':>7}")
+    for entry in rows:
+        cls = "-" if entry["cls"] is None else f"{entry['cls']:.3f}"
+        kb = "-" if entry["transferBytes"] is None else f"{entry['transferBytes'] / 1024:.0f}"
+        print(
+            f"{entry['device']:<8} {entry['network']:<8} {entry['cpu']:>3}x {entry['passed']:>2}/{entry['runs']:<2}"
+            f" {_ms(entry['durationMs']):>8} {_ms(entry['lcpMs']):>7} {cls:>6} {_ms(entry['inpMs']):>6}"
+            f" {_ms(entry['totalBlockingTimeMs']):>6} {kb:>7}"
+            + ("  NO PASS (failed runs)" if not entry["passed"] else "")
+        )
+    for entry in rows:
+        for error in entry["errors"]:
+            print(f"  {entry['device']}/{entry['network']}/{entry['cpu']}x: {error}")
+
+
+def save(rows):
+    config.MATRIX_DIR.mkdir(parents=True, exist_ok=True)
+    path = config.MATRIX_DIR / f"{datetime.now():%Y%m%d-%H%M%S}.json"
+    path.write_text(json.dumps({"baseUrl": config.BASE_URL, "rows": rows}, indent=2) + "\n", encoding="utf-8")
+    return path
+
+
+def _names(choices):
+    def parse(value):
+        names = [name.strip() for name in value.split(",") if name.strip()]
+        unknown = [name for name in names if choices is not None and name not in choices]
+        if unknown:
+            raise argparse.ArgumentTypeError(f"unknown: {', '.join(unknown)} (choose from {', '.join(choices)})")
+        return names
+    return parse
+
+
+def _rates(value):
+    try:
+        rates = [float(rate) for rate in value.split(",") if rate.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"not a list of numbers: {value!r}") from None
+    if any(rate < 1 for rate in rates):
+        raise argparse.ArgumentTypeError("CPU slowdown factors must be >= 1")
+    return [int(rate) if rate.is_integer() else rate for rate in rates]
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "test", nargs="?",
+        help="test id to run in every cell (default: TC012's navigation through the mobile menu where needed)",
+    )
+    parser.add_argument("--scenarios", action="store_true", help=f"run the {config.SCENARIOS_PATH.name} scenario of that id")
+    parser.add_argument("--devices", type=_names(None), default=list(DEVICES),
+                        help=f"comma-separated presets ({', '.join(DEVICES)}) or Playwright device names (default: all presets)")
+    parser.add_argument("--networks", type=_names(list(NETWORKS)), default=["none", "slow-4g", "fast-3g"],
+                        help=f"comma-separated profiles from {', '.join(NETWORKS)} (default: none,slow-4g,fast-3g)")
+    parser.add_argument("--cpu", type=_rates, default=[1, 4], help="comma-separated CPU slowdown factors (default: 1,4)")
+    parser.add_argument("-k", "--repeats", type=int, default=1, help="runs per cell, medians reported (default: %(default)s)")
+    parser.add_argument("-j", "--concurrency", type=int, default=4, help="cells running at once (default: %(default)s)")
+    parser.add_argument(
+        "--third-party", choices=["block", "full"], default="block",
+        help="as in harness.runner; 'full' includes analytics and fonts in the mobile numbers (default: %(default)s)",
+    )
+    parser.add_argument("--headed", action="store_true", help="show the browser window")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.test is None:
+        script = FlowScript(NAVIGATION)
+    else:
+        [script] = scenarios.discover([args.test]) if args.scenarios else runner.discover([args.test])
+    rows = asyncio.run(run_matrix(
+        script, args.devices, args.networks, args.cpu, max(1, args.repeats), args.concurrency,
+        headless=False if args.headed else None, third_party=blocking.ALL if args.third_party == "full" else None,
+    ))
+    print_rows(rows)
+    print(f"\nwrote {save(rows)}")
+    return 0 if all(entry["passed"] == entry["runs"] for entry in rows) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,496 @@
+"""In-memory stand-in for the PocketBase REST endpoints the storefront uses.
+
+Serves collection record list/view/create/update/delete,
+``auth-with-password``/``auth-refresh``, ``/api/health`` and the
+``/api/coupons/validate`` route of pb_hooks/coupon-handler.pb.js from seedable
+fixtures (fixtures/pocketbase.json by default: the products TC001 asserts,
+the customer/admin users, a home page, a coupon and an order). Nothing
+leaves the machine, so runs are repeatable and every call is a local round
+trip.
+
+    python -m harness.pocketbase_stub --port 8090
+    python -m harness.runner --pocketbase-stub     # start it for a suite run
+
+Build or start the storefront with ``VITE_POCKETBASE_URL`` pointing at the
+stub (``TESTSPRITE_POCKETBASE_URL``, default http://127.0.0.1:8090).
+"""
+import argparse
+import base64
+import copy
+import datetime
+import json
+import math
+import random
+import re
+import sys
+import time
+import urllib.parse
+from pathlib import Path
+
+from . import config, httpio
+
+DEFAULT_FIXTURES = Path(__file__).resolve().parent / "fixtures" / "pocketbase.json"
+
+# Fields never returned to clients.
+HIDDEN_FIELDS = {"password", "passwordConfirm", "oldPassword"}
+
+TOKEN_TTL_S = 14 * 24 * 3600
+
+CORS_HEADERS = {
+    "access-control-allow-origin": "*",
+    "access-control-allow-methods": "GET, POST, PATCH, DELETE, OPTIONS",
+    "access-control-allow-headers": "Authorization, Content-Type",
+    "access-control-max-age": "86400",
+}
+
+# Smallest valid PNG, served for /api/files/* so product images do not 404.
+PLACEHOLDER_PNG = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAQAAAC1HAwCAAAAC0lEQVR42mNkYAAAAAYAAjCB0C8AAAAASUVORK5CYII="
+)
+
+
+class StubError(Exception):
+    """Turned into a PocketBase-shaped error response."""
+
+    def __init__(self, status, message, data=None):
+        super().__init__(message)
+        self.status = status
+        self.data = data or {}
+
+
+def now_string():
+    """Current time in PocketBase's datetime format."""
+    return datetime.datetime.now(datetime.timezone.utc).strftime("%Y-%m-%d %H:%M:%S.%f")[:-3] + "Z"
+
+
+# -- filter expressions --------------------------------------------------------
+
+_TOKEN_RE = re.compile(r"""
+    \s*(?:
+      (?P<string>"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')
+    | (?P<number>-?\d+(?:\.\d+)?)
+    | (?P<op>&&|\|\||!=|>=|<=|!~|\?=|=|>|<|~|\(|\))
+    | (?P<name>[@A-Za-z_][\w.@]*)
+    )""", re.VERBOSE)
+
+_LITERALS = {"true": True, "false": False, "null": None}
+
+
+def _tokenize(expression):
+    tokens, pos = [], 0
+    expression = expression.strip()
+    while pos < len(expression):
+        match = _TOKEN_RE.match(expression, pos)
+        if not match or match.end() == pos:
+            raise StubError(400, f"Invalid filter near {expression[pos:pos + 20]!r}.")
+        pos = match.end()
+        kind = match.lastgroup
+        tokens.append((kind, match.group(kind)))
+    return tokens
+
+
+class Filter:
+    """Parsed PocketBase filter supporting ``&& || ( )`` and ``= != > >= < <= ~ !~``."""
+
+    def __init__(self, expression):
+        self.tokens = _tokenize(expression) if expression else []
+        self.pos = 0
+        self.tree = self._or() if self.tokens else None
+        if self.pos != len(self.tokens):
+            raise StubError(400, "Invalid filter expression.")
+
+    def _peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def _take(self):
+        token = self._peek()
+        self.pos += 1
+        return token
+
+    def _or(self):
+        node = self._and()
+        while self._peek() == ("op", "||"):
+            self._take()
+            node = ("or", node, self._and())
+        return node
+
+    def _and(self):
+        node = self._atom()
+        while self._peek() == ("op", "&&"):
+            self._take()
+            node = ("and", node, self._atom())
+        return node
+
+    def _atom(self):
+        if self._peek() == ("op", "("):
+            self._take()
+            node = self._or()
+            if self._take() != ("op", ")"):
+                raise StubError(400, "Unbalanced parentheses in filter.")
+            return node
+        left = self._operand()
+        kind, op = self._take()
+        if kind != "op" or op in ("(", ")", "&&", "||"):
+            raise StubError(400, "Expected a comparison operator in filter.")
+        return ("cmp", op, left, self._operand())
+
+    def _operand(self):
+        kind, value = self._take()
+        if kind == "string":
+            return ("lit", re.sub(r"\\(.)", r"\1", value[1:-1]))
+        if kind == "number":
+            return ("lit", float(value) if "." in value else int(value))
+        if kind == "name":
+            if value in _LITERALS:
+                return ("lit", _LITERALS[value])
+            return ("field", value)
+        raise StubError(400, "Invalid filter operand.")
+
+    def matches(self, record, auth=None):
+        return self.tree is None or self._eval(self.tree, record, auth)
+
+    def _eval(self, node, record, auth):
+        if node[0] == "or":
+            return self._eval(node[1], record, auth) or self._eval(node[2], record, auth)
+        if node[0] == "and":
+            return self._eval(node[1], record, auth) and self._eval(node[2], record, auth)
+        _, op, left, right = node
+        return _compare(op, self._value(left, record, auth), self._value(right, record, auth))
+
+    @staticmethod
+    def _value(operand, record, auth):
+        kind, value = operand
+        if kind == "lit":
+            return value
+        if value == "@now":
+            return now_string()
+        if value.startswith("@request.auth."):
+            return (auth or {}).get(value[len("@request.auth."):], "")
+        current = record
+        for part in value.split("."):
+            current = current.get(part, "") if isinstance(current, dict) else ""
+        return current
+
+
+def _compare(op, left, right):
+    if op in ("~", "!~"):
+        found = str(right).strip("%").lower() in str(left).lower()
+        return found if op == "~" else not found
+    if op == "?=":
+        return right in left if isinstance(left, list) else left == right
+    if isinstance(left, bool) or isinstance(right, bool) or left is None or right is None:
+        left, right = bool(left), bool(right)
+    elif isinstance(left, (int, float)) != isinstance(right, (int, float)):
+        left, right = str(left), str(right)
+    if op == "=":
+        return left == right
+    if op == "!=":
+        return left != right
+    try:
+        return {">": left > right, ">=": left >= right, "<": left < right, "<=": left <= right}[op]
+    except TypeError:
+        return False
+
+
+def _sort(records, sort):
+    for key in reversed([part.strip() for part in sort.split(",") if part.strip()]):
+        if key == "@random":
+            random.shuffle(records)
+            continue
+        descending = key.startswith("-")
+        name = key.lstrip("+-")
+        records.sort(key=lambda record: (record.get(name) is None, record.get(name, "")), reverse=descending)
+    return records
+
+
+# -- data ----------------------------------------------------------------------
+
+class Store:
+    """Collections of records kept in memory."""
+
+    def __init__(self, fixtures=None, seed=0):
+        self.collections = {}
+        self.tokens = {}
+        self._random = random.Random(seed)
+        for name, records in (fixtures or {}).items():
+            self.seed(name, records)
+
+    @classmethod
+    def from_file(cls, path=None, seed=0):
+        with open(path or DEFAULT_FIXTURES, encoding="utf-8") as fh:
+            return cls(json.load(fh), seed=seed)
+
+    def seed(self, collection, records):
+        """Add (or replace by id) fixture records in ``collection``."""
+        bucket = self.collections.setdefault(collection, {})
+        for record in records:
+            record = copy.deepcopy(record)
+            record.setdefault("id", self.new_id())
+            record.setdefault("collectionName", collection)
+            record.setdefault("collectionId", collection)
+            record.setdefault("created", now_string())
+            record.setdefault("updated", record["created"])
+            bucket[record["id"]] = record
+
+    def new_id(self):
+        return "".join(self._random.choice("abcdefghijklmnopqrstuvwxyz0123456789") for _ in range(15))
+
+    def _bucket(self, collection):
+        try:
+            return self.collections[collection]
+        except KeyError:
+            raise StubError(404, "Missing collection context.") from None
+
+    def get(self, collection, record_id):
+        record = self._bucket(collection).get(record_id)
+        if record is None:
+            raise StubError(404, "The requested resource wasn't found.")
+        return record
+
+    def list(self, collection, page=1, per_page=30, filter="", sort="", auth=None, skip_total=False):
+        matcher = Filter(filter)
+        items = [record for record in self._bucket(collection).values() if matcher.matches(record, auth)]
+        if sort:
+            items = _sort(items, sort)
+        per_page = max(1, min(per_page, 1000))
+        start = (page - 1) * per_page
+        total = len(items)
+        return {
+            "page": page,
+            "perPage": per_page,
+            "totalItems": -1 if skip_total else total,
+            "totalPages": -1 if skip_total else math.ceil(total / per_page),
+            "items": items[start:start + per_page],
+        }
+
+    def create(self, collection, data):
+        data = dict(data)
+        if "password" in data and data.get("passwordConfirm", data["password"]) != data["password"]:
+            raise StubError(400, "Failed to create record.", {"passwordConfirm": {"code": "validation_values_mismatch"}})
+        email = data.get("email")
+        if email and any(record.get("email") == email for record in self.collections.get(collection, {}).values()):
+            raise StubError(400, "Failed to create record.", {"email": {"code": "validation_not_unique"}})
+        data.pop("passwordConfirm", None)
+        data.pop("id", None)
+        self.seed(collection, [{"id": self.new_id(), **data}])
+        return self.collections[collection][next(reversed(self.collections[collection]))]
+
+    def update(self, collection, record_id, data):
+        record = self.get(collection, record_id)
+        for key, value in data.items():
+            if key in ("id", "collectionId", "collectionName", "created", "passwordConfirm", "oldPassword"):
+                continue
+            if key.endswith("+") or key.endswith("-"):
+                # PocketBase field modifiers: "current_uses+": 1
+                name, sign = key[:-1], 1 if key.endswith("+") else -1
+                current = record.get(name)
+                if isinstance(current, list):
+                    values = value if isinstance(value, list) else [value]
+                    record[name] = current + values if sign > 0 else [v for v in current if v not in values]
+                else:
+                    record[name] = (current or 0) + sign * value
+            else:
+                record[key] = value
+        record["updated"] = now_string()
+        return record
+
+    def delete(self, collection, record_id):
+        self.get(collection, record_id)
+        del self._bucket(collection)[record_id]
+
+    def authenticate(self, collection, identity, password):
+        for record in self._bucket(collection).values():
+            if identity in (record.get("email"), record.get("username")) and record.get("password") == password:
+                return record
+        raise StubError(400, "Failed to authenticate.")
+
+    def issue_token(self, record):
+        """Unsigned JWT-shaped token carrying ``id`` and ``exp``."""
+        def encode(part):
+            return base64.urlsafe_b64encode(json.dumps(part).encode()).rstrip(b"=").decode()
+        payload = {
+            "id": record["id"],
+            "collectionId": record.get("collectionId", ""),
+            "type": "auth",
+            "refreshable": True,
+            "exp": int(time.time()) + TOKEN_TTL_S,
+            "nonce": self.new_id(),
+        }
+        token = f"{encode({'alg': 'HS256', 'typ': 'JWT'})}.{encode(payload)}.stub"
+        self.tokens[token] = (record["collectionName"], record["id"])
+        return token
+
+    def auth_record(self, authorization):
+        """Record behind an ``Authorization`` header, or None."""
+        token = (authorization or "").removeprefix("Bearer ").strip()
+        owner = self.tokens.get(token)
+        if owner is None:
+            return None
+        return self._bucket(owner[0]).get(owner[1])
+
+
+def public(record):
+    return {key: value for key, value in record.items() if key not in HIDDEN_FIELDS}
+
+
+# -- HTTP ----------------------------------------------------------------------
+
+_RECORDS_RE = re.compile(r"^/api/collections/(?P<collection>[^/]+)/records(?:/(?P<id>[^/]+))?/?$")
+_AUTH_RE = re.compile(r"^/api/collections/(?P<collection>[^/]+)/(?P<action>auth-with-password|auth-refresh)/?$")
+
+
+class PocketBaseStub:
+    """Request handler for :func:`harness.httpio.serve`; counts hits per route."""
+
+    def __init__(self, store=None):
+        self.store = store or Store.from_file()
+        self.hits = {}
+
+    def _count(self, key):
+        self.hits[key] = self.hits.get(key, 0) + 1
+
+    async def __call__(self, request):
+        if request.method == "OPTIONS":
+            return httpio.Response(204, dict(CORS_HEADERS))
+        try:
+            response = self._route(request)
+        except StubError as exc:
+            response = httpio.json_response(exc.status, {"code": exc.status, "message": str(exc), "data": exc.data})
+        except ValueError:
+            response = httpio.json_response(400, {"code": 400, "message": "Invalid request body.", "data": {}})
+        response.headers.update(CORS_HEADERS)
+        return response
+
+    def _body(self, request):
+        if not request.body:
+            return {}
+        content_type = request.headers.get("content-type", "")
+        if "application/x-www-form-urlencoded" in content_type:
+            return dict(urllib.parse.parse_qsl(request.body.decode()))
+        if "application/json" not in content_type and not request.body.lstrip().startswith(b"{"):
+            raise StubError(400, "Only JSON and urlencoded bodies are supported by the stub.")
+        return request.json()
+
+    def _route(self, request):
+        path = request.path
+        if path == "/api/health":
+            self._count("health")
+            return httpio.json_response(200, {"code": 200, "message": "API is healthy.", "data": {}})
+        if path.startswith("/api/files/"):
+            self._count("files")
+            return httpio.Response(200, {"content-type": "image/png", "cache-control": "max-age=3600"}, PLACEHOLDER_PNG)
+
+        if path == "/api/coupons/validate" and request.method == "POST":
+            return self._validate_coupon(self._body(request))
+
+        auth = _AUTH_RE.match(path)
+        if auth and request.method == "POST":
+            return self._auth(request, auth["collection"], auth["action"])
+
+        records = _RECORDS_RE.match(path)
+        if not records:
+            raise StubError(404, "The requested resource wasn't found.")
+        collection, record_id = records["collection"], records["id"]
+        self._count(f"{request.method} {collection}")
+        store = self.store
+
+        if record_id is None and request.method == "GET":
+            auth_record = store.auth_record(request.headers.get("authorization"))
+            result = store.list(
+                collection,
+                page=int(request.query.get("page", 1)),
+                per_page=int(request.query.get("perPage", 30)),
+                filter=request.query.get("filter", ""),
+                sort=request.query.get("sort", ""),
+                auth=auth_record,
+                skip_total=request.query.get("skipTotal") in ("1", "true"),
+            )
+            result["items"] = [public(item) for item in result["items"]]
+            return httpio.json_response(200, result)
+        if record_id is None and request.method == "POST":
+            return httpio.json_response(200, public(store.create(collection, self._body(request))))
+        if record_id is not None and request.method == "GET":
+            return httpio.json_response(200, public(store.get(collection, record_id)))
+        if record_id is not None and request.method == "PATCH":
+            return httpio.json_response(200, public(store.update(collection, record_id, self._body(request))))
+        if record_id is not None and request.method == "DELETE":
+            store.delete(collection, record_id)
+            return httpio.Response(204)
+        raise StubError(405, "Method not allowed.")
+
+    def _validate_coupon(self, body):
+        """The route pb_hooks/coupon-handler.pb.js adds, with the same checks and messages."""
+        self._count("coupons/validate")
+        code, subtotal = body.get("code"), body.get("subtotal")
+        if not code or subtotal is None:
+            return httpio.json_response(400, {"success": False, "message": "Missing required fields"})
+        coupon = next((record for record in self.store._bucket("coupons").values() if record.get("code") == code), None)
+        message = None
+        if not subtotal:
+            message = "Invalid coupon code or subtotal"
+        elif coupon is None:
+            message = "Coupon not found"
+        elif not coupon.get("active"):
+            message = "This coupon is not active"
+        elif coupon.get("expires_at") and datetime.datetime.fromisoformat(coupon["expires_at"]) < datetime.datetime.now(datetime.timezone.utc):
+            message = "This coupon has expired"
+        elif coupon.get("min_order_value") and subtotal < coupon["min_order_value"]:
+            message = f"This coupon requires a minimum order of ₹{coupon['min_order_value']}"
+        elif coupon.get("max_uses") and (coupon.get("current_uses") or 0) >= coupon["max_uses"]:
+            message = "This coupon has reached its usage limit"
+        if message:
+            return httpio.json_response(400, {"success": False, "message": message, "data": None})
+        discount = 0
+        if coupon.get("type") == "percentage":
+            discount = subtotal * coupon["amount"] / 100
+        elif coupon.get("type") == "fixed_amount":
+            discount = min(coupon["amount"], subtotal)
+        return httpio.json_response(200, {
+            "success": True,
+            "message": "Coupon applied successfully!",
+            "data": {
+                "couponId": coupon["id"],
+                "discountAmount": round(discount, 2),
+                "code": coupon["code"],
+                "type": coupon["type"],
+                "amount": coupon["amount"],
+            },
+        })
+
+    def _auth(self, request, collection, action):
+        self._count(f"{action} {collection}")
+        if action == "auth-refresh":
+            record = self.store.auth_record(request.headers.get("authorization"))
+            if record is None:
+                raise StubError(401, "The request requires valid record authorization token to be set.")
+        else:
+            body = self._body(request)
+            record = self.store.authenticate(collection, body.get("identity", ""), body.get("password", ""))
+        return httpio.json_response(200, {"token": self.store.issue_token(record), "record": public(record)})
+
+
+def start(fixtures=None, host=None, port=None):
+    """Start a stub on a background thread (default: ``config.POCKETBASE_URL``)."""
+    parts = urllib.parse.urlsplit(config.POCKETBASE_URL)
+    stub = PocketBaseStub(Store.from_file(fixtures))
+    return httpio.ServerThread(stub, host or parts.hostname, parts.port if port is None else port).start()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=None, help="bind address (default: from TESTSPRITE_POCKETBASE_URL)")
+    parser.add_argument("--port", type=int, default=None, help="port (default: from TESTSPRITE_POCKETBASE_URL)")
+    parser.add_argument("--fixtures", type=Path, default=None, help=f"fixture JSON (default: {DEFAULT_FIXTURES.name})")
+    args = parser.parse_args(argv)
+    server = start(args.fixtures, args.host, args.port)
+    print(f"PocketBase stub listening on {server.url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
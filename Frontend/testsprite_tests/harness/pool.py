@@ -0,0 +1,236 @@
+"""Pre-warmed browser contexts, reused across tests.
+
+Without a pool every test creates a context, opens a page and waits for the
+storefront to boot (``session.open_home``), which takes seconds before the
+first step runs. :class:`ContextPool` keeps ``size`` contexts per role, each
+with a page already showing ``config.BASE_URL`` while it is idle.
+``session.new_page`` hands a test that page, and ``session.open_home`` skips
+the navigation for it. Instruments with a ``prepare(context)`` hook (vitals,
+third-party blocking) set the context up before the page loads, so they
+see that load; any other instrument that routes or records the page (HAR
+replay, coverage, ...) has it loaded again after it is attached, from a warm
+HTTP cache. With ``size`` above the runner's concurrency, the
+spare contexts are reset while tests run and are ready when the next test
+starts. When all are busy, an extra context is created and closed again
+on release.
+
+A released context is reset in the background while the next test runs:
+
+- routes are dropped and cookies cleared;
+- localStorage, sessionStorage, IndexedDB, Cache Storage and service workers
+  of the storefront origin are cleared (on a blank document served from the
+  origin, so the app does not boot half-reset);
+- the role's storage state is restored;
+- the ``prepare`` hooks run again;
+- the old pages are closed and a fresh page loads the storefront again.
+
+A context whose reset fails is closed and replaced.
+
+    python -m harness.runner -j 4 --pool 6      # 6 contexts per role: 4 busy, 2 warming
+"""
+import asyncio
+import collections
+import json
+import time
+import urllib.parse
+
+from playwright import async_api
+
+from . import auth, baseline, config, session
+
+RESET_PATH = "/__testsprite_pool_reset"
+
+CLEAR_STORAGE_SCRIPT = """
+async (items) => {
+  localStorage.clear();
+  sessionStorage.clear();
+  if (indexedDB.databases) {
+    for (const db of await indexedDB.databases()) {
+      await new Promise((done) => {
+        const request = indexedDB.deleteDatabase(db.name);
+        request.onsuccess = request.onerror = request.onblocked = () => done();
+      });
+    }
+  }
+  if (self.caches) {
+    for (const key of await caches.keys()) await caches.delete(key);
+  }
+  if (navigator.serviceWorker) {
+    for (const registration of await navigator.serviceWorker.getRegistrations()) await registration.unregister();
+  }
+  for (const { name, value } of items) localStorage.setItem(name, value);
+}
+"""
+
+
+class PoolStats:
+    """Acquire/release counters of one pool."""
+
+    def __init__(self):
+        self.acquired = 0
+        self.warm = 0
+        self.waits_ms = []
+        self.created = 0
+        self.resets_ms = []
+        self.replaced = 0
+        self.discarded = 0
+
+    def as_dict(self):
+        def p(values, q):
+            value = baseline.percentile(values, q)
+            return None if value is None else round(value, 1)
+        return {
+            "acquired": self.acquired,
+            "warm": self.warm,
+            "waitP50Ms": p(self.waits_ms, 50),
+            "waitP95Ms": p(self.waits_ms, 95),
+            "created": self.created,
+            "resets": len(self.resets_ms),
+            "resetP50Ms": p(self.resets_ms, 50),
+            "replaced": self.replaced,
+            "discarded": self.discarded,
+        }
+
+    def line(self):
+        stats = self.as_dict()
+        warm = f"{stats['warm'] / stats['acquired']:.0%}" if stats["acquired"] else "-"
+        return (
+            f"pool: {stats['acquired']} acquired, {warm} warm, wait p50 {stats['waitP50Ms']} ms"
+            f" p95 {stats['waitP95Ms']} ms; {stats['created']} created, {stats['resets']} resets"
+            f" (p50 {stats['resetP50Ms']} ms), {stats['replaced']} replaced"
+        )
+
+
+class ContextPool:
+    """Warm contexts per role for :func:`harness.runner.run_suite`."""
+
+    def __init__(self, browser, size, url=None, prepare=()):
+        self.browser = browser
+        self.size = max(1, size)
+        self.url = url or config.BASE_URL
+        self.prepare = list(prepare)                           # async hooks run on a context before its page loads
+        parts = urllib.parse.urlsplit(self.url)
+        self.origin = f"{parts.scheme}://{parts.netloc}"
+        self.idle = collections.defaultdict(asyncio.Queue)     # role -> ready contexts (or creation errors)
+        self.preparing = collections.Counter()                 # role -> contexts being created or reset
+        self.waiting = collections.Counter()                   # role -> acquirers blocked on the queue
+        self.roles = {}                                        # context -> role
+        self.stats = PoolStats()
+        self._tasks = set()
+        self._closed = False
+
+    def _spawn(self, coroutine):
+        task = asyncio.ensure_future(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def fill(self, role=None, count=None):
+        """Start warming ``count`` (default ``size``) contexts for ``role``."""
+        for _ in range(self.size if count is None else count):
+            self.preparing[role] += 1
+            self._spawn(self._create(role))
+
+    async def acquire(self, role=None):
+        """A ready context for ``role``, waiting for one if none is idle."""
+        queue = self.idle[role]
+        warm = not queue.empty()
+        if queue.qsize() + self.preparing[role] <= self.waiting[role]:
+            self.fill(role, 1)       # everything on the way is spoken for
+        started = time.perf_counter()
+        self.waiting[role] += 1
+        try:
+            item = await queue.get()
+        finally:
+            self.waiting[role] -= 1
+        self.stats.acquired += 1
+        self.stats.warm += warm
+        self.stats.waits_ms.append((time.perf_counter() - started) * 1000)
+        if isinstance(item, BaseException):
+            raise item
+        return item
+
+    def release(self, context):
+        """Give ``context`` back; it is reset (or closed) in the background."""
+        role = self.roles.get(context)
+        if self._closed or sum(other == role for other in self.roles.values()) > self.size:
+            self.stats.discarded += 1
+            self._spawn(self._close(context))
+            return
+        self.preparing[role] += 1
+        self._spawn(self._recycle(context, role))
+
+    async def _create(self, role):
+        try:
+            context = await session.new_context(self.browser, role)
+            self.roles[context] = role
+            self.stats.created += 1
+            await self._load(context)
+            self.idle[role].put_nowait(context)
+        except Exception as exc:
+            self.idle[role].put_nowait(exc)
+        finally:
+            self.preparing[role] -= 1
+
+    async def _recycle(self, context, role):
+        started = time.perf_counter()
+        try:
+            await self._reset(context, role)
+        except Exception:
+            self.stats.replaced += 1
+            await self._close(context)
+            self.preparing[role] += 1
+            await self._create(role)
+        else:
+            self.stats.resets_ms.append((time.perf_counter() - started) * 1000)
+            self.idle[role].put_nowait(context)
+        finally:
+            self.preparing[role] -= 1
+
+    async def _reset(self, context, role):
+        await context.unroute_all(behavior="ignoreErrors")
+        await context.clear_cookies()
+        await context.clear_permissions()
+        await context.set_offline(False)
+        await context.set_extra_http_headers({})
+        context.set_default_timeout(config.DEFAULT_TIMEOUT_MS)
+        state = {}
+        if role is not None:
+            state = json.loads((await auth.storage_state(role)).read_text(encoding="utf-8"))
+            await context.add_cookies(state.get("cookies", []))
+        items = [
+            item for origin in state.get("origins", []) if origin["origin"] == self.origin
+            for item in origin.get("localStorage", [])
+        ]
+        stale = list(context.pages)
+        page = await context.new_page()
+        await page.route(f"{self.origin}{RESET_PATH}", lambda route: route.fulfill(
+            status=200, content_type="text/html", body="<!doctype html><title>reset</title>",
+        ))
+        await page.goto(f"{self.origin}{RESET_PATH}", timeout=config.NAVIGATION_TIMEOUT_MS)
+        await page.evaluate(CLEAR_STORAGE_SCRIPT, items)
+        await page.unroute_all(behavior="ignoreErrors")
+        for old in stale:
+            await old.close()
+        await self._load(context, page)
+
+    async def _load(self, context, page=None):
+        for prepare in self.prepare:
+            await prepare(context)
+        page = page or await context.new_page()
+        await session.open_home(page, self.url)
+        session.mark_warm(page, self.url)
+
+    async def _close(self, context):
+        self.roles.pop(context, None)
+        try:
+            await context.close()
+        except async_api.Error:
+            pass
+
+    async def close(self):
+        """Wait for pending resets, then close every context."""
+        self._closed = True
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+        for context in list(self.roles):
+            await self._close(context)
@@ -0,0 +1,470 @@
+"""In-memory stand-in for the Razorpay APIs checkout depends on.
+
+Serves what src/server/razorpay-routes.ts and pb_hooks/razorpay.pb.js call on
+api.razorpay.com:
+
+    POST  /v1/orders                   GET /v1/orders/<id>[/payments]
+    GET   /v1/payments/<id>            PATCH /v1/payments/<id> (notes)
+    POST  /v1/payments/<id>/capture    POST /v1/payments/<id>/refund
+
+plus what the browser needs to finish a checkout without the real modal:
+
+    GET   /v1/checkout.js              a ``window.Razorpay`` that pays at once
+    POST  /v1/checkout/pay             authorise a payment, return the signed
+                                       {razorpay_payment_id, razorpay_order_id,
+                                       razorpay_signature} handler payload
+    POST  /functions/v1/create-order*  the CRM order/verify functions the
+    POST  /functions/v1/verify-payment*  checkout page calls (amounts in rupees)
+
+Signatures are HMAC-SHA256 of "order_id|payment_id" with the key secret, as
+Razorpay returns them, so the servers' verification passes unchanged.
+``latency_ms``/``jitter_ms`` delay every API call; ``error_rate`` answers a
+share of them with a 500 and ``decline_rate`` fails a share of payments at
+checkout, so failure paths can be timed too.
+
+    python -m harness.razorpay_stub --port 8091 --latency-ms 150 --decline-rate 0.1
+    python -m harness.runner TC004 TC005 --razorpay-stub
+
+Point the servers at it with ``RAZORPAY_API_URL`` (default
+https://api.razorpay.com); browser contexts are routed to it by
+:class:`RazorpayRouter`.
+"""
+import argparse
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import random
+import re
+import secrets
+import sys
+import time
+import urllib.parse
+
+from . import config, httpio
+
+CORS_HEADERS = {
+    "access-control-allow-origin": "*",
+    "access-control-allow-methods": "GET, POST, PATCH, OPTIONS",
+    "access-control-allow-headers": "authorization, content-type",
+}
+
+# Served as https://checkout.razorpay.com/v1/checkout.js. "open" pays through
+# the stub straight away and calls the page's handler (or "payment.failed").
+CHECKOUT_JS = """
+(function () {
+  var endpoint = %(endpoint)s;
+  function Razorpay(options) {
+    this.options = options;
+    this.listeners = {};
+  }
+  Razorpay.prototype.on = function (event, callback) {
+    this.listeners[event] = callback;
+  };
+  Razorpay.prototype.open = function () {
+    var self = this, options = this.options;
+    fetch(endpoint, {
+      method: "POST",
+      headers: {"Content-Type": "application/json"},
+      body: JSON.stringify({order_id: options.order_id, amount: options.amount, currency: options.currency})
+    }).then(function (response) {
+      return response.json().then(function (body) { return {ok: response.ok, body: body}; });
+    }).then(function (result) {
+      if (result.ok) {
+        options.handler && options.handler(result.body);
+      } else if (self.listeners["payment.failed"]) {
+        self.listeners["payment.failed"](result.body);
+      } else if (options.modal && options.modal.ondismiss) {
+        options.modal.ondismiss();
+      }
+    });
+  };
+  Razorpay.prototype.close = function () {};
+  window.Razorpay = Razorpay;
+})();
+"""
+
+_ORDER_RE = re.compile(r"^/v1/orders(?:/(?P<id>order_\w+)(?P<payments>/payments)?)?/?$")
+_PAYMENT_RE = re.compile(r"^/v1/payments/(?P<id>pay_\w+)(?:/(?P<action>capture|refund|notes))?/?$")
+
+
+class StubError(Exception):
+    """An API error, rendered in Razorpay's ``{"error": {...}}`` shape."""
+
+    def __init__(self, status, description, code="BAD_REQUEST_ERROR", reason=None, metadata=None):
+        super().__init__(description)
+        self.status = status
+        self.code = code
+        self.reason = reason
+        self.metadata = metadata or {}
+
+    def payload(self):
+        return {"error": {
+            "code": self.code,
+            "description": str(self),
+            "source": "business" if self.reason else "NA",
+            "step": "payment_authorization" if self.reason else "NA",
+            "reason": self.reason or "NA",
+            "metadata": self.metadata,
+        }}
+
+
+def sign(order_id, payment_id, secret=None):
+    """razorpay_signature for a payment: HMAC-SHA256 of "order_id|payment_id"."""
+    secret = config.RAZORPAY_KEY_SECRET if secret is None else secret
+    return hmac.new(secret.encode(), f"{order_id}|{payment_id}".encode(), hashlib.sha256).hexdigest()
+
+
+def new_id(prefix):
+    """Razorpay-style id: prefix plus 14 alphanumerics."""
+    alphabet = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789"
+    return f"{prefix}_" + "".join(secrets.choice(alphabet) for _ in range(14))
+
+
+class Ledger:
+    """Orders, payments and refunds held in memory."""
+
+    def __init__(self):
+        self.orders = {}
+        self.payments = {}
+        self.refunds = {}
+
+    def create_order(self, body):
+        amount = body.get("amount")
+        if not isinstance(amount, int) or amount < 100:
+            raise StubError(400, "The amount must be atleast INR 1.00")
+        order = {
+            "id": new_id("order"),
+            "entity": "order",
+            "amount": amount,
+            "amount_paid": 0,
+            "amount_due": amount,
+            "currency": body.get("currency") or "INR",
+            "receipt": body.get("receipt"),
+            "offer_id": None,
+            "status": "created",
+            "attempts": 0,
+            "notes": body.get("notes") or [],
+            "created_at": int(time.time()),
+            # Not part of Razorpay's order entity; payment_capture=1 asks for auto-capture.
+            "_auto_capture": bool(body.get("payment_capture")),
+        }
+        self.orders[order["id"]] = order
+        return order
+
+    def order(self, order_id):
+        try:
+            return self.orders[order_id]
+        except KeyError:
+            raise StubError(400, "The id provided does not exist") from None
+
+    def payment(self, payment_id):
+        try:
+            return self.payments[payment_id]
+        except KeyError:
+            raise StubError(400, "The id provided does not exist") from None
+
+    def pay(self, order_id, amount=None, currency=None, declined=False):
+        """Attempt a payment on ``order_id`` (created on the fly if unknown).
+
+        The storefront falls back to a local ``order_<timestamp>`` id when the
+        order service is down, so an unknown id becomes an order here rather
+        than an error.
+        """
+        order = self.orders.get(order_id)
+        if order is None:
+            order = self.create_order({"amount": int(amount or 100), "currency": currency})
+            del self.orders[order["id"]]
+            order["id"] = order_id
+            self.orders[order_id] = order
+        order["attempts"] += 1
+        order["status"] = "attempted"
+        payment = {
+            "id": new_id("pay"),
+            "entity": "payment",
+            "amount": order["amount"],
+            "currency": order["currency"],
+            "status": "failed" if declined else "authorized",
+            "order_id": order_id,
+            "invoice_id": None,
+            "international": False,
+            "method": "card",
+            "amount_refunded": 0,
+            "refund_status": None,
+            "captured": False,
+            "description": None,
+            "email": "void@razorpay.com",
+            "contact": "+919999999999",
+            "notes": [],
+            "fee": None,
+            "tax": None,
+            "error_code": "BAD_REQUEST_ERROR" if declined else None,
+            "error_description": "Payment processing failed because of incorrect OTP" if declined else None,
+            "error_reason": "payment_failed" if declined else None,
+            "created_at": int(time.time()),
+        }
+        self.payments[payment["id"]] = payment
+        if declined:
+            raise StubError(
+                400, payment["error_description"], reason="payment_failed",
+                metadata={"payment_id": payment["id"], "order_id": order_id},
+            )
+        if order["_auto_capture"]:
+            self.capture(payment["id"], payment["amount"])
+        return payment
+
+    def capture(self, payment_id, amount):
+        payment = self.payment(payment_id)
+        if payment["status"] != "authorized":
+            raise StubError(400, "This payment has already been captured" if payment["captured"]
+                            else f"Only payments which have been authorized can be captured, status: {payment['status']}")
+        if amount is not None and amount != payment["amount"]:
+            raise StubError(400, "Capture amount must be equal to the amount authorized")
+        payment.update(status="captured", captured=True, fee=round(payment["amount"] * 0.02), tax=0)
+        order = self.orders[payment["order_id"]]
+        order.update(status="paid", amount_paid=order["amount"], amount_due=0)
+        return payment
+
+    def refund(self, payment_id, amount=None):
+        payment = self.payment(payment_id)
+        if payment["status"] not in ("captured", "refunded"):
+            raise StubError(400, "The payment has not been captured yet")
+        remaining = payment["amount"] - payment["amount_refunded"]
+        amount = remaining if amount is None else amount
+        if amount <= 0 or amount > remaining:
+            raise StubError(400, "The refund amount provided is greater than amount captured")
+        refund = {
+            "id": new_id("rfnd"),
+            "entity": "refund",
+            "amount": amount,
+            "currency": payment["currency"],
+            "payment_id": payment_id,
+            "notes": [],
+            "receipt": None,
+            "status": "processed",
+            "speed_processed": "normal",
+            "created_at": int(time.time()),
+        }
+        self.refunds[refund["id"]] = refund
+        payment["amount_refunded"] += amount
+        full = payment["amount_refunded"] == payment["amount"]
+        payment["refund_status"] = "full" if full else "partial"
+        if full:
+            payment["status"] = "refunded"
+        return refund
+
+
+def public(entity):
+    return {key: value for key, value in entity.items() if not key.startswith("_")}
+
+
+class RazorpayStub:
+    """Request handler for :func:`harness.httpio.serve`; counts hits per route."""
+
+    def __init__(self, ledger=None, key_id=None, key_secret=None, latency_ms=0, jitter_ms=0,
+                 error_rate=0.0, decline_rate=0.0, seed=None):
+        self.ledger = ledger or Ledger()
+        self.key_id = config.RAZORPAY_KEY_ID if key_id is None else key_id
+        self.key_secret = config.RAZORPAY_KEY_SECRET if key_secret is None else key_secret
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.decline_rate = decline_rate
+        self.random = random.Random(seed)
+        self.hits = {}
+
+    def _count(self, key):
+        self.hits[key] = self.hits.get(key, 0) + 1
+
+    async def __call__(self, request):
+        if request.method == "OPTIONS":
+            return httpio.Response(204, dict(CORS_HEADERS))
+        if request.path == "/v1/checkout.js":
+            self._count("checkout.js")
+            response = self._checkout_js(request)
+        else:
+            delay = self.latency_ms + self.random.uniform(-self.jitter_ms, self.jitter_ms)
+            if delay > 0:
+                await asyncio.sleep(delay / 1000)
+            try:
+                if self.random.random() < self.error_rate:
+                    raise StubError(500, "The server encountered an error. The incident has been reported to admins",
+                                    code="SERVER_ERROR")
+                response = self._route(request)
+            except StubError as exc:
+                response = httpio.json_response(exc.status, exc.payload())
+            except (ValueError, AttributeError):
+                response = httpio.json_response(400, StubError(400, "The request body is not valid JSON").payload())
+            except KeyError as exc:
+                response = httpio.json_response(400, StubError(400, f"The {exc.args[0]} field is required.").payload())
+        response.headers.update(CORS_HEADERS)
+        return response
+
+    def _checkout_js(self, request):
+        endpoint = f"http://{request.headers.get('host')}/v1/checkout/pay"
+        script = CHECKOUT_JS % {"endpoint": json.dumps(endpoint)}
+        return httpio.Response(200, {"content-type": "application/javascript"}, script.encode())
+
+    def _authorize(self, request):
+        """Check Basic auth against the configured key, when one is set."""
+        if not self.key_id:
+            return
+        expected = "Basic " + base64.b64encode(f"{self.key_id}:{self.key_secret}".encode()).decode()
+        if request.headers.get("authorization") != expected:
+            raise StubError(401, "The api key provided is invalid", code="BAD_REQUEST_ERROR")
+
+    def _route(self, request):
+        path, method = request.path, request.method
+        if path == "/v1/checkout/pay" and method == "POST":
+            return self._pay(request.json())
+        if path.startswith("/functions/v1/create-order") and method == "POST":
+            return self._crm_create_order(request.json())
+        if path.startswith("/functions/v1/verify-payment") and method == "POST":
+            return self._crm_verify(request.json())
+
+        order = _ORDER_RE.match(path)
+        if order:
+            self._authorize(request)
+            if order["id"] is None and method == "POST":
+                self._count("create order")
+                return httpio.json_response(200, public(self.ledger.create_order(request.json())))
+            if order["id"] is not None and method == "GET":
+                self._count("fetch order")
+                if order["payments"]:
+                    items = [public(p) for p in self.ledger.payments.values() if p["order_id"] == order["id"]]
+                    self.ledger.order(order["id"])
+                    return httpio.json_response(200, {"entity": "collection", "count": len(items), "items": items})
+                return httpio.json_response(200, public(self.ledger.order(order["id"])))
+
+        payment = _PAYMENT_RE.match(path)
+        if payment:
+            self._authorize(request)
+            payment_id, action = payment["id"], payment["action"]
+            if action is None and method == "GET":
+                self._count("fetch payment")
+                return httpio.json_response(200, public(self.ledger.payment(payment_id)))
+            if (action is None and method == "PATCH") or (action == "notes" and method == "POST"):
+                self._count("update payment")
+                body = request.json() or {}
+                notes = body.get("notes", body) if action is None else body
+                self.ledger.payment(payment_id)["notes"] = notes
+                return httpio.json_response(200, public(self.ledger.payment(payment_id)))
+            if action == "capture" and method == "POST":
+                self._count("capture")
+                body = request.json() or {}
+                return httpio.json_response(200, public(self.ledger.capture(payment_id, body.get("amount"))))
+            if action == "refund" and method == "POST":
+                self._count("refund")
+                body = request.json() or {}
+                return httpio.json_response(200, public(self.ledger.refund(payment_id, body.get("amount"))))
+        raise StubError(404, "The requested URL was not found on the server.", code="NOT_FOUND")
+
+    def _pay(self, body):
+        """What the Checkout modal hands the page's ``handler`` on success."""
+        self._count("checkout pay")
+        if not body.get("order_id"):
+            raise StubError(400, "The order_id field is required.")
+        declined = self.random.random() < self.decline_rate
+        payment = self.ledger.pay(body["order_id"], body.get("amount"), body.get("currency"), declined)
+        return httpio.json_response(200, {
+            "razorpay_payment_id": payment["id"],
+            "razorpay_order_id": payment["order_id"],
+            "razorpay_signature": sign(payment["order_id"], payment["id"], self.key_secret),
+        })
+
+    def _crm_create_order(self, body):
+        """The CRM create-order function: rupees in, a Razorpay order out."""
+        self._count("crm create order")
+        rupees = float(body.get("amount") or 0)
+        if rupees <= 0:
+            return httpio.json_response(400, {"error": "Invalid amount value"})
+        order = self.ledger.create_order({
+            "amount": round(rupees * 100),
+            "currency": body.get("currency"),
+            "receipt": body.get("receipt"),
+            "notes": body.get("notes"),
+            "payment_capture": body.get("payment_capture", 1),
+        })
+        return httpio.json_response(200, {**public(order), "key_id": self.key_id})
+
+    def _crm_verify(self, body):
+        """The CRM verify function: signature check, or capture with action=capture."""
+        self._count("crm verify")
+        if body.get("action") == "capture":
+            payment_id = body.get("payment_id") or body.get("razorpay_payment_id")
+            payment = self.ledger.payment(payment_id)
+            if payment["status"] == "authorized":
+                self.ledger.capture(payment_id, None)
+            return httpio.json_response(200, {"success": True, "status": payment["status"], "payment": public(payment)})
+        order_id, payment_id = body.get("razorpay_order_id"), body.get("razorpay_payment_id")
+        signature = body.get("razorpay_signature") or ""
+        if not (order_id and payment_id and hmac.compare_digest(signature, sign(order_id, payment_id, self.key_secret))):
+            return httpio.json_response(400, {"verified": False, "error": "Invalid payment signature"})
+        return httpio.json_response(200, {"verified": True, "payment": public(self.ledger.payment(payment_id))})
+
+
+class RazorpayRouter:
+    """Runner instrument: sends a context's Razorpay and CRM payment traffic to the stub."""
+
+    PATTERNS = [
+        "https://checkout.razorpay.com/v1/checkout.js",
+        "https://api.razorpay.com/**",
+        "**/functions/v1/create-order*",
+        "**/functions/v1/verify-payment*",
+    ]
+
+    def __init__(self, stub_url=None):
+        self.stub_url = stub_url or config.RAZORPAY_STUB_URL
+        self.context = None
+        self.routed = 0
+
+    async def attach(self, context, script=None):
+        self.context = context
+        for pattern in self.PATTERNS:
+            await context.route(pattern, self._forward)
+
+    async def _forward(self, route):
+        parts = urllib.parse.urlsplit(route.request.url)
+        target = urllib.parse.urlunsplit(urllib.parse.urlsplit(self.stub_url)[:2] + parts[2:])
+        self.routed += 1
+        response = await route.fetch(url=target)
+        await route.fulfill(response=response)
+
+    async def finish(self, script, outcome):
+        for pattern in self.PATTERNS:
+            await self.context.unroute(pattern, self._forward)
+
+
+def start(host=None, port=None, **options):
+    """Start a stub on a background thread (default: ``config.RAZORPAY_STUB_URL``)."""
+    parts = urllib.parse.urlsplit(config.RAZORPAY_STUB_URL)
+    stub = RazorpayStub(**options)
+    return httpio.ServerThread(stub, host or parts.hostname, parts.port if port is None else port).start()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=None, help="bind address (default: from TESTSPRITE_RAZORPAY_STUB_URL)")
+    parser.add_argument("--port", type=int, default=None, help="port (default: from TESTSPRITE_RAZORPAY_STUB_URL)")
+    parser.add_argument("--latency-ms", type=float, default=0, help="added to every API call (default: %(default)s)")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="+/- random spread on the latency (default: %(default)s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of API calls answered with a 500 (default: %(default)s)")
+    parser.add_argument("--decline-rate", type=float, default=0.0, help="share of checkout payments declined (default: %(default)s)")
+    parser.add_argument("--seed", type=int, help="seed for latency jitter and injected failures")
+    args = parser.parse_args(argv)
+    server = start(
+        args.host, args.port, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate, decline_rate=args.decline_rate, seed=args.seed,
+    )
+    print(f"Razorpay stub listening on {server.url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
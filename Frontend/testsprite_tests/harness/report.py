@@ -0,0 +1,367 @@
+"""Markdown and HTML run reports, updated as each test finishes.
+
+The reports go to tmp/report/testsprite-mcp-test-report.md and .html. The
+copies next to the TC scripts are TestSprite's, and this module does not
+write them. Tests are grouped into one section per requirement
+(feature_tests.json), and each row shows:
+
+- status, duration and the headline Web Vitals of this run;
+- fail rate, flaky flag and last results from the run history
+  (:mod:`harness.history`);
+- a duration trend (a text sparkline in Markdown, SVG in HTML).
+
+:class:`ReportWriter` is a runner instrument. When a test finishes it
+computes that test's row once and stores it in tmp/report/rows/. It then
+reassembles both documents from the stored rows, so no earlier test is
+queried again. Shard workers write their own rows, which makes a sharded
+run's report fill in while the run goes on. The HTML version reloads itself
+until the run is over.
+
+    python -m harness.runner                 # reports on by default (--no-report)
+    python -m harness.report                 # rebuild from the latest history run
+    python -m harness.report --run 12
+"""
+import argparse
+import contextlib
+import html
+import json
+import os
+import sys
+
+from . import baseline, config, history, vitals
+
+MARKDOWN_NAME = "testsprite-mcp-test-report.md"
+HTML_NAME = "testsprite-mcp-test-report.html"
+FLAKY_WINDOW = 50
+TREND_WINDOW = 30
+SPARK_CHARS = "▁▂▃▄▅▆▇█"
+OTHER_SECTION = "Other"
+
+
+def _write(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_name(f"{path.name}.{os.getpid()}.partial")
+    partial.write_text(text, encoding="utf-8")
+    partial.replace(path)
+
+
+def _read(path):
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def start(scripts, run_id=None):
+    """Begin a report for ``scripts``: every test pending, earlier rows dropped."""
+    rows_dir = config.REPORT_DIR / "rows"
+    if rows_dir.is_dir():
+        for path in rows_dir.glob("*.json"):
+            path.unlink(missing_ok=True)
+    _write(config.REPORT_DIR / "run.json", json.dumps({
+        "runId": run_id,
+        "started": history.now(),
+        "finished": None,
+        "tests": [{"id": script.id, "title": script.title} for script in scripts],
+    }, indent=2) + "\n")
+    render()
+
+
+def finish():
+    """Mark the run as over and write the final documents."""
+    run = _read(config.REPORT_DIR / "run.json")
+    if run is not None:
+        run["finished"] = history.now()
+        _write(config.REPORT_DIR / "run.json", json.dumps(run, indent=2) + "\n")
+    return render()
+
+
+def row(outcome, metrics, connection=None):
+    """One report row: this run's result plus the test's history."""
+    entry = {
+        "id": outcome["id"],
+        "title": outcome.get("title"),
+        "status": outcome["status"],
+        "durationMs": outcome.get("durationMs"),
+        "error": (outcome.get("error") or "").strip().splitlines()[-1:] or None,
+        "artifacts": outcome.get("artifacts"),
+        **{name: metrics.get(name) for name in ("lcpMs", "cls", "inpMs", "totalBlockingTimeMs", "transferBytes")},
+    }
+    own = connection is None
+    if own:
+        if not config.HISTORY_PATH.exists():
+            return entry
+        connection = history.connect()
+    try:
+        entry["flakiness"] = history.flakiness(connection, outcome["id"], FLAKY_WINDOW)
+        trend = history.duration_trend(connection, outcome["id"], TREND_WINDOW)
+        entry["trend"] = trend and {"slopeMsPerRun": trend["slopeMsPerRun"], "durationsMs": trend["durationsMs"]}
+    finally:
+        if own:
+            connection.close()
+    return entry
+
+
+def store(row):
+    _write(config.REPORT_DIR / "rows" / f"{row['id']}.json", json.dumps(row) + "\n")
+
+
+class ReportWriter:
+    """Runner instrument: adds the finished test's row and re-renders.
+
+    Listed after :class:`harness.history.HistoryRecorder` so the history
+    columns include this result.
+    """
+
+    passive = True
+
+    def __init__(self, with_vitals=True):
+        self.with_vitals = with_vitals
+
+    async def attach(self, context, script=None):
+        pass
+
+    async def finish(self, script, outcome):
+        payload = vitals.load(script.id) if self.with_vitals else None
+        store(row(outcome, dict(baseline.metrics(outcome, payload)) if payload else {}))
+        render()
+
+
+# -- rendering -----------------------------------------------------------------
+
+def sections(test_ids, features_path=None):
+    """[(requirement, test ids)] in feature_tests.json order; unmapped tests last."""
+    try:
+        features = json.loads((features_path or config.FEATURE_TESTS_PATH).read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        features = {}
+    wanted = set(test_ids)
+    grouped = [(name, [test_id for test_id in ids if test_id in wanted]) for name, ids in features.items()]
+    mapped = {test_id for ids in features.values() for test_id in ids}
+    grouped.append((OTHER_SECTION, sorted(wanted - mapped)))
+    return [(name, ids) for name, ids in grouped if ids]
+
+
+def spark(values):
+    if not values:
+        return ""
+    low, high = min(values), max(values)
+    span = (high - low) or 1
+    return "".join(SPARK_CHARS[round((value - low) / span * (len(SPARK_CHARS) - 1))] for value in values)
+
+
+def spark_svg(values, width=120, height=24):
+    if len(values) < 2:
+        return ""
+    low, high = min(values), max(values)
+    span = (high - low) or 1
+    step = width / (len(values) - 1)
+    points = " ".join(
+        f"{index * step:.1f},{height - 2 - (value - low) / span * (height - 4):.1f}" for index, value in enumerate(values)
+    )
+    return (
+        f'<svg class="spark" width="{width}" height="{height}" viewBox="0 0 {width} {height}">'
+        f"<title>{low / 1000:.1f}s to {high / 1000:.1f}s over {len(values)} runs</title>"
+        f'<polyline points="{points}" fill="none" stroke="currentColor" stroke-width="1.5"/></svg>'
+    )
+
+
+def _seconds(ms):
+    return "" if ms is None else f"{ms / 1000:.1f}s"
+
+
+def _ms(ms):
+    return "" if ms is None else f"{ms:.0f} ms"
+
+
+def cells(row):
+    """Column name -> plain text shared by both formats."""
+    flakiness = row.get("flakiness") or {}
+    trend = row.get("trend") or {}
+    return {
+        "Test": row["title"] or row["id"],
+        "Status": row["status"],
+        "Duration": _seconds(row.get("durationMs")),
+        "LCP": _seconds(row.get("lcpMs")),
+        "CLS": "" if row.get("cls") is None else f"{row['cls']:.3f}",
+        "INP": _ms(row.get("inpMs")),
+        "TBT": _ms(row.get("totalBlockingTimeMs")),
+        "Fail rate": "" if not flakiness else f"{flakiness['failRate']:.0%}" + (" flaky" if flakiness["flaky"] else ""),
+        "Recent": flakiness.get("recent", ""),
+        "Trend": "" if not trend else f"{trend['slopeMsPerRun']:+.0f} ms/run",
+    }
+
+
+COLUMNS = ["Test", "Status", "Duration", "LCP", "CLS", "INP", "TBT", "Fail rate", "Recent", "Trend"]
+
+
+def collect():
+    """(run manifest, {test id: row}) as currently stored."""
+    run = _read(config.REPORT_DIR / "run.json") or {"tests": [], "started": None, "finished": None, "runId": None}
+    rows = {}
+    for test in run["tests"]:
+        rows[test["id"]] = _read(config.REPORT_DIR / "rows" / f"{test['id']}.json") or {
+            "id": test["id"], "title": test["title"], "status": "PENDING" if not run["finished"] else "NOT RUN",
+        }
+    return run, rows
+
+
+def summary(run, rows):
+    statuses = [row["status"] for row in rows.values()]
+    done = [row.get("durationMs") or 0 for row in rows.values() if row["status"] in ("PASSED", "FAILED")]
+    return {
+        "total": len(statuses),
+        "passed": statuses.count("PASSED"),
+        "failed": statuses.count("FAILED"),
+        "pending": len(statuses) - statuses.count("PASSED") - statuses.count("FAILED"),
+        "serialS": round(sum(done) / 1000, 1),
+    }
+
+
+def markdown(run, rows):
+    totals = summary(run, rows)
+    lines = [
+        "# TestSprite MCP Test Report",
+        "",
+        "---",
+        "",
+        "## Run",
+        f"- Run: {run['runId'] if run['runId'] is not None else 'not recorded'}",
+        f"- Started: {run['started']}",
+        f"- Finished: {run['finished'] or 'running'}",
+        f"- App URL: {config.BASE_URL}",
+        "",
+        "## Summary",
+        f"- Total cases: {totals['total']}",
+        f"- Passed: {totals['passed']}",
+        f"- Failed: {totals['failed']}",
+    ]
+    if totals["pending"]:
+        lines.append(f"- {'Pending' if not run['finished'] else 'Not run'}: {totals['pending']}")
+    lines += [f"- Serial time: {totals['serialS']}s", "", "---", "", "## Requirements and Results"]
+    for number, (name, test_ids) in enumerate(sections(rows), 1):
+        lines += ["", f"### {number}. {name}", "", "| " + " | ".join(COLUMNS) + " |", "|" + "---|" * len(COLUMNS)]
+        notes = []
+        for test_id in test_ids:
+            row = rows[test_id]
+            values = cells(row)
+            values["Trend"] = f"{spark((row.get('trend') or {}).get('durationsMs', []))} {values['Trend']}".strip()
+            lines.append("| " + " | ".join(values[column].replace("|", "\\|") for column in COLUMNS) + " |")
+            if row.get("error"):
+                notes.append(f"- {test_id}: `{row['error'][0][:200]}`")
+            if row.get("artifacts"):
+                notes.append(f"- {test_id} artifacts: `{row['artifacts']}`")
+        if notes:
+            lines += ["", *notes]
+    return "\n".join(lines) + "\n"
+
+
+HTML_STYLE = """
+body { font: 14px/1.4 system-ui, sans-serif; margin: 2rem; color: #17181a; }
+table { border-collapse: collapse; width: 100%; margin-bottom: .5rem; }
+th, td { text-align: left; padding: .3rem .6rem; border-bottom: 1px solid #e4e4e4; white-space: nowrap; }
+td.test { white-space: normal; }
+.PASSED { color: #10a363; } .FAILED { color: #c23539; } .PENDING, .NOT-RUN { color: #959597; }
+.recent { font-family: monospace; letter-spacing: 1px; }
+.spark { vertical-align: middle; color: #1a7f53; }
+.notes { color: #555; margin: 0 0 1.5rem; } .notes code { white-space: pre-wrap; }
+"""
+
+
+def html_document(run, rows):
+    totals = summary(run, rows)
+    escape = html.escape
+    parts = [
+        "<!DOCTYPE html>",
+        '<html lang="en"><head><meta charset="UTF-8" />',
+        '<meta name="viewport" content="width=device-width, initial-scale=1.0" />',
+        "" if run["finished"] else '<meta http-equiv="refresh" content="5" />',
+        f"<title>TestSprite Test Report</title><style>{HTML_STYLE}</style></head><body>",
+        "<h1>TestSprite Test Report</h1>",
+        f"<p>Run {escape(str(run['runId'] if run['runId'] is not None else 'not recorded'))}, started {escape(str(run['started']))}, "
+        f"{'finished ' + escape(run['finished']) if run['finished'] else 'running'}. App URL {escape(config.BASE_URL)}.</p>",
+        f"<p><b>{totals['passed']}</b> passed, <b>{totals['failed']}</b> failed"
+        + (f", <b>{totals['pending']}</b> {'pending' if not run['finished'] else 'not run'}" if totals["pending"] else "")
+        + f" of {totals['total']} (serial time {totals['serialS']}s).</p>",
+    ]
+    for number, (name, test_ids) in enumerate(sections(rows), 1):
+        parts.append(f"<h2>{number}. {escape(name)}</h2><table><tr>" + "".join(f"<th>{column}</th>" for column in COLUMNS) + "</tr>")
+        notes = []
+        for test_id in test_ids:
+            row = rows[test_id]
+            values = {column: escape(value) for column, value in cells(row).items()}
+            values["Status"] = f'<span class="{row["status"].replace(" ", "-")}">{values["Status"]}</span>'
+            values["Recent"] = f'<span class="recent">{values["Recent"]}</span>'
+            values["Trend"] = f"{spark_svg((row.get('trend') or {}).get('durationsMs', []))} {values['Trend']}"
+            parts.append(
+                "<tr>" + "".join(
+                    f'<td class="test">{values[column]}</td>' if column == "Test" else f"<td>{values[column]}</td>"
+                    for column in COLUMNS
+                ) + "</tr>"
+            )
+            if row.get("error"):
+                notes.append(f"<li>{test_id}: <code>{escape(row['error'][0][:500])}</code></li>")
+            if row.get("artifacts"):
+                notes.append(f"<li>{test_id} artifacts: <code>{escape(row['artifacts'])}</code></li>")
+        parts.append("</table>")
+        if notes:
+            parts.append('<ul class="notes">' + "".join(notes) + "</ul>")
+    parts.append("</body></html>")
+    return "\n".join(part for part in parts if part) + "\n"
+
+
+def render():
+    """Write both documents from the stored rows; returns the Markdown path."""
+    run, rows = collect()
+    _write(config.REPORT_DIR / MARKDOWN_NAME, markdown(run, rows))
+    _write(config.REPORT_DIR / HTML_NAME, html_document(run, rows))
+    return config.REPORT_DIR / MARKDOWN_NAME
+
+
+def from_history(run_id=None):
+    """Rebuild the report for a history run (default: the latest one)."""
+    with contextlib.closing(history.connect()) as connection:
+        if run_id is None:
+            latest = connection.execute("SELECT MAX(run_id) FROM results").fetchone()
+            run_id = latest[0]
+        if run_id is None:
+            raise SystemExit(f"No runs in {config.HISTORY_PATH}")
+        run = connection.execute("SELECT started, finished FROM runs WHERE id = ?", (run_id,)).fetchone()
+        if run is None:
+            raise SystemExit(f"No run {run_id} in {config.HISTORY_PATH}")
+        results = connection.execute(
+            "SELECT test_id, title, status, duration_ms, error, lcp_ms, cls, inp_ms, tbt_ms, transfer_bytes"
+            " FROM results WHERE run_id = ? ORDER BY test_id", (run_id,),
+        ).fetchall()
+        rows = []
+        for test_id, title, status, duration, error, lcp, cls, inp, tbt, transfer in results:
+            outcome = {"id": test_id, "title": title, "status": status, "durationMs": duration, "error": error}
+            metrics = {"lcpMs": lcp, "cls": cls, "inpMs": inp, "totalBlockingTimeMs": tbt, "transferBytes": transfer}
+            rows.append(row(outcome, metrics, connection))
+    _write(config.REPORT_DIR / "run.json", json.dumps({
+        "runId": run_id,
+        "started": run[0],
+        "finished": run[1] or history.now(),
+        "tests": [{"id": entry["id"], "title": entry["title"]} for entry in rows],
+    }, indent=2) + "\n")
+    rows_dir = config.REPORT_DIR / "rows"
+    if rows_dir.is_dir():
+        for path in rows_dir.glob("*.json"):
+            path.unlink(missing_ok=True)
+    for entry in rows:
+        store(entry)
+    return render()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--run", type=int, help="history run id (default: the latest)")
+    args = parser.parse_args(argv)
+    path = from_history(args.run)
+    print(path)
+    print(path.with_name(HTML_NAME))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+"""Read and update tmp/test_results.json.
+
+The file keeps the TestSprite layout (one object per test, keyed by a
+``"TC001-Title"`` string); ``python -m harness.history export`` refreshes
+the status fields from the run history and adds ``durationMs``.
+"""
+import datetime
+import json
+
+from . import config
+
+
+def test_id(title):
+    """``"TC001-Product Listing"`` -> ``"TC001"``."""
+    return title.split("-", 1)[0].strip()
+
+
+def load(path=None):
+    path = path or config.RESULTS_PATH
+    try:
+        with open(path, encoding="utf-8") as fh:
+            return json.load(fh)
+    except FileNotFoundError:
+        return []
+
+
+def durations(path=None):
+    """Map of test id -> duration in ms from the last recorded run."""
+    return {
+        test_id(entry.get("title", "")): entry["durationMs"]
+        for entry in load(path)
+        if entry.get("durationMs") is not None
+    }
+
+
+def record(outcomes, path=None):
+    """Merge runner outcomes into the results file and write it back."""
+    path = path or config.RESULTS_PATH
+    entries = load(path)
+    by_id = {test_id(entry.get("title", "")): entry for entry in entries}
+    now = datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+    for outcome in outcomes:
+        entry = by_id.get(outcome["id"])
+        if entry is None:
+            entry = {"title": outcome["title"], "testType": "FRONTEND", "created": now}
+            entries.append(entry)
+            by_id[outcome["id"]] = entry
+        entry["testStatus"] = outcome["status"]
+        entry["testError"] = outcome["error"]
+        entry["durationMs"] = outcome["durationMs"]
+        entry["modified"] = now
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(entries, fh, indent=2, ensure_ascii=False)
+        fh.write("\n")
+    return entries
@@ -0,0 +1,257 @@
+"""Run the TC scripts concurrently against one shared browser.
+
+Each script's ``run_test`` coroutine is imported and handed its own
+``BrowserContext``; a semaphore caps how many run at once. A full pass takes
+roughly as long as the slowest test instead of the sum of all of them.
+
+    python -m harness.runner                  # every TCxxx script
+    python -m harness.runner TC001 TC004 -j 2
+"""
+import argparse
+import asyncio
+import contextlib
+import functools
+import importlib.util
+import sys
+import time
+import traceback
+from dataclasses import dataclass
+
+from playwright import async_api
+
+from . import artifacts, blocking, config, coverage, har, history, pocketbase_stub, pool as context_pool, razorpay_stub, report, scenarios, session, vitals
+
+
+@dataclass
+class Script:
+    id: str
+    title: str
+    path: object
+    # The module's THIRD_PARTY, set once it is loaded (read by harness.blocking).
+    third_party: object = ()
+
+    def load(self):
+        """Import the script module (``run_test`` and an optional ``ROLE``)."""
+        spec = importlib.util.spec_from_file_location(f"testsprite_{self.id}", self.path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+
+
+def discover(test_ids=None):
+    """TC scripts in the tests directory, optionally filtered by id."""
+    wanted = {test_id.upper() for test_id in test_ids} if test_ids else None
+    scripts = []
+    for path in sorted(config.TESTS_DIR.glob("TC[0-9][0-9][0-9]_*.py")):
+        test_id, _, name = path.stem.partition("_")
+        if wanted is not None and test_id not in wanted:
+            continue
+        scripts.append(Script(test_id, f"{test_id}-{name.replace('_', ' ')}", path))
+    if wanted is not None:
+        missing = wanted - {script.id for script in scripts}
+        if missing:
+            raise SystemExit(f"Unknown test id(s): {', '.join(sorted(missing))}")
+    return scripts
+
+
+async def run_script(browser, script, semaphore, instruments=(), pool=None):
+    """Run one script in a fresh context and return its outcome.
+
+    ``instruments`` are factories for objects with ``async attach(context,
+    script)`` and ``async finish(script, outcome)``; each gets its own instance per
+    test, attached before the script runs and finished before the context
+    closes. With a :class:`harness.pool.ContextPool` the context comes from
+    the pool and goes back to it afterwards, so ``finish`` must undo whatever
+    ``attach`` hooked onto the context. The pool's pre-loaded page is loaded
+    again unless every instrument is ``passive``: it neither routes nor
+    records the page, or its ``prepare`` hook already did so before the pool
+    loaded it (see :func:`pool_hooks`).
+    """
+    async with semaphore:
+        module = script.load()
+        script.third_party = getattr(module, "THIRD_PARTY", ())
+        context = None
+        attached = []
+        outcome = {"id": script.id, "title": script.title, "status": "PASSED", "error": "", "durationMs": None}
+        started = time.perf_counter()
+        try:
+            role = getattr(module, "ROLE", None)
+            context = await (pool.acquire(role) if pool else session.new_context(browser, role))
+            for factory in instruments:
+                instrument = factory()
+                await instrument.attach(context, script)
+                attached.append(instrument)
+            if pool and not all(getattr(instrument, "passive", False) for instrument in attached):
+                session.reload_warm(context)
+            await module.run_test(context)
+        except AssertionError as exc:
+            outcome.update(status="FAILED", error=str(exc) or "AssertionError")
+        except Exception:
+            outcome.update(status="FAILED", error=traceback.format_exc(limit=3))
+        finally:
+            outcome["durationMs"] = round((time.perf_counter() - started) * 1000)
+            for instrument in attached:
+                try:
+                    await instrument.finish(script, outcome)
+                except Exception:
+                    print(f"{script.id}: {type(instrument).__name__} failed:\n{traceback.format_exc(limit=3)}", file=sys.stderr)
+            if context is not None:
+                if pool:
+                    pool.release(context)
+                else:
+                    await context.close()
+    return outcome
+
+
+def pool_hooks(instruments):
+    """``prepare(context)`` of the instruments that can set up a pooled context before its page loads."""
+    hooks = []
+    for factory in instruments:
+        prepare = getattr(factory(), "prepare", None)
+        if prepare is not None:
+            hooks.append(prepare)
+    return hooks
+
+
+async def run_suite(scripts, concurrency=4, headless=None, instruments=(), pool_size=0, traces_dir=None):
+    """Run ``scripts`` in one browser with at most ``concurrency`` contexts.
+
+    With ``pool_size`` contexts are reused from a :class:`harness.pool.ContextPool`
+    of that many contexts per role. ``traces_dir`` is where the browser keeps
+    trace resources (see :func:`harness.artifacts.browser_traces`).
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    async with async_api.async_playwright() as pw:
+        browser = await pw.chromium.launch(
+            headless=config.HEADLESS if headless is None else headless,
+            args=config.BROWSER_ARGS,
+            traces_dir=traces_dir,
+        )
+        pool = None
+        if pool_size:
+            pool = context_pool.ContextPool(browser, pool_size, prepare=pool_hooks(instruments))
+            pool.fill(count=min(pool_size, len(scripts)))
+        try:
+            return await asyncio.gather(
+                *(run_script(browser, script, semaphore, instruments, pool) for script in scripts)
+            )
+        finally:
+            if pool:
+                await pool.close()
+                print(pool.stats.line())
+            await browser.close()
+
+
+def print_summary(outcomes, elapsed):
+    for outcome in outcomes:
+        print(f"{outcome['id']}  {outcome['status']:<6}  {outcome['durationMs'] / 1000:7.1f}s  {outcome['title']}")
+        if outcome.get("artifacts"):
+            print(f"{'':<15}artifacts: {outcome['artifacts']}")
+    passed = sum(outcome["status"] == "PASSED" for outcome in outcomes)
+    serial = sum(outcome["durationMs"] for outcome in outcomes) / 1000
+    print(f"\n{passed}/{len(outcomes)} passed in {elapsed:.1f}s (serial time {serial:.1f}s)")
+    third_party = blocking.summary(outcomes)
+    if third_party:
+        print(third_party)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("tests", nargs="*", help="test ids to run, e.g. TC001 (default: all)")
+    parser.add_argument("-j", "--concurrency", type=int, default=4, help="contexts running at once (default: %(default)s)")
+    parser.add_argument("--headed", action="store_true", help="show the browser window")
+    parser.add_argument("--scenarios", action="store_true", help=f"run the declarative {config.SCENARIOS_PATH.name} scenarios")
+    parser.add_argument("--no-record", action="store_true", help=f"do not append the run to {config.HISTORY_PATH.name}")
+    parser.add_argument(
+        "--pool", type=int, default=0, metavar="K",
+        help="reuse K pre-warmed contexts per role, reset between tests; above -j keeps spares warm (default: fresh context per test)",
+    )
+    parser.add_argument("--no-report", action="store_true", help="do not write the run report (tmp/report/)")
+    parser.add_argument("--no-vitals", action="store_true", help="skip Web Vitals capture (tmp/vitals/)")
+    parser.add_argument(
+        "--failure-artifacts", action="store_true",
+        help="trace every test, keep trace and screenshots of failures in tmp/artifacts/",
+    )
+    parser.add_argument("--coverage", action="store_true", help="collect per-route JS/CSS coverage (tmp/coverage/)")
+    parser.add_argument("--har", choices=["record", "replay"], help="record traffic to tmp/har/ or replay it")
+    parser.add_argument(
+        "--third-party", choices=["block", "full"], default="block",
+        help="block/stub analytics, fonts, Builder.io and maps unless a script opts in, or let all through (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--pocketbase-stub", action="store_true",
+        help=f"serve PocketBase from harness.pocketbase_stub on {config.POCKETBASE_URL}",
+    )
+    parser.add_argument(
+        "--razorpay-stub", action="store_true",
+        help=f"serve Razorpay from harness.razorpay_stub on {config.RAZORPAY_STUB_URL} and route browsers to it",
+    )
+    return parser
+
+
+def instruments(args, run_id=None, traces_dir=None):
+    """Per-test instrument factories selected on the command line.
+
+    With a ``run_id`` each outcome is also appended to that history run.
+    ``traces_dir`` is the browser's, for failure artifacts.
+    """
+    selected = []
+    if not args.no_vitals:
+        selected.append(vitals.VitalsRecorder)
+    if args.coverage:
+        selected.append(coverage.CoverageRecorder)
+    if args.har == "record":
+        selected.append(har.HarRecorder)
+    elif args.har == "replay":
+        selected.append(har.HarReplayer)
+    if args.razorpay_stub:
+        selected.append(razorpay_stub.RazorpayRouter)
+    if args.failure_artifacts:
+        selected.append(functools.partial(artifacts.FailureArtifacts, traces_dir=traces_dir))
+    # Registered last so its route runs before the catch-all HAR routes.
+    selected.append(functools.partial(blocking.ThirdPartyBlocker, blocking.ALL if args.third_party == "full" else None))
+    if run_id is not None:
+        selected.append(functools.partial(history.HistoryRecorder, run_id, with_vitals=not args.no_vitals))
+    if not args.no_report:
+        selected.append(functools.partial(report.ReportWriter, with_vitals=not args.no_vitals))
+    return selected
+
+
+@contextlib.contextmanager
+def services(args):
+    """Start the stand-in services requested on the command line."""
+    with contextlib.ExitStack() as stack:
+        if args.pocketbase_stub:
+            stack.enter_context(pocketbase_stub.start())
+        if args.razorpay_stub:
+            stack.enter_context(razorpay_stub.start())
+        yield
+
+
+def select(args):
+    """Scripts to run: TCxxx files, or declarative scenarios with --scenarios."""
+    return scenarios.discover(args.tests) if args.scenarios else discover(args.tests)
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    scripts = select(args)
+    run_id = None if args.no_record else history.start_run(argv)
+    if not args.no_report:
+        report.start(scripts, run_id)
+    started = time.perf_counter()
+    with services(args), artifacts.browser_traces(args.failure_artifacts) as traces_dir:
+        outcomes = asyncio.run(run_suite(
+            scripts, args.concurrency, headless=False if args.headed else None,
+            instruments=instruments(args, run_id, traces_dir), pool_size=args.pool, traces_dir=traces_dir,
+        ))
+    print_summary(outcomes, time.perf_counter() - started)
+    if not args.no_record:
+        history.finish_run(run_id)
+    if not args.no_report:
+        print(f"report: {report.finish()}")
+    return 0 if all(outcome["status"] == "PASSED" for outcome in outcomes) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,255 @@
+"""Declarative scenarios executed through the shared harness.
+
+testsprite_frontend_test_plan.json describes each test case in prose. This
+engine pairs those entries (title, description, priority) with executable
+steps from scenarios.json (or a ``.yaml`` equivalent when PyYAML is
+installed), so adding a scenario is a few lines of data instead of another
+generated script full of absolute XPaths.
+
+A step is the plan's ``type``/``description`` plus exactly one action key:
+
+    goto                  "/shop"
+    click                 locator
+    click_if_visible      locator               (e.g. a menu toggle only small screens show)
+    fill                  {"target": locator, "value": "..."}
+    press                 {"target": locator, "key": "Enter"}
+    scroll                pixels
+    viewport              {"width": 390, "height": 844}
+    expect_visible        locator
+    expect_hidden         locator
+    expect_url            "/product/"           (substring of the URL)
+    mark_document         true                  (remember this document)
+    expect_same_document  true                  (fail on a full page reload)
+
+A locator is a string (visible text) or an object with one of ``role`` (+
+``name``/``exact``), ``testid``, ``label``, ``placeholder``, ``text`` or
+``css``, plus an optional ``nth``. Scenarios may also set ``role`` (signed-in
+user, see harness.auth), ``start`` (first URL path) and ``third_party``
+(categories harness.blocking lets through, ``["*"]`` for all).
+
+    python -m harness.scenarios                 # list scenarios
+    python -m harness.runner --scenarios TC012  # run through the runner
+"""
+import functools
+import json
+import re
+import sys
+import types
+import uuid
+import weakref
+from dataclasses import dataclass, field
+
+from playwright import async_api
+from playwright.async_api import expect
+
+from . import actions, config, locators, session
+
+EXPECT_TIMEOUT_MS = 10000
+
+_locator_cache = weakref.WeakKeyDictionary()
+
+
+@dataclass
+class Scenario:
+    id: str
+    title: str
+    description: str = ""
+    priority: str = ""
+    role: str = None
+    start: str = "/"
+    third_party: tuple = ()
+    steps: list = field(default_factory=list)
+
+
+def _read(path):
+    with open(path, encoding="utf-8") as fh:
+        if path.suffix in (".yaml", ".yml"):
+            try:
+                import yaml
+            except ImportError:
+                raise RuntimeError(f"PyYAML is required to read {path.name}; pip install pyyaml") from None
+            return yaml.safe_load(fh)
+        return json.load(fh)
+
+
+@functools.lru_cache(maxsize=8)
+def _parse(plan_path, scenarios_path, plan_mtime, scenarios_mtime):
+    plan = {entry["id"]: entry for entry in _read(plan_path)}
+    scenarios = {}
+    for test_id, spec in _read(scenarios_path).items():
+        entry = plan.get(test_id, {})
+        scenarios[test_id] = Scenario(
+            id=test_id,
+            title=spec.get("title") or entry.get("title", test_id),
+            description=spec.get("description") or entry.get("description", ""),
+            priority=entry.get("priority", ""),
+            role=spec.get("role"),
+            start=spec.get("start", "/"),
+            third_party=tuple(spec.get("third_party", ())),
+            steps=spec["steps"],
+        )
+    return scenarios
+
+
+def load(scenarios_path=None, plan_path=None):
+    """Scenarios by id. Parsed once per file version and reused across runs."""
+    scenarios_path = scenarios_path or config.SCENARIOS_PATH
+    plan_path = plan_path or config.TEST_PLAN_PATH
+    return _parse(plan_path, scenarios_path, plan_path.stat().st_mtime, scenarios_path.stat().st_mtime)
+
+
+# -- locators ------------------------------------------------------------------
+
+def locate(page, spec):
+    """Build (and memoise per page) the Playwright locator for ``spec``."""
+    key = json.dumps(spec, sort_keys=True, ensure_ascii=False)
+    cache = _locator_cache.setdefault(page, {})
+    locator = cache.get(key)
+    if locator is None:
+        locator = cache[key] = locators.build(page, spec)
+    return locator
+
+
+# -- steps ---------------------------------------------------------------------
+
+STEPS = {}
+
+
+def step(name):
+    def register(func):
+        STEPS[name] = func
+        return func
+    return register
+
+
+@step("goto")
+async def _goto(run, path):
+    await actions.goto(run.page, config.url(path))
+
+
+@step("click")
+async def _click(run, spec):
+    await actions.click(locate(run.page, spec))
+
+
+@step("click_if_visible")
+async def _click_if_visible(run, spec):
+    locator = locate(run.page, spec)
+    if await locator.is_visible():
+        await actions.click(locator)
+
+
+@step("fill")
+async def _fill(run, arg):
+    await actions.fill(locate(run.page, arg["target"]), arg["value"])
+
+
+@step("press")
+async def _press(run, arg):
+    await locate(run.page, arg["target"]).press(arg["key"])
+    await actions.settle(run.page)
+
+
+@step("scroll")
+async def _scroll(run, pixels):
+    await run.page.mouse.wheel(0, pixels)
+
+
+@step("viewport")
+async def _viewport(run, size):
+    await run.page.set_viewport_size(size)
+
+
+@step("expect_visible")
+async def _expect_visible(run, spec):
+    await expect(locate(run.page, spec)).to_be_visible(timeout=EXPECT_TIMEOUT_MS)
+
+
+@step("expect_hidden")
+async def _expect_hidden(run, spec):
+    await expect(locate(run.page, spec)).to_be_hidden(timeout=EXPECT_TIMEOUT_MS)
+
+
+@step("expect_url")
+async def _expect_url(run, fragment):
+    await expect(run.page).to_have_url(re.compile(re.escape(fragment)), timeout=EXPECT_TIMEOUT_MS)
+
+
+@step("mark_document")
+async def _mark_document(run, _):
+    run.mark = uuid.uuid4().hex
+    await run.page.evaluate("mark => { window.__testspriteDocumentMark = mark; }", run.mark)
+
+
+@step("expect_same_document")
+async def _expect_same_document(run, _):
+    mark = await run.page.evaluate("() => window.__testspriteDocumentMark || null")
+    if run.mark is None or mark != run.mark:
+        raise AssertionError("Full page reload detected: the document marked earlier is gone")
+
+
+def _action(spec):
+    found = [key for key in spec if key in STEPS]
+    if len(found) != 1:
+        raise ValueError(f"Step needs exactly one of {', '.join(sorted(STEPS))}: {spec!r}")
+    return found[0]
+
+
+class Run:
+    """State of one scenario execution."""
+
+    def __init__(self, page):
+        self.page = page
+        self.mark = None
+
+
+async def run(scenario, context=None):
+    """Execute ``scenario`` in ``context`` (or a private browser)."""
+    async with session.test_context(context, role=scenario.role) as context:
+        page = await session.new_page(context)
+        await session.open_home(page, config.url(scenario.start))
+        state = Run(page)
+        for number, spec in enumerate(scenario.steps, 1):
+            name = _action(spec)
+            try:
+                await STEPS[name](state, spec[name])
+            except AssertionError as exc:
+                raise AssertionError(f"{scenario.id} step {number} ({spec.get('description', name)}): {exc}") from None
+            except async_api.Error as exc:
+                raise AssertionError(f"{scenario.id} step {number} ({spec.get('description', name)}) failed: {exc.message}") from None
+
+
+@dataclass
+class ScenarioScript:
+    """Runner-compatible stand-in for a TCxxx script module."""
+
+    id: str
+    title: str
+    path: object
+    third_party: tuple = ()
+
+    def load(self):
+        scenario = load(self.path)[self.id]
+        return types.SimpleNamespace(
+            ROLE=scenario.role, THIRD_PARTY=scenario.third_party, run_test=functools.partial(run, scenario),
+        )
+
+
+def discover(test_ids=None, scenarios_path=None):
+    scenarios_path = scenarios_path or config.SCENARIOS_PATH
+    scenarios = load(scenarios_path)
+    wanted = [test_id.upper() for test_id in test_ids] if test_ids else sorted(scenarios)
+    missing = [test_id for test_id in wanted if test_id not in scenarios]
+    if missing:
+        raise SystemExit(f"No scenario for {', '.join(missing)} in {scenarios_path.name}")
+    return [ScenarioScript(test_id, f"{test_id}-{scenarios[test_id].title}", scenarios_path) for test_id in wanted]
+
+
+def main(argv=None):
+    for scenario in load().values():
+        print(f"{scenario.id}  {len(scenario.steps):>3} steps  {scenario.priority:<6}  {scenario.title}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
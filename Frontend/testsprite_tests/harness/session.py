@@ -0,0 +1,100 @@
+"""Browser/context plumbing used by every TC script."""
+import contextlib
+import weakref
+
+from playwright import async_api
+
+from . import actions, auth, config
+
+# Pages a context pool already loaded, and the URL they show (harness.pool).
+_warm_pages = weakref.WeakKeyDictionary()
+
+
+async def new_context(browser, role=None, **options):
+    """Create a context with the suite's default action timeout.
+
+    With ``role`` the context starts signed in as that user (see harness.auth).
+    """
+    if role is not None:
+        options["storage_state"] = str(await auth.storage_state(role))
+    context = await browser.new_context(**options)
+    context.set_default_timeout(config.DEFAULT_TIMEOUT_MS)
+    return context
+
+
+@contextlib.asynccontextmanager
+async def test_context(context=None, role=None):
+    """Yield the browser context a TC script should run in.
+
+    The runner passes in a context it owns and closes itself (already signed
+    in if the script declares a ``ROLE``). A script run on its own gets a
+    private browser, launched the way the generated code did.
+    """
+    if context is not None:
+        yield context
+        return
+
+    async with async_api.async_playwright() as pw:
+        browser = await pw.chromium.launch(
+            headless=config.HEADLESS,
+            args=config.STANDALONE_BROWSER_ARGS,
+        )
+        try:
+            context = await new_context(browser, role)
+            try:
+                yield context
+            finally:
+                await context.close()
+        finally:
+            await browser.close()
+
+
+def mark_warm(page, url):
+    """Record that ``page`` already shows ``url`` and is unused."""
+    _warm_pages[page] = url
+
+
+def reload_warm(context):
+    """Keep handing out the context's pre-loaded page, but load it again.
+
+    For instruments attached after the pool loaded the page: their routes,
+    init scripts and recorders must see the test's first page load.
+    """
+    for page in context.pages:
+        if page in _warm_pages:
+            _warm_pages[page] = None
+
+
+async def new_page(context):
+    """The context's pre-loaded page if a pool warmed one, else a new page."""
+    for page in context.pages:
+        if page in _warm_pages:
+            return page
+    return await context.new_page()
+
+
+async def open_home(page, url=None):
+    """Navigate to the storefront and wait for the document, its iframes and data.
+
+    A page warmed by the pool on the same URL is not loaded again.
+    """
+    actions.track(page)
+    if _warm_pages.pop(page, None) == (url or config.BASE_URL):
+        await actions.settle(page)
+        return
+    await page.goto(url or config.BASE_URL, wait_until="commit", timeout=config.NAVIGATION_TIMEOUT_MS)
+
+    # Wait for the main page to reach DOMContentLoaded state (optional for stability)
+    try:
+        await page.wait_for_load_state("domcontentloaded", timeout=config.LOAD_STATE_TIMEOUT_MS)
+    except async_api.Error:
+        pass
+
+    # Iterate through all iframes and wait for them to load as well
+    for frame in page.frames:
+        try:
+            await frame.wait_for_load_state("domcontentloaded", timeout=config.LOAD_STATE_TIMEOUT_MS)
+        except async_api.Error:
+            pass
+
+    await actions.settle(page)
@@ -0,0 +1,103 @@
+"""Split the suite across worker processes, one browser per worker.
+
+A single event loop driving many contexts is still one Python process and one
+Chromium. This module partitions the TC scripts into N shards, balanced by the
+median ``durationMs`` of each test's recent passes (tmp/history.sqlite, or
+tmp/test_results.json before there is any history), and runs every shard
+in its own process with :func:`harness.runner.run_suite`.
+The outcomes are merged back into one report.
+
+    python -m harness.shard -n 8          # 8 processes, default concurrency each
+    python -m harness.shard -n 16 -j 1    # one context per process
+"""
+import asyncio
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from . import artifacts, history, report, results, runner
+
+# Used for tests that have no recorded duration and nothing to estimate from.
+DEFAULT_DURATION_MS = 30000
+
+
+def plan(scripts, shards, durations=None):
+    """Partition ``scripts`` into at most ``shards`` lists of similar total duration.
+
+    Longest-processing-time-first: each test, slowest first, goes to the shard
+    with the smallest total so far. Tests without a recorded duration are
+    assumed to take the median of the known ones.
+    """
+    durations = durations or {}
+    known = [durations[script.id] for script in scripts if script.id in durations]
+    fallback = statistics.median(known) if known else DEFAULT_DURATION_MS
+
+    shards = max(1, min(shards, len(scripts)))
+    buckets = [[] for _ in range(shards)]
+    totals = [0] * shards
+    for script in sorted(scripts, key=lambda s: durations.get(s.id, fallback), reverse=True):
+        index = totals.index(min(totals))
+        buckets[index].append(script)
+        totals[index] += durations.get(script.id, fallback)
+    return [bucket for bucket in buckets if bucket]
+
+
+def _run_shard(scripts, concurrency, headless, instruments, pool_size, traces_dir):
+    return asyncio.run(runner.run_suite(
+        scripts, concurrency, headless=headless, instruments=instruments, pool_size=pool_size, traces_dir=traces_dir,
+    ))
+
+
+def run_sharded(scripts, shards, concurrency=2, headless=None, durations=None, instruments=(), pool_size=0, traces_dir=None):
+    """Run each shard in its own process and return the merged outcomes.
+
+    ``instruments`` must be picklable (classes or partials) to reach the workers.
+    """
+    if durations is None:
+        durations = history.durations() or results.durations()
+    buckets = plan(scripts, shards, durations)
+    if not buckets:
+        return []
+    # "spawn" so no worker inherits a half-initialised Playwright driver.
+    with ProcessPoolExecutor(max_workers=len(buckets), mp_context=get_context("spawn")) as pool:
+        futures = [pool.submit(_run_shard, bucket, concurrency, headless, instruments, pool_size, traces_dir) for bucket in buckets]
+        outcomes = [outcome for future in futures for outcome in future.result()]
+    return sorted(outcomes, key=lambda outcome: outcome["id"])
+
+
+def build_parser():
+    parser = runner.build_parser()
+    parser.description = __doc__
+    parser.add_argument(
+        "-n", "--shards", type=int, default=os.cpu_count() or 1,
+        help="worker processes, each with its own browser (default: CPU count)",
+    )
+    parser.set_defaults(concurrency=2)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    scripts = runner.select(args)
+    run_id = None if args.no_record else history.start_run(argv)
+    if not args.no_report:
+        report.start(scripts, run_id)
+    started = time.perf_counter()
+    with runner.services(args), artifacts.browser_traces(args.failure_artifacts) as traces_dir:
+        outcomes = run_sharded(
+            scripts, args.shards, args.concurrency, headless=False if args.headed else None,
+            instruments=runner.instruments(args, run_id, traces_dir), pool_size=args.pool, traces_dir=traces_dir,
+        )
+    runner.print_summary(outcomes, time.perf_counter() - started)
+    if not args.no_record:
+        history.finish_run(run_id)
+    if not args.no_report:
+        print(f"report: {report.finish()}")
+    return 0 if all(outcome["status"] == "PASSED" for outcome in outcomes) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
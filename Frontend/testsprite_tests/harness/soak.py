@@ -0,0 +1,278 @@
+"""Memory-leak soak: loop an SPA navigation flow in one page and watch it grow.
+
+Shoppers keep the storefront open for long sessions (browse, product page,
+cart, back), and every route change runs the analytics.ts listeners and
+fills react-query caches. TC012 checks that these navigations work once;
+this repeats the same kind of flow thousands of times in a single document
+and samples, every ``--sample-every`` iterations, after a forced garbage
+collection:
+
+- JS heap in use (``Runtime.getHeapUsage``);
+- DOM nodes, documents and JS event listeners (``Memory.getDOMCounters``).
+
+Navigation stays inside the SPA: a step clicks the page's own link to the
+path when there is one (so React Router and the click listeners run), and
+otherwise pushes the path onto the history and fires ``popstate``.
+``product`` stands for the first product linked from /shop and ``back`` for
+``history.back()``.
+
+After the ``--warmup`` iterations the least-squares slope per iteration is
+fitted to each series. Whenever the heap has grown another ``--snapshot-mb``
+past the post-warm-up level, a heap snapshot is written (up to
+``--snapshots``); load two of them in DevTools' Memory panel and use the
+Comparison view to see what accumulates. The run fails when a slope is over
+its limit.
+
+    python -m harness.soak                                  # 1000 iterations, default flow
+    python -m harness.soak -n 3000 --minutes 10 --flow /shop,product,/cart,back,back
+
+Samples, slopes and snapshot paths go to tmp/soak/<timestamp>.json.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from datetime import datetime
+
+from playwright import async_api
+
+from . import actions, blocking, config, session
+
+DEFAULT_FLOW = "/shop,product,/cart,back,back,/about,/"
+
+NAVIGATE_SCRIPT = """
+(path) => {
+  if (path === 'back') {
+    history.back();
+    return 'back';
+  }
+  const link = document.querySelector(`a[href="${CSS.escape(path)}"]`);
+  if (link) {
+    link.click();
+    return 'click';
+  }
+  history.pushState({}, '', path);
+  dispatchEvent(new PopStateEvent('popstate', { state: {} }));
+  return 'push';
+}
+"""
+
+SERIES = ("heapBytes", "nodes", "listeners")
+
+
+def slope(points):
+    """Least-squares slope of ``[(x, y)]``, or None with fewer than 3 points."""
+    if len(points) < 3:
+        return None
+    xs, ys = zip(*points)
+    if len(set(xs)) < 2:
+        return None
+    return statistics.linear_regression(xs, ys).slope
+
+
+class Soak:
+    """One soak session on a single page."""
+
+    def __init__(self, page, cdp, flow, settle_ms):
+        self.page = page
+        self.cdp = cdp
+        self.flow = flow
+        self.settle_ms = settle_ms
+        self.product = None
+        self.samples = []
+        self.snapshots = []
+        self.errors = []
+        self.aborted = None
+
+    async def start(self):
+        await self.cdp.send("HeapProfiler.enable")
+        await session.open_home(self.page)
+        if "product" in self.flow:
+            await self.navigate("/shop")
+            link = self.page.locator('a[href^="/product/"]').first
+            await link.wait_for(state="attached", timeout=config.NAVIGATION_TIMEOUT_MS)
+            self.product = await link.get_attribute("href")
+
+    async def navigate(self, path):
+        await self.page.evaluate(NAVIGATE_SCRIPT, self.product if path == "product" else path)
+        await actions.settle(self.page, timeout_ms=self.settle_ms)
+
+    async def iterate(self):
+        for path in self.flow:
+            await self.navigate(path)
+
+    async def sample(self, iteration, elapsed):
+        await self.cdp.send("HeapProfiler.collectGarbage")
+        heap = await self.cdp.send("Runtime.getHeapUsage")
+        counters = await self.cdp.send("Memory.getDOMCounters")
+        entry = {
+            "iteration": iteration,
+            "elapsedS": round(elapsed, 1),
+            "heapBytes": heap["usedSize"],
+            "heapTotalBytes": heap["totalSize"],
+            "nodes": counters["nodes"],
+            "documents": counters["documents"],
+            "listeners": counters["jsEventListeners"],
+        }
+        self.samples.append(entry)
+        return entry
+
+    async def snapshot(self, path):
+        """Stream a heap snapshot to ``path``."""
+        with open(path, "w", encoding="utf-8") as fh:
+            def write(event):
+                fh.write(event["chunk"])
+            self.cdp.on("HeapProfiler.addHeapSnapshotChunk", write)
+            try:
+                await self.cdp.send("HeapProfiler.takeHeapSnapshot", {"reportProgress": False})
+            finally:
+                self.cdp.remove_listener("HeapProfiler.addHeapSnapshotChunk", write)
+        self.snapshots.append(str(path))
+
+
+def fit(samples, warmup):
+    """Slope per iteration of each series over the post-warm-up samples."""
+    steady = [entry for entry in samples if entry["iteration"] >= warmup]
+    return {name: slope([(entry["iteration"], entry[name]) for entry in steady]) for name in SERIES}
+
+
+async def soak(flow, iterations=1000, minutes=15, sample_every=25, warmup=50, snapshot_mb=16, snapshots=3,
+               settle_ms=1000, third_party=blocking.ALL, headless=None, stamp=None):
+    """Run the soak; returns ``(Soak, slopes)``."""
+    stamp = stamp or f"{datetime.now():%Y%m%d-%H%M%S}"
+    config.SOAK_DIR.mkdir(parents=True, exist_ok=True)
+    async with async_api.async_playwright() as pw:
+        browser = await pw.chromium.launch(
+            headless=config.HEADLESS if headless is None else headless, args=config.BROWSER_ARGS,
+        )
+        try:
+            context = await session.new_context(browser)
+            blocker = blocking.ThirdPartyBlocker(third_party)
+            await blocker.attach(context)
+            page = await context.new_page()
+            run = Soak(page, await context.new_cdp_session(page), flow, settle_ms)
+            await run.start()
+            started = time.perf_counter()
+            deadline = started + minutes * 60
+            baseline_heap = None
+            failures = 0
+            iteration = 0
+            while iteration < iterations and time.perf_counter() < deadline:
+                try:
+                    await run.iterate()
+                    failures = 0
+                except async_api.Error as exc:
+                    failures += 1
+                    run.errors.append({"iteration": iteration, "error": exc.message.splitlines()[0]})
+                    if failures >= 10:
+                        run.aborted = f"10 iterations in a row failed at {iteration}, last: {exc.message}"
+                        break
+                iteration += 1
+                if iteration % sample_every and iteration < iterations:
+                    continue
+                elapsed = time.perf_counter() - started
+                entry = await run.sample(iteration, elapsed)
+                print(
+                    f"iter {iteration:>6}  heap {entry['heapBytes'] / 2**20:7.1f} MB  nodes {entry['nodes']:>7}"
+                    f"  listeners {entry['listeners']:>6}  {iteration / elapsed:5.1f} it/s"
+                )
+                if iteration < warmup:
+                    continue
+                if baseline_heap is None:
+                    baseline_heap = entry["heapBytes"]
+                steps = (entry["heapBytes"] - baseline_heap) // (snapshot_mb * 2**20)
+                if steps > len(run.snapshots) and len(run.snapshots) < snapshots:
+                    path = config.SOAK_DIR / f"{stamp}-iter{iteration}.heapsnapshot"
+                    await run.snapshot(path)
+                    print(f"heap grew {(entry['heapBytes'] - baseline_heap) / 2**20:.1f} MB since warm-up: wrote {path}")
+            await blocker.finish(None, {})
+            await context.close()
+        finally:
+            await browser.close()
+    return run, fit(run.samples, warmup)
+
+
+def verdict(slopes, limits):
+    """Series whose slope per iteration is over its limit."""
+    return [name for name in SERIES if slopes[name] is not None and slopes[name] > limits[name]]
+
+
+def save(run, slopes, limits, leaking, stamp, flow):
+    path = config.SOAK_DIR / f"{stamp}.json"
+    payload = {
+        "baseUrl": config.BASE_URL,
+        "flow": flow,
+        "product": run.product,
+        "slopesPerIteration": slopes,
+        "limitsPerIteration": limits,
+        "leaking": leaking,
+        "aborted": run.aborted,
+        "snapshots": run.snapshots,
+        "errors": run.errors,
+        "samples": run.samples,
+    }
+    path.write_text(json.dumps(payload, indent=2) + "\n", encoding="utf-8")
+    return path
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-n", "--iterations", type=int, default=1000, help="flow repetitions (default: %(default)s)")
+    parser.add_argument("--minutes", type=float, default=15, help="stop after this long regardless (default: %(default)s)")
+    parser.add_argument("--flow", default=DEFAULT_FLOW,
+                        help="comma-separated paths, 'product' and 'back' for one iteration (default: %(default)s)")
+    parser.add_argument("--sample-every", type=int, default=25, help="iterations between samples (default: %(default)s)")
+    parser.add_argument("--warmup", type=int, default=50, help="iterations before fitting and snapshots (default: %(default)s)")
+    parser.add_argument("--snapshot-mb", type=float, default=16,
+                        help="write a heap snapshot each time the heap grows this much more (default: %(default)s)")
+    parser.add_argument("--snapshots", type=int, default=3, help="at most this many heap snapshots (default: %(default)s)")
+    parser.add_argument("--max-kb-per-iteration", type=float, default=8,
+                        help="heap growth per iteration that counts as a leak (default: %(default)s)")
+    parser.add_argument("--max-nodes-per-iteration", type=float, default=1,
+                        help="DOM node growth per iteration that counts as a leak (default: %(default)s)")
+    parser.add_argument("--max-listeners-per-iteration", type=float, default=0.5,
+                        help="event listener growth per iteration that counts as a leak (default: %(default)s)")
+    parser.add_argument("--settle-ms", type=int, default=1000,
+                        help="longest wait for the network to go quiet after a step (default: %(default)s)")
+    parser.add_argument(
+        "--third-party", choices=["block", "full"], default="full",
+        help="let analytics and other third-party scripts run, or block them as harness.runner does (default: %(default)s)",
+    )
+    parser.add_argument("--headed", action="store_true", help="show the browser window")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    flow = [step.strip() for step in args.flow.split(",") if step.strip()]
+    limits = {
+        "heapBytes": args.max_kb_per_iteration * 1024,
+        "nodes": args.max_nodes_per_iteration,
+        "listeners": args.max_listeners_per_iteration,
+    }
+    stamp = f"{datetime.now():%Y%m%d-%H%M%S}"
+    run, slopes = asyncio.run(soak(
+        flow, args.iterations, args.minutes, max(1, args.sample_every), args.warmup, args.snapshot_mb, args.snapshots,
+        args.settle_ms, blocking.ALL if args.third_party == "full" else None,
+        headless=False if args.headed else None, stamp=stamp,
+    ))
+    leaking = verdict(slopes, limits)
+    print()
+    for name in SERIES:
+        value = slopes[name]
+        shown = "n/a (too few samples)" if value is None else f"{value:+.2f}/iteration"
+        if value is not None and name == "heapBytes":
+            shown = f"{value / 1024:+.2f} KB/iteration ({value * 1000 / 2**20:+.1f} MB per 1000)"
+        print(f"{name:<10} {shown}{'  LEAK' if name in leaking else ''}")
+    if run.errors:
+        print(f"{len(run.errors)} iteration(s) had a failing step, first: {run.errors[0]['error']}")
+    if run.aborted:
+        print(f"aborted: {run.aborted}")
+    print(f"\nwrote {save(run, slopes, limits, leaking, stamp, flow)}")
+    return 1 if leaking or run.aborted else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,4 @@
+"""Unit tests for the harness modules that run without a browser.
+
+    python -m pytest harness/tests -q
+"""
@@ -0,0 +1,63 @@
+from harness import affected
+
+ALL_TESTS = ["TC001", "TC003", "TC004", "TC012"]
+FEATURES = [
+    ("Checkout and Payments", ["src/pages/Checkout.tsx"], ["TC004"]),
+    ("Product Listing and Detail", ["src/pages/Shop.tsx", "src/components/ProductCard.tsx"], ["TC001", "TC003"]),
+    ("Routing", ["src/routes.tsx"], ["TC012"]),
+]
+GRAPH = {
+    "src/main.tsx": {"src/App.tsx", "src/utils/performance.ts"},
+    "src/App.tsx": {"src/routes.tsx", "src/components/theme-provider.tsx"},
+    "src/routes.tsx": {"src/pages/Checkout.tsx", "src/pages/Shop.tsx", "src/components/Footer.tsx"},
+    "src/pages/Checkout.tsx": {"src/lib/format.ts"},
+    "src/pages/Shop.tsx": {"src/components/ProductCard.tsx"},
+    "src/components/ProductCard.tsx": {"src/lib/format.ts"},
+    "src/components/theme-provider.tsx": set(),
+    "src/components/Footer.tsx": set(),
+    "src/utils/performance.ts": set(),
+    "src/lib/format.ts": set(),
+    "src/lib/unused.ts": set(),
+}
+
+
+def select(*changed):
+    return affected.select(list(changed), FEATURES, GRAPH, ALL_TESTS)
+
+
+def test_feature_file_selects_its_tests_and_its_importers():
+    # routes.tsx (Routing) lazily imports the page.
+    assert list(select("src/pages/Checkout.tsx")) == ["TC004", "TC012"]
+
+
+def test_shared_import_selects_every_feature_reaching_it():
+    assert list(select("src/lib/format.ts")) == ["TC001", "TC003", "TC004", "TC012"]
+
+
+def test_feature_files_do_not_pull_in_the_shell():
+    # Shop.tsx is imported by routes.tsx, but it is a feature file: no global run.
+    assert list(select("src/components/ProductCard.tsx")) == ["TC001", "TC003", "TC012"]
+
+
+def test_file_reaching_the_shell_selects_everything():
+    for path in ("src/components/theme-provider.tsx", "src/utils/performance.ts", "src/components/Footer.tsx"):
+        selection = select(path)
+        assert list(selection) == ALL_TESTS, path
+        assert all("(global)" in reasons[0] for reasons in selection.values())
+
+
+def test_unmapped_source_falls_back_to_the_full_suite():
+    assert list(select("src/lib/unused.ts")) == ALL_TESTS
+    assert list(select("src/styles/new.css")) == ALL_TESTS
+
+
+def test_global_scripts_and_outside_paths():
+    assert list(select("package.json")) == ALL_TESTS
+    assert list(select("testsprite_tests/TC012_SPA_Navigation.py")) == ["TC012"]
+    assert select("README.md") == {}
+
+
+def test_dependents_stops_at_given_files():
+    assert affected.dependents(GRAPH, ["src/lib/format.ts"], stop={"src/pages/Checkout.tsx"}) >= {"src/pages/Checkout.tsx"}
+    assert "src/routes.tsx" not in affected.dependents(GRAPH, ["src/pages/Checkout.tsx"], stop={"src/pages/Checkout.tsx"})
+    assert "src/main.tsx" in affected.dependents(GRAPH, ["src/pages/Checkout.tsx"])
@@ -0,0 +1,71 @@
+import asyncio
+import os
+import types
+
+import pytest
+
+pytest.importorskip("playwright")
+
+from harness import artifacts, config
+
+
+@pytest.fixture
+def bundles(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "ARTIFACTS_DIR", tmp_path)
+
+    def make(name, size, age):
+        path = tmp_path / f"{name}.zip"
+        path.write_bytes(b"x" * size)
+        os.utime(path, (1_000_000 - age, 1_000_000 - age))
+        return path
+    return make
+
+
+def test_prune_evicts_least_recently_used(bundles):
+    old, middle, new = bundles("TC001-a", 400, 30), bundles("TC002-b", 400, 20), bundles("TC003-c", 400, 10)
+    assert artifacts.prune(900) == [old]
+    assert middle.exists() and new.exists()
+
+
+def test_prune_keeps_the_bundle_just_written(bundles):
+    old = bundles("TC001-a", 100, 20)
+    current = bundles("TC004-b", 1000, 30)     # older mtime, and alone over the cap
+    assert artifacts.prune(500, keep=[current]) == [old]
+    assert current.exists()
+
+
+class FakeTracing:
+    def __init__(self, traces_dir):
+        self.traces_dir = traces_dir
+        self.name = None
+
+    async def start(self, name=None, **options):
+        self.name = name
+        (self.traces_dir / f"{name}.trace").write_text("events")
+        (self.traces_dir / f"{name}.network").write_text("requests")
+
+    async def start_chunk(self):
+        pass
+
+    async def stop_chunk(self, path=None):
+        pass
+
+    async def stop(self):
+        pass
+
+
+def test_passing_test_leaves_nothing_in_the_browser_traces_dir():
+    with artifacts.browser_traces() as traces_dir:
+        other = traces_dir / "testsprite-trace-other.trace"    # another context's, still running
+        other.write_text("events")
+        context = types.SimpleNamespace(
+            tracing=FakeTracing(traces_dir), pages=[], on=lambda *args: None, remove_listener=lambda *args: None,
+        )
+        recorder = artifacts.FailureArtifacts(traces_dir=traces_dir)
+        outcome = {"status": "PASSED"}
+        asyncio.run(recorder.attach(context, types.SimpleNamespace(title="TC001-test")))
+        assert len(list(traces_dir.iterdir())) == 3
+        asyncio.run(recorder.finish(types.SimpleNamespace(id="TC001"), outcome))
+        assert list(traces_dir.iterdir()) == [other]
+        assert not recorder.scratch.exists()
+    assert not traces_dir.exists()
@@ -0,0 +1,31 @@
+import asyncio
+import json
+
+from harness import auth, config
+
+
+def test_storage_state_works_across_event_loops(tmp_path, monkeypatch):
+    logins = []
+
+    async def login(role):
+        logins.append(role)
+        await asyncio.sleep(0)      # let the other callers queue on the lock
+        return "header.e30.signature", {"id": "u1"}
+
+    monkeypatch.setattr(config, "AUTH_STATE_DIR", tmp_path)
+    monkeypatch.setattr(auth, "login", login)
+
+    async def concurrent():
+        paths = await asyncio.gather(*(auth.storage_state("customer", refresh=True) for _ in range(3)))
+        assert len(set(paths)) == 1
+        return paths[0]
+
+    for _ in range(2):
+        path = asyncio.run(concurrent())
+    assert logins == ["customer"] * 6
+    assert json.loads(path.read_text())["origins"][0]["localStorage"][0]["name"] == auth.STORAGE_KEY
+
+
+def test_token_expiry():
+    assert auth.token_expiry("header.eyJleHAiOjEyMzR9.signature") == 1234
+    assert auth.token_expiry("not-a-jwt") is None
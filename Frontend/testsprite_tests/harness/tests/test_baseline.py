@@ -0,0 +1,36 @@
+import pytest
+
+pytest.importorskip("playwright")
+
+from harness import baseline
+
+
+def outcome(status, duration_ms):
+    return {"id": "TC001", "status": status, "durationMs": duration_ms}
+
+
+def test_collect_samples_only_passing_runs(monkeypatch):
+    runs = iter([[outcome("PASSED", 1000)], [outcome("FAILED", 10)], [outcome("PASSED", 1200)]])
+
+    async def run_suite(scripts, concurrency, headless=None, instruments=()):
+        return next(runs)
+
+    monkeypatch.setattr(baseline.runner, "run_suite", run_suite)
+    monkeypatch.setattr(baseline.vitals, "load", lambda test_id: None)
+    script = baseline.runner.Script("TC001", "TC001-Listing", None)
+    assert baseline.collect([script], 3) == {"TC001": {"durationMs": [1000, 1200]}}
+
+
+def test_compare_without_baseline_fails(monkeypatch, tmp_path):
+    path = tmp_path / "perf_baseline.json"
+    monkeypatch.setattr(baseline, "collect", lambda *args, **kwargs: {"TC001": {"durationMs": [1000, 1100, 1050]}})
+    monkeypatch.setattr(baseline.runner, "discover", lambda tests: [])
+    assert baseline.main(["compare", "--baseline", str(path)]) == 1
+    assert baseline.main(["record", "--baseline", str(path)]) == 0
+    assert baseline.main(["compare", "--baseline", str(path)]) == 0
+
+
+def test_never_passing_test_fails(monkeypatch, tmp_path):
+    monkeypatch.setattr(baseline, "collect", lambda *args, **kwargs: {"TC001": {}})
+    monkeypatch.setattr(baseline.runner, "discover", lambda tests: [])
+    assert baseline.main(["record", "--baseline", str(tmp_path / "b.json")]) == 1
@@ -0,0 +1,45 @@
+import types
+
+import pytest
+
+pytest.importorskip("playwright")
+
+from harness import blocking
+
+
+def test_compile_profile_blocks_all_but_allowed():
+    pattern, domains = blocking.compile_profile(frozenset({"fonts"}))
+    assert pattern.match("https://www.googletagmanager.com/gtag/js?id=G-1")
+    assert pattern.match("https://cdn.builder.io/api/v3/content/page")
+    assert pattern.match("https://tile.openstreetmap.org:443/1/2/3.png")
+    assert not pattern.match("https://rsms.me/inter/inter.css")
+    assert "rsms.me" not in domains and domains["clarity.ms"] == "analytics"
+
+
+def test_compile_profile_matches_hosts_not_substrings():
+    pattern, _ = blocking.compile_profile(frozenset())
+    assert not pattern.match("https://notfacebook.com/x")
+    assert not pattern.match("http://localhost:5173/?ref=facebook.com")
+    assert not pattern.match("https://facebook.company.example/")
+    assert pattern.match("https://graph.facebook.com/v18.0/events")
+
+
+def test_compile_profile_all_and_everything_allowed():
+    assert blocking.compile_profile(frozenset({blocking.ALL})) == (None, {})
+    assert blocking.compile_profile(frozenset(blocking.CATEGORIES)) == (None, {})
+
+
+def test_category_walks_up_the_host():
+    assert blocking.category("https://us.i.posthog.com/e/") == "analytics"
+    assert blocking.category("https://maps.gstatic.com/tile") == "maps"
+    assert blocking.category("http://localhost:5173/") is None
+
+
+def test_stub_by_resource_type():
+    def request(resource_type):
+        return types.SimpleNamespace(resource_type=resource_type)
+
+    assert blocking._stub(request("font"), "fonts") is None
+    assert blocking._stub(request("fetch"), "builder") == blocking._STUB_BUILDER
+    assert blocking._stub(request("script"), "analytics") == blocking._STUB_SCRIPT
+    assert blocking._stub(request("ping"), "analytics") == blocking._STUB_EMPTY
@@ -0,0 +1,35 @@
+import pytest
+
+pytest.importorskip("playwright")
+
+from harness import coverage
+
+
+def function(*ranges):
+    return {"ranges": [{"startOffset": start, "endOffset": end, "count": count} for start, end, count in ranges]}
+
+
+def test_merge_joins_overlapping_and_touching_ranges():
+    assert coverage.merge([[20, 30], [0, 10], [10, 15], [25, 40], [50, 60]]) == [[0, 15], [20, 40], [50, 60]]
+    assert coverage.merge([]) == []
+    assert coverage.covered([[0, 15], [20, 40]]) == 35
+
+
+def test_innermost_range_decides():
+    # Script ran; a function in it did not, except for one block reached another way.
+    functions = [function((0, 100, 1)), function((10, 50, 0), (20, 30, 1))]
+    assert coverage.executed_ranges(functions) == [[0, 10], [20, 30], [50, 100]]
+
+
+def test_sibling_functions_that_never_ran():
+    functions = [function((0, 100, 1)), function((10, 20, 0)), function((30, 40, 0))]
+    assert coverage.executed_ranges(functions) == [[0, 10], [20, 30], [40, 100]]
+
+
+def test_nothing_ran():
+    assert coverage.executed_ranges([function((0, 100, 0))]) == []
+    assert coverage.executed_ranges([]) == []
+
+
+def test_chunk_name_drops_the_build_hash():
+    assert coverage.chunk_name("https://shop.example/assets/index-BdX3k2aQ.js") == "assets/index.js"
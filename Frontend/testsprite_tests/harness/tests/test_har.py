@@ -0,0 +1,60 @@
+import asyncio
+import json
+import types
+
+import pytest
+
+pytest.importorskip("playwright")
+
+from harness import har
+
+BUDGETS = {
+    "default": {"maxBytes": 1000, "maxRequests": 3},
+    "pages": {"/checkout": {"maxBytes": 100}},
+}
+
+
+def entry(page, body, headers=50):
+    return {"pageref": f"http://localhost:5173{page}", "response": {"bodySize": body, "headersSize": headers}}
+
+
+def write(tmp_path, name, entries):
+    path = tmp_path / f"{name}.har"
+    path.write_text(json.dumps({"log": {"entries": entries}}), encoding="utf-8")
+    return path
+
+
+def test_page_totals_ignore_unknown_sizes():
+    totals = har.page_totals({"log": {"entries": [entry("/", 100), entry("/", -1, -1), entry("", 10)]}})
+    assert totals == {"/": {"bytes": 210, "requests": 3}}
+
+
+def test_check_budgets_applies_page_overrides(tmp_path):
+    path = write(tmp_path, "TC004", [entry("/", 200), entry("/checkout", 100), *[entry("/shop", 10)] * 4])
+    results = {page: (name, totals, violations) for name, page, totals, violations in har.check_budgets([path], BUDGETS)}
+    assert list(results) == ["/", "/checkout", "/shop"]
+    assert results["/"] == ("TC004", {"bytes": 250, "requests": 1}, [])
+    assert results["/checkout"][2] == ["150 bytes > 100"]
+    assert results["/shop"][2] == ["4 requests > 3"]
+
+
+class Context:
+    def __init__(self):
+        self.routes = []
+
+    async def route(self, pattern, handler):
+        self.routes.append((pattern, handler))
+
+    async def unroute(self, pattern, handler=None):
+        self.routes.remove((pattern, handler))
+
+
+def test_recorder_and_replayer_unroute_on_finish(tmp_path, monkeypatch):
+    monkeypatch.setattr(har.config, "HAR_DIR", tmp_path)
+    script = types.SimpleNamespace(id="TC001")
+    for instrument in (har.HarRecorder(), har.HarReplayer()):
+        context = Context()
+        asyncio.run(instrument.attach(context, script))
+        assert len(context.routes) == 1
+        asyncio.run(instrument.finish(script, {}))
+        assert context.routes == []
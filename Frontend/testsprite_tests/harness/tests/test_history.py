@@ -0,0 +1,73 @@
+import contextlib
+import json
+import sqlite3
+
+import pytest
+
+pytest.importorskip("playwright")
+
+from harness import history
+
+
+@pytest.fixture
+def opened(monkeypatch):
+    """Every connection history.connect hands out."""
+    connections = []
+    connect = history.connect
+
+    def tracking(path=None):
+        connections.append(connect(path))
+        return connections[-1]
+
+    monkeypatch.setattr(history, "connect", tracking)
+    return connections
+
+
+def closed(connection):
+    try:
+        connection.execute("SELECT 1")
+    except sqlite3.ProgrammingError:
+        return True
+    return False
+
+
+def test_runs_close_their_connections(tmp_path, opened):
+    path = tmp_path / "history.sqlite"
+    run_id = history.start_run(["TC001"], path)
+    history.finish_run(run_id, path)
+    history.durations(path)
+    assert len(opened) == 3
+    assert all(closed(connection) for connection in opened)
+
+
+def test_flakiness_and_durations(tmp_path):
+    path = tmp_path / "history.sqlite"
+    run_id = history.start_run([], path)
+    with contextlib.closing(history.connect(path)) as connection:
+        for status, duration in [("PASSED", 1000), ("FAILED", 200), ("PASSED", 1200), ("PASSED", 1100)]:
+            history.add_result(connection, run_id, {"id": "TC001", "status": status, "durationMs": duration, "error": ""})
+        flaky = history.flakiness(connection, "TC001")
+    assert flaky["runs"] == 4 and flaky["flaky"] and flaky["recent"] == ".F.."
+    assert flaky["flipRate"] == round(2 / 3, 3)
+    assert history.durations(path) == {"TC001": 1100}
+
+
+def test_signature_normalises_volatile_parts():
+    first = history.signature("Traceback ...\nTimeoutError: Timeout 5000ms exceeded waiting for 'Shop' at http://a/x")
+    second = history.signature("TimeoutError: Timeout 7000ms exceeded waiting for \"Cart\" at https://b/y")
+    assert first == second == "TimeoutError: Timeout <n>ms exceeded waiting for <str> at <url>"
+
+
+def test_export_writes_the_newest_result_per_test(tmp_path):
+    path, results_path = tmp_path / "history.sqlite", tmp_path / "test_results.json"
+    results_path.write_text('[{"title": "TC001-Product Listing", "code": "kept", "testStatus": "FAILED"}]')
+    run_id = history.start_run([], path)
+    with contextlib.closing(history.connect(path)) as connection:
+        for test_id, status in [("TC001", "FAILED"), ("TC002", "PASSED"), ("TC001", "PASSED")]:
+            outcome = {"id": test_id, "title": f"{test_id}-Test", "status": status, "durationMs": 100, "error": ""}
+            history.add_result(connection, run_id, outcome)
+    assert history.export_results(results_path, path) == 2
+    entries = {entry["title"]: entry for entry in json.loads(results_path.read_text())}
+    assert entries["TC001-Product Listing"]["testStatus"] == "PASSED"
+    assert entries["TC001-Product Listing"]["code"] == "kept"
+    assert entries["TC002-Test"]["durationMs"] == 100
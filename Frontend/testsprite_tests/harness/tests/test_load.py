@@ -0,0 +1,64 @@
+import asyncio
+import json
+import random
+
+import pytest
+
+pytest.importorskip("playwright")
+
+from harness import httpio, load
+
+
+def serve(monkeypatch, answers):
+    """Answer httpio.request with ``answers[(method, path suffix)]``; returns the calls made."""
+    calls = []
+
+    async def request(method, url, json=None, **options):
+        calls.append((method, url, json))
+        for (answer_method, suffix), response in answers.items():
+            if method == answer_method and url.split("?")[0].endswith(suffix):
+                return response
+        raise AssertionError(f"unexpected {method} {url}")
+
+    monkeypatch.setattr(httpio, "request", request)
+    return calls
+
+
+def ok(payload):
+    return httpio.Response(200, {"content-type": "application/json"}, json.dumps(payload).encode())
+
+
+def test_checkout_pays_and_verifies_what_the_stub_returned(monkeypatch):
+    paid = {"razorpay_order_id": "order_1", "razorpay_payment_id": "pay_1", "razorpay_signature": "sig"}
+    calls = serve(monkeypatch, {
+        ("GET", "/records"): ok({"items": [{"price": 100}, {"price": "free"}]}),
+        ("POST", "/create-order"): ok({"id": "order_1", "amount": 20000, "currency": "INR"}),
+        ("POST", "/pay"): ok(paid),
+        ("POST", "/verify-payment"): ok({"verified": True}),
+    })
+    stats = load.Stats()
+    asyncio.run(load.http_checkout(stats, random.Random(1), 0, "http://stub/v1/checkout/pay"))
+    assert calls[2][2] == {"order_id": "order_1", "amount": 20000, "currency": "INR"}
+    assert calls[3][2] == paid
+    assert not any(stats.errors.values())
+
+
+@pytest.mark.parametrize("step, answers", [
+    ("products", {("GET", "/records"): httpio.Response(200, {}, b"<html>")}),
+    ("create-order", {("POST", "/create-order"): ok({"amount": 100})}),
+    ("pay", {("POST", "/pay"): ok({"razorpay_order_id": "order_1"})}),
+])
+def test_unreadable_body_is_an_error_not_a_crash(monkeypatch, step, answers):
+    defaults = {
+        ("GET", "/records"): ok({"items": []}),
+        ("POST", "/create-order"): ok({"id": "order_1"}),
+        ("POST", "/pay"): ok({"razorpay_order_id": "o", "razorpay_payment_id": "p", "razorpay_signature": "s"}),
+        ("POST", "/verify-payment"): ok({"verified": True}),
+    }
+    serve(monkeypatch, {**defaults, **answers})
+    stats = load.Stats()
+    asyncio.run(load.http_checkout(stats, random.Random(1), 0, "http://stub/v1/checkout/pay"))
+    assert stats.errors[step] == {"bad body": 1}
+    assert len(stats.latencies[step]) == 1
+    if step != "products":
+        assert "verify-payment" not in stats.latencies
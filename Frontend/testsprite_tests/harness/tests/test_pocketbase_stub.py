@@ -0,0 +1,116 @@
+import asyncio
+import json
+
+import pytest
+
+from harness import httpio
+from harness.pocketbase_stub import Filter, PocketBaseStub, Store, StubError
+
+
+@pytest.fixture
+def store():
+    return Store.from_file()
+
+
+def call(stub, method, path, body=None, query=None, headers=None):
+    headers = dict(headers or {})
+    if body is not None:
+        headers["content-type"] = "application/json"
+    request = httpio.Request(method, path, query or {}, headers, json.dumps(body).encode() if body is not None else b"")
+    return asyncio.run(stub(request))
+
+
+def test_filter_precedence_and_operators():
+    record = {"name": "Redwine soap", "price": 100, "inStock": True, "tags": ["soap"]}
+    assert Filter('price > 50 && name ~ "wine"').matches(record)
+    assert Filter('price < 50 || (inStock = true && name != "")').matches(record)
+    assert not Filter('price >= 101 || name !~ "soap"').matches(record)
+    assert Filter("tags ?= 'soap'").matches(record)
+    assert Filter("").matches(record)
+
+
+def test_filter_reads_auth_fields():
+    matcher = Filter("user = @request.auth.id")
+    assert matcher.matches({"user": "u1"}, {"id": "u1"})
+    assert not matcher.matches({"user": "u1"}, None)
+
+
+@pytest.mark.parametrize("expression", ["price >", "(price > 1", "price 5", "price > 1 )"])
+def test_filter_rejects_malformed_expressions(expression):
+    with pytest.raises(StubError) as raised:
+        Filter(expression)
+    assert raised.value.status == 400
+
+
+def test_list_filters_sorts_and_pages(store):
+    page = store.list("products", page=2, per_page=2, filter="price >= 80", sort="-price,name")
+    everything = store.list("products", per_page=100, filter="price >= 80", sort="-price,name")["items"]
+    prices = [item["price"] for item in everything]
+    assert prices == sorted(prices, reverse=True)
+    assert page["totalItems"] == len(everything)
+    assert page["totalPages"] == -(-len(everything) // 2)
+    assert page["items"] == everything[2:4]
+
+
+def test_create_update_delete(store):
+    record = store.create("reviews", {"product": "p1", "rating": 4})
+    assert store.get("reviews", record["id"])["rating"] == 4
+    store.update("reviews", record["id"], {"rating+": 1})
+    assert store.get("reviews", record["id"])["rating"] == 5
+    store.delete("reviews", record["id"])
+    with pytest.raises(StubError):
+        store.get("reviews", record["id"])
+
+
+def test_create_rejects_duplicate_email(store):
+    with pytest.raises(StubError) as raised:
+        store.create("users", {"email": "testuser@example.com", "password": "x", "passwordConfirm": "x"})
+    assert "email" in raised.value.data
+
+
+def test_sign_in_and_refresh_hide_the_password():
+    stub = PocketBaseStub()
+    signed_in = call(stub, "POST", "/api/collections/users/auth-with-password",
+                     {"identity": "testuser@example.com", "password": "TestPassword123"})
+    assert signed_in.status == 200
+    token = signed_in.json()["token"]
+    assert "password" not in signed_in.json()["record"]
+
+    refreshed = call(stub, "POST", "/api/collections/users/auth-refresh", headers={"authorization": token})
+    assert refreshed.json()["record"]["email"] == "testuser@example.com"
+    assert call(stub, "POST", "/api/collections/users/auth-with-password",
+                {"identity": "testuser@example.com", "password": "wrong"}).status == 400
+    assert call(stub, "POST", "/api/collections/users/auth-refresh", headers={"authorization": "nope"}).status == 401
+
+
+def test_list_over_http_scopes_by_auth():
+    stub = PocketBaseStub()
+    token = call(stub, "POST", "/api/collections/users/auth-with-password",
+                 {"identity": "testuser@example.com", "password": "TestPassword123"}).json()["token"]
+    query = {"filter": "user = @request.auth.id"}
+    mine = call(stub, "GET", "/api/collections/orders/records", query=query, headers={"authorization": token})
+    anonymous = call(stub, "GET", "/api/collections/orders/records", query=query)
+    assert mine.json()["totalItems"] == 1
+    assert anonymous.json()["totalItems"] == 0
+
+
+def test_validate_coupon():
+    stub = PocketBaseStub()
+    applied = call(stub, "POST", "/api/coupons/validate", {"code": "WELCOME10", "subtotal": 250})
+    assert applied.status == 200
+    assert applied.json()["data"]["discountAmount"] == 25
+
+    assert call(stub, "POST", "/api/coupons/validate", {"code": "NOPE", "subtotal": 250}).json()["message"] == "Coupon not found"
+    assert call(stub, "POST", "/api/coupons/validate", {"code": "WELCOME10"}).json()["message"] == "Missing required fields"
+
+    coupon = stub.store.list("coupons", filter="code = 'WELCOME10'")["items"][0]
+    stub.store.update("coupons", coupon["id"], {"current_uses": coupon["max_uses"]})
+    limited = call(stub, "POST", "/api/coupons/validate", {"code": "WELCOME10", "subtotal": 250})
+    assert limited.status == 400
+    assert limited.json()["message"] == "This coupon has reached its usage limit"
+
+
+def test_unknown_route_is_404_with_cors():
+    response = call(PocketBaseStub(), "GET", "/api/nothing")
+    assert response.status == 404
+    assert response.headers["access-control-allow-origin"] == "*"
@@ -0,0 +1,117 @@
+import asyncio
+import base64
+import json
+
+import pytest
+
+from harness import httpio
+from harness.razorpay_stub import Ledger, RazorpayRouter, RazorpayStub, StubError, sign
+
+
+def call(stub, method, path, body=None, headers=None):
+    request = httpio.Request(method, path, {}, dict(headers or {}), json.dumps(body).encode() if body is not None else b"")
+    return asyncio.run(stub(request))
+
+
+def test_sign_matches_razorpay_scheme():
+    # HMAC-SHA256("order_1|pay_1", "secret"), as razorpay-routes.ts computes it.
+    assert sign("order_1", "pay_1", "secret") == "52115a0d3400de9e86aade1f1b6eba9e8974604f4e267a9e9a16633a4c8dd2cb"
+    assert sign("order_1", "pay_1", "secret") != sign("order_1", "pay_2", "secret")
+    assert len(sign("order_1", "pay_1", "")) == 64
+
+
+def test_create_order_rejects_less_than_one_rupee():
+    with pytest.raises(StubError) as raised:
+        Ledger().create_order({"amount": 99})
+    assert raised.value.status == 400
+
+
+def test_pay_capture_refund():
+    ledger = Ledger()
+    order = ledger.create_order({"amount": 50000})
+    payment = ledger.pay(order["id"])
+    assert payment["status"] == "authorized"
+
+    ledger.capture(payment["id"], 50000)
+    assert ledger.order(order["id"])["status"] == "paid"
+    with pytest.raises(StubError):
+        ledger.capture(payment["id"], 50000)
+
+    ledger.refund(payment["id"], 20000)
+    assert payment["refund_status"] == "partial"
+    ledger.refund(payment["id"])
+    assert payment["status"] == "refunded"
+    with pytest.raises(StubError):
+        ledger.refund(payment["id"], 1)
+
+
+def test_auto_capture_and_decline():
+    ledger = Ledger()
+    order = ledger.create_order({"amount": 100, "payment_capture": 1})
+    assert ledger.pay(order["id"])["status"] == "captured"
+    with pytest.raises(StubError) as raised:
+        ledger.pay(order["id"], declined=True)
+    assert raised.value.reason == "payment_failed"
+    assert ledger.order(order["id"])["attempts"] == 2
+
+
+def test_checkout_pay_returns_a_payment_the_api_knows():
+    stub = RazorpayStub(key_id="", key_secret="secret")
+    order = call(stub, "POST", "/v1/orders", {"amount": 25000, "currency": "INR"}).json()
+    assert "_auto_capture" not in order
+
+    paid = call(stub, "POST", "/v1/checkout/pay", {"order_id": order["id"], "amount": 25000, "currency": "INR"}).json()
+    assert paid["razorpay_order_id"] == order["id"]
+    assert paid["razorpay_signature"] == sign(order["id"], paid["razorpay_payment_id"], "secret")
+
+    fetched = call(stub, "GET", f"/v1/payments/{paid['razorpay_payment_id']}")
+    assert fetched.status == 200
+    assert fetched.json()["order_id"] == order["id"]
+
+
+def test_unknown_payment_id_is_rejected():
+    response = call(RazorpayStub(key_id=""), "GET", "/v1/payments/pay_MadeUp00000000")
+    assert response.status == 400
+    assert response.json()["error"]["description"] == "The id provided does not exist"
+
+
+def test_api_checks_basic_auth_when_a_key_is_set():
+    stub = RazorpayStub(key_id="rzp_test", key_secret="secret")
+    assert call(stub, "POST", "/v1/orders", {"amount": 100}).status == 401
+    good = "Basic " + base64.b64encode(b"rzp_test:secret").decode()
+    assert call(stub, "POST", "/v1/orders", {"amount": 100}, {"authorization": good}).status == 200
+
+
+def test_crm_functions_take_rupees_and_verify_signatures():
+    stub = RazorpayStub(key_id="", key_secret="secret")
+    order = call(stub, "POST", "/functions/v1/create-order", {"amount": 250.5}).json()
+    assert order["amount"] == 25050
+
+    paid = call(stub, "POST", "/v1/checkout/pay", {"order_id": order["id"]}).json()
+    assert call(stub, "POST", "/functions/v1/verify-payment", paid).json()["verified"] is True
+    forged = {**paid, "razorpay_signature": "0" * 64}
+    assert call(stub, "POST", "/functions/v1/verify-payment", forged).status == 400
+
+
+@pytest.mark.parametrize("body", [{}, {"amount": 100}, {"order_id": ""}])
+def test_pay_without_order_id_is_a_bad_request(body):
+    response = call(RazorpayStub(key_id=""), "POST", "/v1/checkout/pay", body)
+    assert response.status == 400
+    assert response.json()["error"]["code"] == "BAD_REQUEST_ERROR"
+
+
+def test_router_finish_removes_its_routes():
+    routes = []
+
+    class Context:
+        async def route(self, pattern, handler):
+            routes.append((pattern, handler))
+
+        async def unroute(self, pattern, handler=None):
+            routes.remove((pattern, handler))
+
+    router = RazorpayRouter("http://stub")
+    asyncio.run(router.attach(Context()))
+    assert len(routes) == len(RazorpayRouter.PATTERNS)
+    asyncio.run(router.finish(None, {}))
+    assert routes == []
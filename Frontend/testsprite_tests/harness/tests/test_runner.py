@@ -0,0 +1,84 @@
+import asyncio
+import types
+
+import pytest
+
+pytest.importorskip("playwright")
+
+from harness import blocking, config, runner, session
+
+
+class FakeContext:
+    def __init__(self):
+        self.pages = []
+        self.routes = []
+
+    async def route(self, pattern, handler):
+        self.routes.append((pattern, handler))
+
+    async def unroute(self, pattern, handler=None):
+        self.routes.remove((pattern, handler))
+
+    async def expose_binding(self, name, callback):
+        pass
+
+    async def add_init_script(self, script):
+        pass
+
+    def on(self, event, callback):
+        pass
+
+    def remove_listener(self, event, callback):
+        pass
+
+
+class FakePool:
+    """Runs the prepare hooks the way ContextPool does before loading a page."""
+
+    def __init__(self, hooks):
+        self.hooks = hooks
+        self.released = []
+
+    async def acquire(self, role=None):
+        context = FakeContext()
+        for prepare in self.hooks:
+            await prepare(context)
+        return context
+
+    def release(self, context):
+        self.released.append(context)
+
+
+def script(third_party=()):
+    async def run_test(context):
+        pass
+    module = types.SimpleNamespace(THIRD_PARTY=third_party, run_test=run_test)
+    loads = []
+    return types.SimpleNamespace(id="TC001", title="TC001-test", loads=loads, load=lambda: loads.append(module) or module)
+
+
+def run(monkeypatch, tmp_path, test):
+    reloads = []
+    monkeypatch.setattr(session, "reload_warm", reloads.append)
+    monkeypatch.setattr(config, "VITALS_DIR", tmp_path)
+    instruments = runner.instruments(runner.build_parser().parse_args(["--no-report"]))
+    pool = FakePool(runner.pool_hooks(instruments))
+    outcome = asyncio.run(runner.run_script(None, test, asyncio.Semaphore(1), instruments, pool))
+    assert outcome["status"] == "PASSED", outcome["error"]
+    assert [pattern for pattern, _handler in pool.released[0].routes] == [blocking._all_third_party()]
+    return reloads
+
+
+def test_default_instruments_keep_the_warm_page(monkeypatch, tmp_path):
+    assert run(monkeypatch, tmp_path, script()) == []
+
+
+def test_other_third_party_profile_reloads_the_warm_page(monkeypatch, tmp_path):
+    assert len(run(monkeypatch, tmp_path, script(blocking.ALL))) == 1
+
+
+def test_script_module_is_loaded_once(monkeypatch, tmp_path):
+    test = script(("fonts",))
+    run(monkeypatch, tmp_path, test)
+    assert len(test.loads) == 1
+    assert test.third_party == ("fonts",)
@@ -0,0 +1,30 @@
+import pytest
+
+pytest.importorskip("playwright")
+
+from harness import runner, shard
+
+
+def scripts(*ids):
+    return [runner.Script(test_id, test_id, None) for test_id in ids]
+
+
+def test_plan_balances_by_duration():
+    durations = {"TC001": 9000, "TC002": 5000, "TC003": 4000, "TC004": 3000, "TC005": 1000}
+    buckets = shard.plan(scripts(*durations), 2, durations)
+    assert [[script.id for script in bucket] for bucket in buckets] == [["TC001", "TC004"], ["TC002", "TC003", "TC005"]]
+
+
+def test_plan_assumes_the_median_for_unknown_tests():
+    buckets = shard.plan(scripts("TC001", "TC002", "TC003"), 2, {"TC001": 1000, "TC002": 3000})
+    assert sorted(len(bucket) for bucket in buckets) == [1, 2]
+    assert [script.id for script in buckets[0]] == ["TC002"]
+
+
+def test_plan_never_makes_empty_shards():
+    assert len(shard.plan(scripts("TC001", "TC002"), 8)) == 2
+    assert shard.plan([], 4) == []
+
+
+def test_run_sharded_with_nothing_to_run():
+    assert shard.run_sharded([], 4, durations={}) == []
@@ -0,0 +1,39 @@
+import asyncio
+import types
+
+import pytest
+
+pytest.importorskip("playwright")
+
+from harness import vitals
+
+
+def request(url, size, parent=None):
+    async def sizes():
+        return {"responseBodySize": size, "responseHeadersSize": 0}
+    frame = types.SimpleNamespace(url=url, parent_frame=parent)
+    return types.SimpleNamespace(sizes=sizes, frame=frame)
+
+
+def report(recorder, page, kind, url, **data):
+    recorder._on_report({"page": page}, {"kind": kind, "url": url, "t": 0, **data})
+
+
+def test_bytes_follow_the_frame_url():
+    recorder, page = vitals.VitalsRecorder(), object()
+
+    async def scenario():
+        await recorder._count_bytes(page, request("about:blank", 999))
+        await recorder._count_bytes(page, request("http://shop/", 100))      # before the document report
+        report(recorder, page, "document", "http://shop/")
+        await recorder._count_bytes(page, request("http://shop/", 50))
+        top = types.SimpleNamespace(url="http://shop/cart", parent_frame=None)
+        await recorder._count_bytes(page, request("http://shop/", 0))
+        await recorder._count_bytes(page, request("https://razorpay/frame", 30, parent=top))  # route not reported yet
+        report(recorder, page, "route", "http://shop/cart")
+
+    asyncio.run(scenario())
+    views = {view["url"]: view for view in recorder.summary()}
+    assert list(views) == ["http://shop/", "http://shop/cart"]
+    assert (views["http://shop/"]["requests"], views["http://shop/"]["transferBytes"]) == (3, 150)
+    assert (views["http://shop/cart"]["requests"], views["http://shop/cart"]["transferBytes"]) == (1, 30)
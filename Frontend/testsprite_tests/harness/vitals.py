@@ -0,0 +1,315 @@
+"""Page-load and responsiveness metrics for every navigation in a test.
+
+An init script registers PerformanceObservers (LCP, layout shifts, long
+tasks, event timing, paint) in each document and reports entries to Python
+through a context binding as they arrive, along with the Navigation Timing
+entry once the page has loaded and every SPA route change
+(``history.pushState``/``replaceState``/``popstate``). Transferred bytes come
+from Playwright's per-request sizes, which also cover cross-origin responses
+that report ``transferSize = 0`` to the page.
+
+Each full navigation or SPA route change is one "view". The runner writes a
+test's views to ``tmp/vitals/<TC id>.json``; these are the same entries
+src/utils/performanceTypes.ts describes, measured from outside the app.
+"""
+import asyncio
+import datetime
+import json
+import weakref
+
+from playwright import async_api
+
+from . import config
+
+BINDING = "__testspriteReportVitals"
+
+INIT_SCRIPT = """
+(() => {
+  if (window.top !== window || window.__testspriteVitalsInstalled) return;
+  window.__testspriteVitalsInstalled = true;
+
+  const report = (kind, data) => {
+    try {
+      window.%(binding)s({ kind, url: location.href, t: performance.now(), ...data });
+    } catch (e) {}
+  };
+  const observe = (type, handler, options) => {
+    try {
+      new PerformanceObserver((list) => handler(list.getEntries()))
+        .observe({ type, buffered: true, ...options });
+    } catch (e) {}
+  };
+
+  report('document', {});
+  observe('paint', (entries) => {
+    for (const entry of entries) {
+      if (entry.name === 'first-contentful-paint') report('fcp', { value: entry.startTime });
+    }
+  });
+  observe('largest-contentful-paint', (entries) => {
+    const entry = entries[entries.length - 1];
+    report('lcp', {
+      value: entry.renderTime || entry.loadTime || entry.startTime,
+      size: entry.size,
+      element: entry.element ? entry.element.tagName.toLowerCase() : null,
+    });
+  });
+  observe('layout-shift', (entries) => {
+    const shifts = entries.filter((e) => !e.hadRecentInput).map((e) => [e.startTime, e.value]);
+    if (shifts.length) report('layout-shifts', { shifts });
+  });
+  observe('longtask', (entries) => {
+    report('longtasks', { tasks: entries.map((e) => [e.startTime, e.duration]) });
+  });
+  observe('event', (entries) => {
+    const events = entries.filter((e) => e.interactionId).map((e) => [e.interactionId, e.name, e.startTime, e.duration]);
+    if (events.length) report('events', { events });
+  }, { durationThreshold: 16 });
+
+  const sendNavigation = () => {
+    const [nav] = performance.getEntriesByType('navigation');
+    if (!nav) return;
+    report('navigation', { timing: {
+      type: nav.type,
+      ttfb: nav.responseStart,
+      domContentLoaded: nav.domContentLoadedEventEnd,
+      load: nav.loadEventEnd,
+      transferSize: nav.transferSize,
+      encodedBodySize: nav.encodedBodySize,
+      decodedBodySize: nav.decodedBodySize,
+    } });
+  };
+  if (document.readyState === 'complete') setTimeout(sendNavigation, 0);
+  else addEventListener('load', () => setTimeout(sendNavigation, 0), { once: true });
+
+  for (const method of ['pushState', 'replaceState']) {
+    const original = history[method];
+    history[method] = function (...args) {
+      const result = original.apply(this, args);
+      report('route', {});
+      return result;
+    };
+  }
+  addEventListener('popstate', () => report('route', {}));
+})();
+""" % {"binding": BINDING}
+
+
+def cumulative_layout_shift(shifts):
+    """CLS as web-vitals defines it: the worst session window of shifts
+    (gaps under 1 s, windows capped at 5 s)."""
+    best = current = 0.0
+    window_start = last = None
+    for start, value in sorted(shifts):
+        if last is None or start - last > 1000 or start - window_start > 5000:
+            window_start, current = start, 0.0
+        current += value
+        last = start
+        best = max(best, current)
+    return round(best, 4)
+
+
+def interaction_to_next_paint(events):
+    """INP estimate: the slowest interaction, ignoring one outlier per 50."""
+    by_interaction = {}
+    for interaction_id, _name, _start, duration in events:
+        by_interaction[interaction_id] = max(duration, by_interaction.get(interaction_id, 0))
+    if not by_interaction:
+        return None
+    durations = sorted(by_interaction.values(), reverse=True)
+    return durations[min(len(durations) - 1, len(durations) // 50)]
+
+
+class View:
+    """Metrics for one document load or SPA route."""
+
+    def __init__(self, url, kind, started):
+        self.url = url
+        self.kind = kind
+        self.started = started
+        self.navigation = None
+        self.fcp = None
+        self.lcp = None
+        self.lcp_element = None
+        self.shifts = []
+        self.long_tasks = []
+        self.events = []
+        self.requests = 0
+        self.transfer_bytes = 0
+
+    def as_dict(self):
+        blocking = sum(max(0.0, duration - 50) for _start, duration in self.long_tasks)
+        return {
+            "url": self.url,
+            "kind": self.kind,
+            "startedMs": round(self.started, 1),
+            "navigation": self.navigation,
+            "fcpMs": self.fcp and round(self.fcp, 1),
+            "lcpMs": self.lcp and round(self.lcp, 1),
+            "lcpElement": self.lcp_element,
+            "cls": cumulative_layout_shift(self.shifts),
+            "inpMs": interaction_to_next_paint(self.events),
+            "longTasks": len(self.long_tasks),
+            "totalBlockingTimeMs": round(blocking, 1),
+            "requests": self.requests,
+            "transferBytes": self.transfer_bytes,
+        }
+
+
+# A binding and init script can only be added to a context once, and pooled
+# contexts (harness.pool) serve several tests: the binding forwards to the
+# recorder currently attached to the context.
+_bound = weakref.WeakSet()
+_recorders = weakref.WeakKeyDictionary()
+
+
+def _dispatch(source, payload):
+    recorder = _recorders.get(source["context"])
+    if recorder is not None:
+        recorder._on_report(source, payload)
+
+
+class VitalsRecorder:
+    """Runner instrument collecting :class:`View` metrics for one context."""
+
+    def __init__(self):
+        self.views = {}       # page -> [View]
+        self.unassigned = {}  # page -> [(url, bytes)] finished before their view was reported
+        self.context = None
+        self.passive = False
+        self._listeners = []
+        self._pending = set()
+
+    async def prepare(self, context):
+        """Install the binding and init script (once per context) before a pool loads its page."""
+        if context not in _bound:
+            await context.expose_binding(BINDING, _dispatch)
+            await context.add_init_script(INIT_SCRIPT)
+            _bound.add(context)
+
+    async def attach(self, context, script=None):
+        self.context = context
+        # A pooled page loaded after prepare() already runs the init script.
+        self.passive = context in _bound
+        await self.prepare(context)
+        _recorders[context] = self
+        context.on("page", self._watch)
+        for page in context.pages:
+            self._watch(page)
+
+    def _watch(self, page):
+        self.views.setdefault(page, [])
+        def listener(request):
+            self._track(self._count_bytes(page, request))
+        page.on("requestfinished", listener)
+        self._listeners.append((page, listener))
+
+    def _track(self, coroutine):
+        task = asyncio.ensure_future(coroutine)
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _count_bytes(self, page, request):
+        """Credit a finished request to the view its top-level frame shows.
+
+        The view is found by URL, not by order: a request can finish before
+        the page reports its document or route. It waits in ``unassigned``
+        until a view with that URL appears. Requests of blank documents
+        (before the first navigation) are not counted.
+        """
+        try:
+            sizes = await request.sizes()
+            frame = request.frame
+        except async_api.Error:
+            return      # gone, or a service worker request without a frame
+        while frame.parent_frame is not None:
+            frame = frame.parent_frame
+        if frame.url.startswith("about:"):
+            return
+        transferred = sizes["responseBodySize"] + sizes["responseHeadersSize"]
+        view = next((view for view in reversed(self.views.get(page, [])) if view.url == frame.url), None)
+        if view is None:
+            self.unassigned.setdefault(page, []).append((frame.url, transferred))
+        else:
+            view.requests += 1
+            view.transfer_bytes += transferred
+
+    def _add_view(self, page, view):
+        self.views.setdefault(page, []).append(view)
+        waiting = self.unassigned.get(page, [])
+        for url, transferred in [entry for entry in waiting if entry[0] == view.url]:
+            view.requests += 1
+            view.transfer_bytes += transferred
+        self.unassigned[page] = [entry for entry in waiting if entry[0] != view.url]
+
+    def _on_report(self, source, payload):
+        page = source["page"]
+        kind, url, t = payload["kind"], payload["url"], payload["t"]
+        views = self.views.setdefault(page, [])
+
+        if kind == "document":
+            self._add_view(page, View(url, "navigation", t))
+            return
+        if kind == "route":
+            if views and views[-1].url == url:
+                return
+            self._add_view(page, View(url, "route", t))
+            return
+
+        if not views:
+            self._add_view(page, View(url, "navigation", t))
+        view = views[-1]
+        if kind == "navigation":
+            view.navigation = payload["timing"]
+        elif kind == "fcp":
+            view.fcp = payload["value"]
+        elif kind == "lcp":
+            view.lcp, view.lcp_element = payload["value"], payload["element"]
+        elif kind == "layout-shifts":
+            view.shifts.extend(payload["shifts"])
+        elif kind == "longtasks":
+            view.long_tasks.extend(payload["tasks"])
+        elif kind == "events":
+            view.events.extend(payload["events"])
+
+    def summary(self):
+        return [view.as_dict() for views in self.views.values() for view in views]
+
+    async def collect(self):
+        """Wait for outstanding byte counts, detach from the context and return the views."""
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+        _recorders.pop(self.context, None)
+        self.context.remove_listener("page", self._watch)
+        for page, listener in self._listeners:
+            page.remove_listener("requestfinished", listener)
+        return self.summary()
+
+    async def finish(self, script, outcome):
+        write(script.id, await self.collect(), outcome)
+
+
+def write(test_id, views, outcome=None):
+    """Write ``tmp/vitals/<test_id>.json`` and return its path."""
+    config.VITALS_DIR.mkdir(parents=True, exist_ok=True)
+    path = config.VITALS_DIR / f"{test_id}.json"
+    payload = {
+        "id": test_id,
+        "recordedAt": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "status": outcome and outcome["status"],
+        "durationMs": outcome and outcome["durationMs"],
+        "views": views,
+    }
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(payload, fh, indent=2)
+        fh.write("\n")
+    return path
+
+
+def load(test_id):
+    """Previously written vitals for ``test_id``, or None."""
+    try:
+        with open(config.VITALS_DIR / f"{test_id}.json", encoding="utf-8") as fh:
+            return json.load(fh)
+    except FileNotFoundError:
+        return None
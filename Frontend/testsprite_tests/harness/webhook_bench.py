@@ -0,0 +1,266 @@
+"""Fan-out benchmark for the Backend webhook dispatcher.
+
+Backend/src/server/webhookDispatcher.ts lists every subscription from
+PocketBase on each emit, then posts the event to all matching subscribers,
+retrying failures with exponential backoff. This benchmark:
+
+1. starts local sinks (one server, ``/sink/<n>`` per subscriber) that answer
+   after ``--sink-latency-ms`` and fail ``--sink-error-rate`` of deliveries;
+2. registers one subscription per sink through /api/webhooks/subscriptions
+   for an event type unique to the run, so real subscribers never see it;
+3. fires ``--bursts`` bursts of ``--events`` concurrent /api/webhooks/emit
+   calls and waits for the deliveries to drain;
+4. deletes the subscriptions again.
+
+Comma-separated ``--subscribers``/``--events`` sweep a grid, one row per cell:
+
+    python -m harness.webhook_bench --subscribers 1,10,50,200 --events 10,100 --sink-error-rate 0.05
+
+Per cell it reports emit latency, end-to-end delivery latency (event sent to
+first 2xx at the sink) percentiles, events and deliveries per second, lost
+deliveries and retry amplification (sink requests per expected delivery;
+1.0 means no retries). Rows also go to tmp/webhooks/<timestamp>.json.
+"""
+import argparse
+import asyncio
+import collections
+import hashlib
+import hmac
+import json
+import random
+import re
+import secrets
+import sys
+import time
+from datetime import datetime
+
+from . import baseline, config, httpio
+
+SINK_SECRET_BYTES = 16
+_SINK_RE = re.compile(r"^/sink/(?P<index>\d+)$")
+
+
+class Sinks:
+    """Webhook receivers; records every delivery attempt they see."""
+
+    def __init__(self, count, latency_ms=0, jitter_ms=0, error_rate=0.0, seed=None):
+        self.secrets = [secrets.token_hex(SINK_SECRET_BYTES) for _ in range(count)]
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.bad_signatures = 0
+        # (event id, sink index) -> [first attempt ms, first 2xx ms or None, attempts]
+        self.deliveries = {}
+        self.delivered = 0
+        self.changed = asyncio.Event()
+
+    async def __call__(self, request):
+        match = _SINK_RE.match(request.path)
+        if request.method != "POST" or not match:
+            return httpio.json_response(404, {"error": "not a sink"})
+        received_ms = time.time() * 1000
+        index = int(match["index"])
+        self.requests += 1
+
+        expected = "sha256=" + hmac.new(self.secrets[index].encode(), request.body, hashlib.sha256).hexdigest()
+        if not hmac.compare_digest(request.headers.get("x-webhook-signature", ""), expected):
+            self.bad_signatures += 1
+        event = request.json()
+        sent_ms = event.get("metadata", {}).get("sentAtMs", received_ms)
+        entry = self.deliveries.setdefault((event["id"], index), [received_ms - sent_ms, None, 0])
+        entry[2] += 1
+
+        delay = self.latency_ms + self.random.uniform(-self.jitter_ms, self.jitter_ms)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+        if self.random.random() < self.error_rate:
+            return httpio.json_response(500, {"error": "injected failure"})
+        if entry[1] is None:
+            entry[1] = time.time() * 1000 - sent_ms
+            self.delivered += 1
+            self.changed.set()
+        return httpio.json_response(200, {"ok": True})
+
+    async def drained(self, expected, timeout_s):
+        """Wait until ``expected`` deliveries succeeded or ``timeout_s`` passed."""
+        deadline = time.perf_counter() + timeout_s
+        while self.delivered < expected:
+            self.changed.clear()
+            try:
+                await asyncio.wait_for(self.changed.wait(), max(0.0, deadline - time.perf_counter()))
+            except asyncio.TimeoutError:
+                return False
+        return True
+
+
+def admin_headers():
+    return {"X-API-Key": config.WEBHOOKS_API_KEY} if config.WEBHOOKS_API_KEY else {}
+
+
+async def subscribe(sink_url, sinks, event_type, retries, timeout_ms):
+    """Register one subscription per sink; returns the subscription ids."""
+    async def create(index):
+        response = await httpio.request(
+            "POST", f"{config.BACKEND_URL}/api/webhooks/subscriptions", headers=admin_headers(),
+            json={
+                "url": f"{sink_url}/sink/{index}",
+                "events": [event_type],
+                "secret": sinks.secrets[index],
+                "active": True,
+                "retries": retries,
+                "timeout_ms": timeout_ms,
+                "description": "harness.webhook_bench",
+            },
+        )
+        if not response.ok:
+            raise RuntimeError(f"Could not register sink {index}: HTTP {response.status} {response.text()[:200]}")
+        return response.json()["id"]
+    return await asyncio.gather(*(create(index) for index in range(len(sinks.secrets))))
+
+
+async def unsubscribe(ids):
+    await asyncio.gather(*(
+        httpio.request("DELETE", f"{config.BACKEND_URL}/api/webhooks/subscriptions/{id_}", headers=admin_headers())
+        for id_ in ids
+    ), return_exceptions=True)
+
+
+async def emit(event_type, sequence, latencies, errors):
+    started = time.perf_counter()
+    try:
+        response = await httpio.request("POST", f"{config.BACKEND_URL}/api/webhooks/emit", json={
+            "type": event_type,
+            "source": "harness.webhook_bench",
+            "data": {"sequence": sequence},
+            "metadata": {"sentAtMs": time.time() * 1000},
+        }, timeout=300)
+        if not response.ok:
+            errors[f"HTTP {response.status}"] += 1
+    except Exception as exc:
+        errors[type(exc).__name__] += 1
+    latencies.append((time.perf_counter() - started) * 1000)
+
+
+async def run_cell(subscribers, events, bursts=1, interval_s=1.0, retries=3, timeout_ms=8000,
+                   sink_latency_ms=0, sink_jitter_ms=0, sink_error_rate=0.0, drain_timeout_s=60, seed=None):
+    """Benchmark one (subscribers, events per burst) cell and return its row."""
+    sinks = Sinks(subscribers, sink_latency_ms, sink_jitter_ms, sink_error_rate, seed)
+    server = await httpio.serve(sinks, config.WEBHOOK_SINK_HOST, 0)
+    sink_url = f"http://{config.WEBHOOK_SINK_HOST}:{server.sockets[0].getsockname()[1]}"
+    event_type = f"bench.{secrets.token_hex(4)}"
+    ids = []
+    emit_latencies, emit_errors = [], collections.Counter()
+    try:
+        ids = await subscribe(sink_url, sinks, event_type, retries, timeout_ms)
+        started = time.perf_counter()
+        emitting = []
+        for burst in range(bursts):
+            if burst:
+                await asyncio.sleep(interval_s)
+            emitting += [
+                asyncio.create_task(emit(event_type, burst * events + n, emit_latencies, emit_errors))
+                for n in range(events)
+            ]
+        await asyncio.gather(*emitting)
+        expected = subscribers * events * bursts
+        complete = await sinks.drained(expected, drain_timeout_s)
+        elapsed = time.perf_counter() - started
+    finally:
+        await unsubscribe(ids)
+        server.close()
+        await server.wait_closed()
+
+    delivered = [entry[1] for entry in sinks.deliveries.values() if entry[1] is not None]
+    first_attempt = [entry[0] for entry in sinks.deliveries.values()]
+    row = {
+        "subscribers": subscribers,
+        "eventsPerBurst": events,
+        "bursts": bursts,
+        "emitted": events * bursts,
+        "emitErrors": dict(emit_errors),
+        "expectedDeliveries": expected,
+        "delivered": len(delivered),
+        "lost": expected - len(delivered),
+        "drained": complete,
+        "elapsedS": round(elapsed, 2),
+        "eventsPerSecond": round(events * bursts / elapsed, 2),
+        "deliveriesPerSecond": round(len(delivered) / elapsed, 2),
+        "retryAmplification": round(sinks.requests / expected, 3) if expected else None,
+        "badSignatures": sinks.bad_signatures,
+    }
+    for name, values in (("emit", emit_latencies), ("firstAttempt", first_attempt), ("delivery", delivered)):
+        for q in (50, 95, 99):
+            value = baseline.percentile(values, q)
+            row[f"{name}P{q}Ms"] = None if value is None else round(value, 1)
+    return row
+
+
+def print_header():
+    print(
+        f"{'subs':>5} {'events':>7} {'ev/s':>8} {'deliv/s':>9} {'lost':>6} {'retry x':>8}"
+        f" {'emit p95':>9} {'deliv p50':>10} {'deliv p95':>10} {'deliv p99':>10}"
+    )
+
+
+def print_row(row):
+    cells = [row[key] or 0 for key in ("emitP95Ms", "deliveryP50Ms", "deliveryP95Ms", "deliveryP99Ms")]
+    print(
+        f"{row['subscribers']:>5} {row['emitted']:>7} {row['eventsPerSecond']:>8.1f} {row['deliveriesPerSecond']:>9.1f}"
+        f" {row['lost']:>6} {row['retryAmplification']:>8.2f} {cells[0]:>9.0f}"
+        + "".join(f" {value:>10.0f}" for value in cells[1:])
+        + ("" if not row["emitErrors"] else f"  emit errors: {row['emitErrors']}")
+        + ("" if not row["badSignatures"] else f"  bad signatures: {row['badSignatures']}")
+    )
+
+
+def save(rows):
+    config.WEBHOOK_BENCH_DIR.mkdir(parents=True, exist_ok=True)
+    path = config.WEBHOOK_BENCH_DIR / f"{datetime.now():%Y%m%d-%H%M%S}.json"
+    path.write_text(json.dumps({"backendUrl": config.BACKEND_URL, "rows": rows}, indent=2) + "\n", encoding="utf-8")
+    return path
+
+
+def int_list(value):
+    return [int(part) for part in value.split(",") if part.strip()]
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--subscribers", type=int_list, default=[10], help="sinks to register, e.g. 1,10,100 (default: 10)")
+    parser.add_argument("--events", type=int_list, default=[50], help="concurrent emits per burst, e.g. 10,100 (default: 50)")
+    parser.add_argument("--bursts", type=int, default=1, help="bursts per cell (default: %(default)s)")
+    parser.add_argument("--interval", type=float, default=1.0, help="seconds between bursts (default: %(default)s)")
+    parser.add_argument("--retries", type=int, default=3, help="subscription retries (default: %(default)s)")
+    parser.add_argument("--timeout-ms", type=int, default=8000, help="subscription timeout_ms (default: %(default)s)")
+    parser.add_argument("--sink-latency-ms", type=float, default=0, help="sink response delay (default: %(default)s)")
+    parser.add_argument("--sink-jitter-ms", type=float, default=0, help="+/- spread on the delay (default: %(default)s)")
+    parser.add_argument("--sink-error-rate", type=float, default=0.0, help="share of deliveries answered 500 (default: %(default)s)")
+    parser.add_argument("--drain-timeout", type=float, default=60, help="seconds to wait for retries to land (default: %(default)s)")
+    parser.add_argument("--seed", type=int, help="seed for sink latency and failures")
+    return parser
+
+
+async def sweep(args):
+    rows = []
+    print_header()
+    for subscribers in args.subscribers:
+        for events in args.events:
+            rows.append(await run_cell(
+                subscribers, events, args.bursts, args.interval, args.retries, args.timeout_ms,
+                args.sink_latency_ms, args.sink_jitter_ms, args.sink_error_rate, args.drain_timeout, args.seed,
+            ))
+            print_row(rows[-1])
+    return rows
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    rows = asyncio.run(sweep(args))
+    print(f"\nwrote {save(rows)}")
+    return 0 if all(row["lost"] == 0 and not row["emitErrors"] for row in rows) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())